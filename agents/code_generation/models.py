@@ -8,7 +8,7 @@ agents.code_generation.models
 """
 
 from __future__ import annotations
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 class CodeGenRequest(BaseModel):
     """
@@ -25,9 +25,13 @@ class CodeGenRequest(BaseModel):
     db_schema:    str | None    = Field(None, description="既存DBスキーマ(DDL)")
     ui_design:    str | None    = Field(None, description="既存UI設計(HTML/CSS)")
 
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
+
 class CodeGenResponse(BaseModel):
     """
     POST /generate_code のレスポンススキーマ
     - code: 生成されたPythonソースコード本文
     """
     code: str = Field(..., description="生成されたソースコード")
+
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
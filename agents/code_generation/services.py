@@ -10,49 +10,101 @@ agents.code_generation.services
 
 from __future__ import annotations
 import textwrap
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict
 
-from common.ai_service import call_generative_ai
+from common.ai_service import call_generative_ai, call_generative_ai_stream
+from common.llm_cache import llm_cache
+from common.prompt_template import PromptTemplate
 from .models import CodeGenRequest
 
-async def generate_code(req: CodeGenRequest) -> Dict[str, Any]:
-    """
-    LLM へプロンプトを投げてソースコードを生成。
-    プロンプトには以下を含める：
-      - 要件(req.prompt)
-      - プロジェクト名(req.project_name)
-      - DBスキーマDDL(req.db_schema)
-      - UI設計(req.ui_design) のHTML/CSS
-    """
-    # 1) プロンプト組み立て
-    prompt = textwrap.dedent(f"""
+# LLM 生成パラメータ (応答キャッシュのキーにも含める)
+_GEN_PARAMS = {"max_tokens": 16_384}
+
+# ── プロンプト (import 時に 1 度だけ dedent) ──────────────────────────────
+# 静的プレフィックス: 役割・出力仕様など全リクエスト共通 → プロバイダ側でキャッシュ
+# 動的サフィックス : リクエストごとの入力のみを埋め込む (PromptTemplate で事前分解)
+_STATIC_PREFIX = textwrap.dedent("""
     # Role
     You are a senior Python engineer with deep expertise in backend and frontend integration.
 
+    # Task
+    1. Generate production-ready, PEP-8-compliant Python source code that implements the requirement given below.
+    2. Use asyncpg for database connections with fully parameterized queries.
+    3. Integrate the given DB schema and UI design seamlessly in the generated code.
+    4. Return **only** the Python source file contents (no additional commentary).
+    """).strip()
+
+_SUFFIX_TEMPLATE = PromptTemplate(textwrap.dedent("""
     # Requirement
-    {req.prompt}
+    {prompt}
 
     # Additional Information
-    - Project Name: {req.project_name}
+    - Project Name: {project_name}
     - Database Schema (DDL):
-    {req.db_schema or 'N/A'}
+    {db_schema}
 
     - UI Design (HTML/CSS):
-    {req.ui_design or 'N/A'}
+    {ui_design}
+    """).strip())
 
-    # Task
-    1. Generate production-ready, PEP-8-compliant Python source code that implements the requirement.
-    2. Use asyncpg for database connections with fully parameterized queries.
-    3. Integrate the above DB schema and UI design seamlessly in the generated code.
-    4. Return **only** the Python source file contents (no additional commentary).
-    """).strip()
+
+def _build_user_suffix(req: CodeGenRequest) -> str:
+    """リクエスト固有の動的サフィックスを組み立てる。"""
+    return _SUFFIX_TEMPLATE.format(
+        prompt=req.prompt,
+        project_name=req.project_name,
+        db_schema=req.db_schema or "N/A",
+        ui_design=req.ui_design or "N/A",
+    )
+
+
+async def generate_code(req: CodeGenRequest) -> Dict[str, Any]:
+    """
+    LLM へプロンプトを投げてソースコードを生成。
+    プロンプトには以下を含める：
+      - 要件(req.prompt)
+      - プロジェクト名(req.project_name)
+      - DBスキーマDDL(req.db_schema)
+      - UI設計(req.ui_design) のHTML/CSS
+    """
+    # 1) プロンプト組み立て
+    user_suffix = _build_user_suffix(req)
 
     # 2) LLM呼び出し
-    llm_res = await call_generative_ai(
-        model=req.model_name,
-        prompt=prompt,
-        max_tokens=16_384,
+    llm_res = await llm_cache.get_or_call(
+        user_suffix,
+        req.model_name,
+        lambda: call_generative_ai(
+            model=req.model_name,
+            cached_prefix=_STATIC_PREFIX,
+            user_suffix=user_suffix,
+            **_GEN_PARAMS,
+        ),
+        namespace="code_generation",
+        params=_GEN_PARAMS,
+        prefix=_STATIC_PREFIX,
     )
 
     # 3) レスポンス整形
     return {"code": llm_res}
+
+
+async def generate_code_stream(req: CodeGenRequest) -> AsyncIterator[str]:
+    """
+    generate_code のストリーミング版。生成されたコード断片を到着順に yield する。
+    """
+    user_suffix = _build_user_suffix(req)
+    async for delta in llm_cache.stream_or_replay(
+        user_suffix,
+        req.model_name,
+        lambda: call_generative_ai_stream(
+            model=req.model_name,
+            cached_prefix=_STATIC_PREFIX,
+            user_suffix=user_suffix,
+            **_GEN_PARAMS,
+        ),
+        namespace="code_generation",
+        params=_GEN_PARAMS,
+        prefix=_STATIC_PREFIX,
+    ):
+        yield delta
@@ -6,7 +6,7 @@ agents.code_patch.models
 
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class PatchCodeRequest(BaseModel):
@@ -23,10 +23,16 @@ class PatchCodeRequest(BaseModel):
     )
     model_name: str = Field("o4-mini-high", description="使用する LLM モデル名")
 
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
+
 
 class PatchCodeResponse(BaseModel):
     """
     応答値:
       • patched_code : 適用済みの新しいソースコード全文
+      • unchanged    : 修正が入らなかった場合 True
     """
-    patched_code: str = Field(..., description="パッチ適用後のソースコード全文")
\ No newline at end of file
+    patched_code: str = Field(..., description="パッチ適用後のソースコード全文")
+    unchanged: bool = Field(False, description="LLM 出力が元コードと同一 (QA の重いステップを省略可)")
+
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
\ No newline at end of file
@@ -6,44 +6,119 @@ LLM を用いて「差分パッチ」ではなく *修正後の完全なソー
 
 from __future__ import annotations
 
+import re
 import textwrap
-from typing import Dict
+from typing import Any, AsyncIterator, Dict
 
-from common.ai_service import call_generative_ai
+from common.ai_service import call_generative_ai, call_generative_ai_stream
+from common.llm_cache import llm_cache
+from common.prompt_template import PromptTemplate
 from .models import PatchCodeRequest
 
+# LLM 生成パラメータ (応答キャッシュのキーにも含める)
+# 低温で determinism を優先
+_GEN_PARAMS = {"max_tokens": 16_384, "temperature": 0.3}
 
-async def patch_code(req: PatchCodeRequest) -> Dict[str, str]:
+
+# ── プロンプト (import 時に 1 度だけ dedent) ──────────────────────────────
+# 静的プレフィックス: 役割・出力仕様など全リクエスト共通 → プロバイダ側でキャッシュ
+# 動的サフィックス : リクエストごとの入力のみを埋め込む (PromptTemplate で事前分解)
+_STATIC_PREFIX = textwrap.dedent(
+    """
+    You are an expert Python developer.
+
+    ## Output specification
+    1. Produce **only** the fully patched code – do not include commentary.
+    2. Return in one fenced code block labelled `python:title=patched_code.py`.
+    3. Do **not** omit any part of the original functionality unless explicitly told.
+
+    Remember: Nothing but the code block.
+    """
+).strip()
+
+_SUFFIX_TEMPLATE = PromptTemplate(textwrap.dedent(
+    """
+    ## Original Source
+    ```python
+    {source_code}
+    ```
+
+    ## Requested Fix / Enhancement
+    {instructions}
+    """
+).strip())
+
+
+# 応答の ```python:title=patched_code.py ... ``` ブロック (言語・タイトルラベルは任意)
+_FENCE_RE = re.compile(r"```[^\n]*\n(.*?)```", re.DOTALL)
+
+
+def _fenced_body(text: str) -> str:
+    """最初のコードフェンスの中身を返す。フェンスが無ければ text をそのまま返す"""
+    m = _FENCE_RE.search(text)
+    return m.group(1) if m else text
+
+
+def _is_unchanged(source_code: str, patched_code: str) -> bool:
+    """
+    LLM 応答からコードフェンスを外し、改行コード・前後空白のみの差分は「変更なし」とみなす。
+    両方ともメモリ上にあるので、ハッシュを取るより str 比較 (memcmp) の方が安い。
+    """
+    patched = _fenced_body(patched_code.replace("\r\n", "\n"))
+    return patched.strip() == source_code.replace("\r\n", "\n").strip()
+
+
+def _build_user_suffix(req: PatchCodeRequest) -> str:
+    """リクエスト固有の動的サフィックスを組み立てる。"""
+    return _SUFFIX_TEMPLATE.format(
+        source_code=req.source_code,
+        instructions=req.instructions,
+    )
+
+
+async def patch_code(req: PatchCodeRequest) -> Dict[str, Any]:
     """
     LLM に修正方針と元コードを渡し、修正済みコード全文を受け取る。
-    返値は orchestrator が期待する `{"patched_code": "..."}`
-    """
-    prompt = textwrap.dedent(
-        f"""
-        You are an expert Python developer.
-
-        ## Original Source
-        ```python
-        {req.source_code}
-        ```
-
-        ## Requested Fix / Enhancement
-        {req.instructions}
-
-        ## Output specification
-        1. Produce **only** the fully patched code – do not include commentary.
-        2. Return in one fenced code block labelled `python:title=patched_code.py`.
-        3. Do **not** omit any part of the original functionality unless explicitly told.
-
-        Remember: Nothing but the code block.
-        """
-    ).strip()
-
-    patched_code: str = await call_generative_ai(
-        model=req.model_name,
-        prompt=prompt,
-        max_tokens=16_384,
-        temperature=0.3,          # 低温で determinism を優先
+    返値は orchestrator が期待する `{"patched_code": "...", "unchanged": bool}`
+    (変更なしの場合は元コードをそのまま返し、QA 側で重いステップを省略できるようにする)
+    """
+    user_suffix = _build_user_suffix(req)
+
+    patched_code: str = await llm_cache.get_or_call(
+        user_suffix,
+        req.model_name,
+        lambda: call_generative_ai(
+            model=req.model_name,
+            cached_prefix=_STATIC_PREFIX,
+            user_suffix=user_suffix,
+            **_GEN_PARAMS,
+        ),
+        namespace="code_patch",
+        params=_GEN_PARAMS,
+        prefix=_STATIC_PREFIX,
     )
 
-    return {"patched_code": patched_code}
+    if _is_unchanged(req.source_code, patched_code):
+        return {"patched_code": req.source_code, "unchanged": True}
+    return {"patched_code": patched_code, "unchanged": False}
+
+
+async def patch_code_stream(req: PatchCodeRequest) -> AsyncIterator[str]:
+    """
+    patch_code のストリーミング版。修正済みコードの断片を到着順に yield する。
+    """
+    user_suffix = _build_user_suffix(req)
+    async for delta in llm_cache.stream_or_replay(
+        user_suffix,
+        req.model_name,
+        lambda: call_generative_ai_stream(
+            model=req.model_name,
+            cached_prefix=_STATIC_PREFIX,
+            user_suffix=user_suffix,
+            **_GEN_PARAMS,
+        ),
+        namespace="code_patch",
+        params=_GEN_PARAMS,
+        prefix=_STATIC_PREFIX,
+    ):
+        yield delta
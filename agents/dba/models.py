@@ -5,7 +5,7 @@ PostgreSQL 用の DB スキーマ設計エージェント ―― 入出力スキ
 """
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class DesignSchemaRequest(BaseModel):
@@ -19,6 +19,8 @@ class DesignSchemaRequest(BaseModel):
     project_name: str = Field(..., description="プロジェクト名")
     model_name: str = Field("o4-mini-high", description="利用する LLM モデル名")
 
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
+
 
 class DesignSchemaResponse(BaseModel):
     """
@@ -26,3 +28,5 @@ class DesignSchemaResponse(BaseModel):
       • dba_script : 生成された SQL (DDL + サンプル INSERT 等)
     """
     dba_script: str = Field(..., description="DDL および初期データの SQL スクリプト")
+
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
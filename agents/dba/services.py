@@ -6,11 +6,54 @@ LLM を呼び出して PostgreSQL 用 DDL とサンプルデータを生成す
 from __future__ import annotations
 
 import textwrap
-from typing import Dict
+from typing import AsyncIterator, Dict
 
-from common.ai_service import call_generative_ai
+from common.ai_service import call_generative_ai, call_generative_ai_stream
+from common.llm_cache import llm_cache
+from common.prompt_template import PromptTemplate
 from .models import DesignSchemaRequest
 
+# LLM 生成パラメータ (応答キャッシュのキーにも含める)
+# DDL は比較的長くなるためトークン多め
+_GEN_PARAMS = {"max_tokens": 16_384}
+
+
+# ── プロンプト (import 時に 1 度だけ dedent) ──────────────────────────────
+# 静的プレフィックス: 役割・出力仕様など全リクエスト共通 → プロバイダ側でキャッシュ
+# 動的サフィックス : リクエストごとの入力のみを埋め込む (PromptTemplate で事前分解)
+_STATIC_PREFIX = textwrap.dedent(
+    """
+    You are an experienced PostgreSQL DBA.
+
+    ## Output Format
+    * Provide `CREATE TABLE` statements with primary/foreign keys.
+    * Use lower_snake_case for identifiers.
+    * Include at least one composite index or partial index if applicable.
+    * Append 3–5 sample INSERT statements per table.
+    * Wrap everything in **one** fenced code block labelled
+      `sql:title=schema.sql`.
+    * Do NOT output any commentary outside the code block.
+    """
+).strip()
+
+_SUFFIX_TEMPLATE = PromptTemplate(textwrap.dedent(
+    """
+    ## Project
+    {project_name}
+
+    ## Requirements
+    {prompt}
+    """
+).strip())
+
+
+def _build_user_suffix(req: DesignSchemaRequest) -> str:
+    """リクエスト固有の動的サフィックスを組み立てる。"""
+    return _SUFFIX_TEMPLATE.format(
+        project_name=req.project_name,
+        prompt=req.prompt,
+    )
+
 
 async def design_schema(req: DesignSchemaRequest) -> Dict[str, str]:
     """
@@ -27,32 +70,42 @@ async def design_schema(req: DesignSchemaRequest) -> Dict[str, str]:
         {"dba_script": "```sql:title=schema.sql\nCREATE TABLE ..."}
     """
     # ----- プロンプト組み立て -----
-    prompt = textwrap.dedent(
-        f"""
-        You are an experienced PostgreSQL DBA.
-
-        ## Project
-        {req.project_name}
-
-        ## Requirements
-        {req.prompt}
-
-        ## Output Format
-        * Provide `CREATE TABLE` statements with primary/foreign keys.
-        * Use lower_snake_case for identifiers.
-        * Include at least one composite index or partial index if applicable.
-        * Append 3–5 sample INSERT statements per table.
-        * Wrap everything in **one** fenced code block labelled
-          `sql:title=schema.sql`.
-        * Do NOT output any commentary outside the code block.
-        """
-    ).strip()
+    user_suffix = _build_user_suffix(req)
 
     # ----- LLM 呼び出し -----
-    sql_script: str = await call_generative_ai(
-        model=req.model_name,
-        prompt=prompt,
-        max_tokens=16_384,  # DDL は比較的長くなるためトークン多め
+    sql_script: str = await llm_cache.get_or_call(
+        user_suffix,
+        req.model_name,
+        lambda: call_generative_ai(
+            model=req.model_name,
+            cached_prefix=_STATIC_PREFIX,
+            user_suffix=user_suffix,
+            **_GEN_PARAMS,
+        ),
+        namespace="dba",
+        params=_GEN_PARAMS,
+        prefix=_STATIC_PREFIX,
     )
 
     return {"dba_script": sql_script}
+
+
+async def design_schema_stream(req: DesignSchemaRequest) -> AsyncIterator[str]:
+    """
+    design_schema のストリーミング版。SQL スクリプトの断片を到着順に yield する。
+    """
+    user_suffix = _build_user_suffix(req)
+    async for delta in llm_cache.stream_or_replay(
+        user_suffix,
+        req.model_name,
+        lambda: call_generative_ai_stream(
+            model=req.model_name,
+            cached_prefix=_STATIC_PREFIX,
+            user_suffix=user_suffix,
+            **_GEN_PARAMS,
+        ),
+        namespace="dba",
+        params=_GEN_PARAMS,
+        prefix=_STATIC_PREFIX,
+    ):
+        yield delta
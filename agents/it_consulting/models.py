@@ -6,7 +6,7 @@ agents.it_consulting_agent.models
 """
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class AdviceRequest(BaseModel):
@@ -14,6 +14,10 @@ class AdviceRequest(BaseModel):
     project_name: str = Field(..., description="プロジェクト名")
     model_name: str = Field("o4-mini-high", description="LLM モデル名")
 
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
+
 
 class AdviceResponse(BaseModel):
     advice: str = Field(..., description="ベストプラクティス提案（Markdown）")
+
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
@@ -8,41 +8,93 @@ agents.it_consulting_agent.services
 from __future__ import annotations
 
 import textwrap
-from typing import Dict
+from typing import AsyncIterator, Dict
 
-from common.ai_service import call_generative_ai
+from common.ai_service import call_generative_ai, call_generative_ai_stream
+from common.llm_cache import llm_cache
+from common.prompt_template import PromptTemplate
 from .models import AdviceRequest
 
+# LLM 生成パラメータ (応答キャッシュのキーにも含める)
+_GEN_PARAMS = {"max_tokens": 16_384}
 
-async def generate_advice(req: AdviceRequest) -> Dict[str, str]:
+
+# ── プロンプト (import 時に 1 度だけ dedent) ──────────────────────────────
+# 静的プレフィックス: 役割・出力仕様など全リクエスト共通 → プロバイダ側でキャッシュ
+# 動的サフィックス : リクエストごとの入力のみを埋め込む (PromptTemplate で事前分解)
+_STATIC_PREFIX = textwrap.dedent(
     """
-    LLM に相談内容を渡し、IT コンサル観点でのアドバイスを返す。
+    ## Role
+    You are a senior IT consultant (PMP + CISSP).
+
+    ## Deliverable
+    Provide actionable recommendations covering:
+    - Architecture & scalability
+    - Security & compliance
+    - Cost optimisation
+    - Team / process (Agile, DevSecOps)
+
+    Format in GitHub-flavoured Markdown with H2/H3 headings.
+    """
+).strip()
+
+_SUFFIX_TEMPLATE = PromptTemplate(textwrap.dedent(
+    """
+    ## Project
+    {project_name}
+
+    ## Question
+    {prompt}
     """
-    prompt = textwrap.dedent(
-        f"""
-        ## Role
-        You are a senior IT consultant (PMP + CISSP).
+).strip())
 
-        ## Project
-        {req.project_name}
 
-        ## Question
-        {req.prompt}
+def _build_user_suffix(req: AdviceRequest) -> str:
+    """リクエスト固有の動的サフィックスを組み立てる。"""
+    return _SUFFIX_TEMPLATE.format(
+        project_name=req.project_name,
+        prompt=req.prompt,
+    )
 
-        ## Deliverable
-        Provide actionable recommendations covering:
-        - Architecture & scalability
-        - Security & compliance
-        - Cost optimisation
-        - Team / process (Agile, DevSecOps)
 
-        Format in GitHub-flavoured Markdown with H2/H3 headings.
-        """
-    ).strip()
+async def generate_advice(req: AdviceRequest) -> Dict[str, str]:
+    """
+    LLM に相談内容を渡し、IT コンサル観点でのアドバイスを返す。
+    """
+    user_suffix = _build_user_suffix(req)
 
-    advice = await call_generative_ai(
-        model=req.model_name,
-        prompt=prompt,
-        max_tokens=16_384,
+    advice = await llm_cache.get_or_call(
+        user_suffix,
+        req.model_name,
+        lambda: call_generative_ai(
+            model=req.model_name,
+            cached_prefix=_STATIC_PREFIX,
+            user_suffix=user_suffix,
+            **_GEN_PARAMS,
+        ),
+        namespace="it_consulting",
+        params=_GEN_PARAMS,
+        prefix=_STATIC_PREFIX,
     )
     return {"advice": advice}
+
+
+async def generate_advice_stream(req: AdviceRequest) -> AsyncIterator[str]:
+    """
+    generate_advice のストリーミング版。アドバイス本文の断片を到着順に yield する。
+    """
+    user_suffix = _build_user_suffix(req)
+    async for delta in llm_cache.stream_or_replay(
+        user_suffix,
+        req.model_name,
+        lambda: call_generative_ai_stream(
+            model=req.model_name,
+            cached_prefix=_STATIC_PREFIX,
+            user_suffix=user_suffix,
+            **_GEN_PARAMS,
+        ),
+        namespace="it_consulting",
+        params=_GEN_PARAMS,
+        prefix=_STATIC_PREFIX,
+    ):
+        yield delta
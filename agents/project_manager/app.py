@@ -5,43 +5,22 @@ agents.project_manager_agent.app
 """
 from __future__ import annotations
 
-import logging
-
-import uvicorn
-from fastapi import FastAPI
-
-from backend.telemetry import init_otel            # ★ 追加 ★
-
-from common.utils import ensure_singleton
-from common.logging_setup import setup_logging
-from common.agent_http import agent_endpoint
+from common.agent_factory import make_agent_app, serve_agent
 from .models import ScheduleRequest, ScheduleResponse
-from .services import create_schedule
-
-ensure_singleton(__name__)
-setup_logging()
-logger = logging.getLogger(__name__)
-
-app = FastAPI(title="Project-Manager Agent", version="1.0.0")
-
-# OpenTelemetry
-init_otel("project-manager-agent", fastapi_app=app)      # ★ 追加 ★
-
+from .services import create_schedule, create_schedule_stream
 
-@app.post("/schedule", response_model=ScheduleResponse)
-@agent_endpoint(ScheduleRequest, output_key="schedule")
-async def _schedule(req_model: ScheduleRequest):  # type: ignore[valid-type]
-    """
-    プロジェクトスケジュールを生成して返却する。
-    """
-    return (await create_schedule(req_model))["schedule"]
+app = make_agent_app(
+    "project-manager-agent",
+    create_schedule,
+    ScheduleRequest,
+    ScheduleResponse,
+    "/schedule",
+    "schedule",
+    8007,
+    stream_fn=create_schedule_stream,
+    title="Project-Manager Agent",
+)
 
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "agents.project_manager_agent.app:app",
-        host="127.0.0.1",
-        port=8007,
-        reload=False,
-        log_level="debug",
-    )
+    serve_agent("agents.project_manager.app:app", 8007)
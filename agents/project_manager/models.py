@@ -6,7 +6,7 @@ agents.project_manager_agent.models
 from __future__ import annotations
 
 from typing import List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ScheduleRequest(BaseModel):
@@ -20,6 +20,8 @@ class ScheduleRequest(BaseModel):
     timeline: dict = Field(..., description="要件や現状フィードバック概要")
     model_name: str = Field("o4-mini-high", description="LLM モデル名")
 
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
+
 
 class Milestone(BaseModel):
     """
@@ -34,6 +36,8 @@ class Milestone(BaseModel):
     end: str
     owners: List[str]
 
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
+
 
 class ScheduleResponse(BaseModel):
     """
@@ -41,3 +45,5 @@ class ScheduleResponse(BaseModel):
     LangGraph では単純テキストで扱うためここは str としておく。
     """
     schedule: str = Field(..., description="CSV 形式のスプリントスケジュール")
+
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
@@ -6,48 +6,99 @@ LLM を活用して 3 イテレーション（1 週間スプリント×3）の
 """
 from __future__ import annotations
 
-import json
+import orjson
 import textwrap
-from typing import Dict
+from typing import AsyncIterator, Dict
 
-from common.ai_service import call_generative_ai
+from common.ai_service import call_generative_ai, call_generative_ai_stream
+from common.llm_cache import llm_cache
+from common.prompt_template import PromptTemplate
 from .models import ScheduleRequest
 
+# LLM 生成パラメータ (応答キャッシュのキーにも含める)
+_GEN_PARAMS = {"max_tokens": 16_384}
+
+
+# ── プロンプト (import 時に 1 度だけ dedent) ──────────────────────────────
+# 静的プレフィックス: 役割・出力仕様など全リクエスト共通 → プロバイダ側でキャッシュ
+# 動的サフィックス : リクエストごとの入力のみを埋め込む (PromptTemplate で事前分解)
+_STATIC_PREFIX = textwrap.dedent(
+    """
+    You are a PMP-certified project manager.
+
+    ## Task
+    Create an Agile roadmap for three 1-week sprints.
+    Columns: milestone,start,end,owners (comma-separated owner names).
+
+    ## Output Rules
+    * Return exactly one fenced-code block labelled `csv:title=schedule.csv`.
+    * No Markdown outside the code block.
+    """
+).strip()
+
+_SUFFIX_TEMPLATE = PromptTemplate(textwrap.dedent(
+    """
+    ## Project
+    {project_name}
+
+    ## Context
+    (High-level goals / feedback)
+    ```json
+    {timeline_json}
+    ```
+    """
+).strip())
+
+
+def _build_user_suffix(req: ScheduleRequest) -> str:
+    """リクエスト固有の動的サフィックスを組み立てる。"""
+    # ----- 入力 JSON を整形しプロンプトに含める -----
+    timeline_json = orjson.dumps(req.timeline, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return _SUFFIX_TEMPLATE.format(
+        project_name=req.project_name,
+        timeline_json=timeline_json,
+    )
+
 
 async def create_schedule(req: ScheduleRequest) -> Dict[str, str]:
     """
     Timeline 情報をもとに CSV スケジュールを生成し文字列で返す。
     """
-    # ----- 入力 JSON を整形しプロンプトに含める -----
-    timeline_json = json.dumps(req.timeline, ensure_ascii=False, indent=2)
-
-    prompt = textwrap.dedent(
-        f"""
-        You are a PMP-certified project manager.
-
-        ## Project
-        {req.project_name}
-
-        ## Context
-        (High-level goals / feedback)
-        ```json
-        {timeline_json}
-        ```
-
-        ## Task
-        Create an Agile roadmap for three 1-week sprints.
-        Columns: milestone,start,end,owners (comma-separated owner names).
-
-        ## Output Rules
-        * Return exactly one fenced-code block labelled `csv:title=schedule.csv`.
-        * No Markdown outside the code block.
-        """
-    ).strip()
-
-    csv_result: str = await call_generative_ai(
-        model=req.model_name,
-        prompt=prompt,
-        max_tokens=16_384,
+    user_suffix = _build_user_suffix(req)
+
+    csv_result: str = await llm_cache.get_or_call(
+        user_suffix,
+        req.model_name,
+        lambda: call_generative_ai(
+            model=req.model_name,
+            cached_prefix=_STATIC_PREFIX,
+            user_suffix=user_suffix,
+            **_GEN_PARAMS,
+        ),
+        namespace="project_manager",
+        params=_GEN_PARAMS,
+        prefix=_STATIC_PREFIX,
     )
 
     return {"schedule": csv_result}
+
+
+async def create_schedule_stream(req: ScheduleRequest) -> AsyncIterator[str]:
+    """
+    create_schedule のストリーミング版。CSV スケジュールの断片を到着順に yield する。
+    """
+    user_suffix = _build_user_suffix(req)
+    async for delta in llm_cache.stream_or_replay(
+        user_suffix,
+        req.model_name,
+        lambda: call_generative_ai_stream(
+            model=req.model_name,
+            cached_prefix=_STATIC_PREFIX,
+            user_suffix=user_suffix,
+            **_GEN_PARAMS,
+        ),
+        namespace="project_manager",
+        params=_GEN_PARAMS,
+        prefix=_STATIC_PREFIX,
+    ):
+        yield delta
@@ -7,7 +7,7 @@ agents.qa_agent.models
 """
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 class QARunRequest(BaseModel):
     """
@@ -17,12 +17,16 @@ class QARunRequest(BaseModel):
       • code         : Python ソースコード全文
       • ui           : HTML/CSS 等（省略可）
       • model_name   : LLM モデル名
+      • unchanged    : 直前のパッチでコードが変わっていない場合 True
     """
     project_name: str = Field(..., description="プロジェクト名")
     requirement:  str = Field(..., description="機能要件の説明")
     code:         str = Field(..., description="生成済み Python ソースコード")
     ui:           str = Field("",  description="生成済み UI (HTML/CSS 等)")
     model_name:   str = Field("o4-mini-high", description="利用 LLM モデル名")
+    unchanged:    bool = Field(False, description="直前のパッチで変更なし → mutmut / benchmark を省略")
+
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
 
 
 class QARunResponse(BaseModel):
@@ -31,3 +35,5 @@ class QARunResponse(BaseModel):
       • qa_report   : Markdown 形式の QA レポート（一番最後にテスト実行結果付き）
     """
     qa_report: str = Field(..., description="テスト実行結果を含む Markdown レポート")
+
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
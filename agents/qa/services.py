@@ -8,13 +8,71 @@ LLM にテストコードの生成と結果サマリーを依頼し，qa_report
 """
 from __future__ import annotations
 
+import re
 import textwrap
-from typing import Dict
+from typing import AsyncIterator, Dict
 
-from common.ai_service import call_generative_ai
+from common.ai_service import call_generative_ai, call_generative_ai_stream
+from common.llm_cache import llm_cache
+from common.prompt_template import PromptTemplate
 from .models import QARunRequest
 from .test_runner import run_tests  # ← テスト実行ユーティリティ
 
+# LLM 生成パラメータ (応答キャッシュのキーにも含める)
+_GEN_PARAMS = {"max_tokens": 16_384}
+
+# ── プロンプト (import 時に 1 度だけ dedent) ──────────────────────────────
+# 静的プレフィックス: 役割・出力仕様など全リクエスト共通 → プロバイダ側でキャッシュ
+# 動的サフィックス : リクエストごとの入力のみを埋め込む (PromptTemplate で事前分解)
+_STATIC_PREFIX = textwrap.dedent(
+    """
+    You are a senior QA engineer proficient in Python testing with pytest.
+
+    ## Task
+    1. Draft robust pytest tests covering edge cases and error handling.
+    2. Reason about likely failure points or anti-patterns.
+    3. Output a concise QA report in Japanese that includes:
+       - テスト方針の要約
+       - 生成したテストケース (pytest コード) fenced python:title=test_<name>.py
+       - 想定される不具合やリファクタリング提案
+    4. Wrap entire report in a single fenced code block labelled `md:title=qa_report.md`.
+    """
+).strip()
+
+_SUFFIX_TEMPLATE = PromptTemplate(textwrap.dedent(
+    """
+    ## Project
+    {project_name}
+
+    ## Functional Requirement
+    {requirement}
+
+    ## Source Code
+    ```python
+    {code}
+    ```
+    """
+).strip())
+
+
+# LLM レポート内の pytest コードブロック (```python:title=test_xxx.py ... ```)
+_TEST_BLOCK_RE = re.compile(r"```python[^\n]*\n(.*?)```", re.DOTALL)
+
+
+def _extract_test_code(report: str) -> str:
+    """レポートから pytest コードブロックを抽出して連結する。"""
+    return "\n\n".join(block.strip() for block in _TEST_BLOCK_RE.findall(report))
+
+
+def _build_user_suffix(req: QARunRequest) -> str:
+    """リクエスト固有の動的サフィックスを組み立てる。"""
+    return _SUFFIX_TEMPLATE.format(
+        project_name=req.project_name,
+        requirement=req.requirement,
+        code=req.code,
+    )
+
+
 async def run_qa(req: QARunRequest) -> Dict[str, str]:
     """
     1) LLM に QA レポート（テスト方針・pytest コード・不具合提案）を生成させる
@@ -22,41 +80,26 @@ async def run_qa(req: QARunRequest) -> Dict[str, str]:
     3) 最終レポートにテスト実行結果を追記して返却
     """
     # ── ① LLM に委ねる QA レポート生成 ─────────────────────────────────
-    prompt = textwrap.dedent(
-        f"""
-        You are a senior QA engineer proficient in Python testing with pytest.
-
-        ## Project
-        {req.project_name}
-
-        ## Functional Requirement
-        {req.requirement}
-
-        ## Source Code
-        ```python
-        {req.code}
-        ```
-
-        ## Task
-        1. Draft robust pytest tests covering edge cases and error handling.
-        2. Reason about likely failure points or anti-patterns.
-        3. Output a concise QA report in Japanese that includes:
-           - テスト方針の要約
-           - 生成したテストケース (pytest コード) fenced python:title=test_<name>.py
-           - 想定される不具合やリファクタリング提案
-        4. Wrap entire report in a single fenced code block labelled `md:title=qa_report.md`.
-        """
-    ).strip()
-
-    qa_report: str = await call_generative_ai(
-        model=req.model_name,
-        prompt=prompt,
-        max_tokens=16_384,
+    user_suffix = _build_user_suffix(req)
+
+    qa_report: str = await llm_cache.get_or_call(
+        user_suffix,
+        req.model_name,
+        lambda: call_generative_ai(
+            model=req.model_name,
+            cached_prefix=_STATIC_PREFIX,
+            user_suffix=user_suffix,
+            **_GEN_PARAMS,
+        ),
+        namespace="qa",
+        params=_GEN_PARAMS,
+        prefix=_STATIC_PREFIX,
     )
 
     # ── ② 実際に pytest を実行 ─────────────────────────────────────────
     #    テストコードは LLM レポート内のコードブロックから抽出する
-    test_output = run_tests(req.code)
+    test_result = await run_tests(req.code, _extract_test_code(qa_report), unchanged=req.unchanged)
+    test_output = test_result.get("markdown_report") or test_result.get("error", "")
 
     # ── ③ レポートにテスト実行結果を追記 ────────────────────────────────
     full_report = "\n".join([
@@ -67,3 +110,36 @@ async def run_qa(req: QARunRequest) -> Dict[str, str]:
     ])
 
     return {"qa_report": full_report}
+
+
+async def run_qa_stream(req: QARunRequest) -> AsyncIterator[str]:
+    """
+    run_qa のストリーミング版。QA レポートの断片を到着順に yield し、
+    生成完了後にテストを実行して結果ブロックを末尾に流す。
+    """
+    user_suffix = _build_user_suffix(req)
+    parts = []
+    async for delta in llm_cache.stream_or_replay(
+        user_suffix,
+        req.model_name,
+        lambda: call_generative_ai_stream(
+            model=req.model_name,
+            cached_prefix=_STATIC_PREFIX,
+            user_suffix=user_suffix,
+            **_GEN_PARAMS,
+        ),
+        namespace="qa",
+        params=_GEN_PARAMS,
+        prefix=_STATIC_PREFIX,
+    ):
+        parts.append(delta)
+        yield delta
+
+    test_result = await run_tests(req.code, _extract_test_code("".join(parts)), unchanged=req.unchanged)
+    test_output = test_result.get("markdown_report") or test_result.get("error", "")
+    yield "\n".join([
+        "",
+        "```text:title=test_results.txt",
+        test_output.strip(),
+        "```"
+    ])
@@ -9,7 +9,6 @@ agents.qa_agent.test_runner
  - Hypothesis ファズテスト
  - Pact 契約テスト
  - Locust 負荷テスト
- - Faker テストデータ生成
  - Playwright UIテスト
  - Chaos 工学による故障注入
  - Markdown & JSON レポート自動生成
@@ -18,19 +17,18 @@ agents.qa_agent.test_runner
 
 機能：
  1. source_code, test_code を一時ディレクトリに書き出し
- 2. flake8, mutmut, pytest, hypothesis, pact verifier, locust, playwright, chaos-tool を順次実行
+ 2. flake8, mutmut, pytest, hypothesis, pact verifier, locust, playwright, chaos-tool を
+    asyncio サブプロセスで実行 (互いに独立なツールは並行実行)
  3. Coverage JSON/HTML, JUnit XML, ベンチマーク JSON, ファズ統計、契約検証結果、負荷レポート、UIテストレポートを収集
- 4. Faker でモックデータを生成しテストに供給
- 5. Markdown レポートをまとめ出力
- 6. run.log に生出力を保存
- 7. リトライ & タイムアウト機構
+ 4. Markdown レポートをまとめ出力
+ 5. run.log に生出力を保存
+ 6. リトライ & タイムアウト機構
 """
-import subprocess
+import asyncio
 import tempfile
 import os
-import time
-from typing import Dict, Any
-from faker import Faker  # テストデータ生成
+import textwrap
+from typing import Dict, Any, List, Sequence, Tuple
 
 # 再試行設定
 _MAX_RETRIES = 2
@@ -55,101 +53,181 @@ PLAYWRIGHT_CMD_TEMPLATE = ["playwright", "test", "--reporter=html"]
 CHAOS_CMD_TEMPLATE      = ["chaos-tool", "inject", "--target=app.py", "--latency=100ms,fail=0.1"]
 
 
-def run_tests(
+# 実行ステージ定義
+#  - 並行グループ : app.py を読むだけで互いに依存しないツール
+#  - 直列チェーン : pytest 系 (coverage / .pytest_cache を共有するため順次実行)
+#  - 後段         : app.py を書き換える mutmut / chaos は他ツール完了後に実行
+_CONCURRENT_STEPS: List[Tuple[str, Sequence[str]]] = [
+    ("Flake8 Lint",    FLAKE8_CMD_TEMPLATE),
+    ("Contract Tests", PACT_CMD_TEMPLATE),
+    ("Load Tests",     LOCUST_CMD_TEMPLATE),
+    ("UI Tests",       PLAYWRIGHT_CMD_TEMPLATE),
+]
+_PYTEST_CHAIN: List[Tuple[str, Sequence[str]]] = [
+    ("Pytest",         PYTEST_CMD_TEMPLATE),
+    ("Benchmark",      BENCH_CMD_TEMPLATE),
+    ("Fuzz Tests",     FUZZ_CMD_TEMPLATE),
+]
+_MUTATING_STEPS: List[Tuple[str, Sequence[str]]] = [
+    ("Mutmut",         MUTMUT_CMD_TEMPLATE),
+    ("Chaos Inject",   CHAOS_CMD_TEMPLATE),
+]
+# コードが前回から変わっていない (パッチで変更なし) 場合に省略する重いステップ
+_SLOW_STEPS = frozenset({"Mutmut", "Benchmark"})
+# レポート上の表示順 (従来の直列実行順を維持)
+_REPORT_ORDER = [
+    "Flake8 Lint", "Mutmut", "Pytest", "Benchmark", "Fuzz Tests",
+    "Contract Tests", "Load Tests", "UI Tests", "Chaos Inject",
+]
+
+
+# Hypothesis ファズテスト雛形 (実行時の埋め込みは無いので import 時に 1 度だけ構築)
+FUZZ_TEST_SRC = textwrap.dedent('''
+    import hypothesis.strategies as st
+    from hypothesis import given, settings
+    import app
+
+    @settings(max_examples=50)
+    @given(st.text())
+    def test_fuzz_input(data):
+        """
+        ファズテスト: ランダム文字列を app.main に入力し、例外が発生しないことを確認
+        """
+        try:
+            app.main(data)
+        except Exception as e:
+            # 失敗時は詳細ログと共に例外を再送出
+            raise AssertionError(f'Error on input: {data} -> {e}')
+''')
+
+
+async def _run_cmd(name: str, cmd: Sequence[str], cwd: str, env: Dict[str, str], timeout: int) -> Tuple[str, str]:
+    """
+    1 コマンドをサブプロセスで実行し (name, 出力) を返す。
+    タイムアウト時はプロセスを kill して asyncio.TimeoutError を送出。
+    """
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=cwd,
+            env=env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+    except FileNotFoundError:
+        return name, f"{cmd[0]}: command not found"
+
+    try:
+        out, _ = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        # 子プロセスを残さない (一時ディレクトリ削除前に必ず回収)
+        proc.kill()
+        await proc.wait()
+        raise
+    return name, out.decode("utf-8", errors="replace")
+
+
+def _write_file(path: str, text: str) -> None:
+    """
+    os.open / os.write で直接書き出す (TextIOWrapper を介さない)。
+    一時ディレクトリ内のファイルなので権限は所有者のみ (0o600)。
+    """
+    data = text.encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+async def _run_sequential(steps, cwd, env, timeout) -> List[Tuple[str, str]]:
+    return [await _run_cmd(name, cmd, cwd, env, timeout) for name, cmd in steps]
+
+
+async def _gather_or_cancel(*coros) -> List[Any]:
+    """
+    asyncio.gather と同様だが、1 つでも失敗したら残りのタスクをキャンセルして
+    子プロセスを回収してから例外を再送出する。
+    """
+    tasks = [asyncio.ensure_future(c) for c in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def run_tests(
     source_code: str,
     test_code: str,
     timeout: int = _TIMEOUT,
-    retries: int = _MAX_RETRIES
+    retries: int = _MAX_RETRIES,
+    *,
+    unchanged: bool = False,
 ) -> Dict[str, Any]:
     """
     統合テストランナーエントリーポイント
     - 各種テスト／解析ツールを実行し結果を収集
+    - 独立したツールは並行実行し、壁時計時間を「依存チェーンの最大値」に短縮
+    - unchanged=True (直前のパッチで変更なし) の場合は mutmut / benchmark を省略
     """
-    faker = Faker()
-    for attempt in range(1, retries + 1):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # ファイル配置先
-            app_py  = os.path.join(tmpdir, "app.py")
-            test_py = os.path.join(tmpdir, "test_app.py")
-            fuzz_py = os.path.join(tmpdir, "fuzz_tests.py")
-            # 環境変数設定
-            env = os.environ.copy()
-            env["PYTHONPATH"] = tmpdir + os.pathsep + env.get("PYTHONPATH", "")
-
-            # ソースコードとテストコードを書き出し
-            with open(app_py,  "w", encoding="utf-8") as f:
-                f.write(source_code)
-            with open(test_py, "w", encoding="utf-8") as f:
-                f.write(test_code)
-
-            # Hypothesis ファズテスト雛形生成
-            with open(fuzz_py, "w", encoding="utf-8") as fz:
-                fz.write(_generate_fuzz_test(source_code, faker))
-
-            # 実行ステップ一覧
-            commands = [
-                ("Flake8 Lint",    FLAKE8_CMD_TEMPLATE),
-                ("Mutmut",         MUTMUT_CMD_TEMPLATE),
-                ("Pytest",         PYTEST_CMD_TEMPLATE),
-                ("Benchmark",      BENCH_CMD_TEMPLATE),
-                ("Fuzz Tests",     FUZZ_CMD_TEMPLATE),
-                ("Contract Tests", PACT_CMD_TEMPLATE),
-                ("Load Tests",     LOCUST_CMD_TEMPLATE),
-                ("UI Tests",       PLAYWRIGHT_CMD_TEMPLATE),
-                ("Chaos Inject",   CHAOS_CMD_TEMPLATE),
-            ]
-
-            logs = []
+    skipped = _SLOW_STEPS if unchanged else frozenset()
+    pytest_chain = [s for s in _PYTEST_CHAIN if s[0] not in skipped]
+    mutating_steps = [s for s in _MUTATING_STEPS if s[0] not in skipped]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # ファイル配置先
+        app_py  = os.path.join(tmpdir, "app.py")
+        test_py = os.path.join(tmpdir, "test_app.py")
+        fuzz_py = os.path.join(tmpdir, "fuzz_tests.py")
+        # 環境変数設定
+        env = os.environ.copy()
+        env["PYTHONPATH"] = tmpdir + os.pathsep + env.get("PYTHONPATH", "")
+
+        # ソースコード・テストコード・ファズテスト雛形は 1 度だけ書き出す
+        _write_file(app_py, source_code)
+        _write_file(test_py, test_code)
+        _write_file(fuzz_py, FUZZ_TEST_SRC)
+
+        # リトライ対象はサブプロセス実行のみ
+        for attempt in range(1, retries + 1):
+            mutating_started = False
             try:
-                for name, cmd in commands:
-                    proc = subprocess.run(
-                        cmd,
-                        cwd=tmpdir,
-                        env=env,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.STDOUT,
-                        text=True,
-                        timeout=timeout
-                    )
-                    logs.append(f"=== {name} ===\n{proc.stdout or ''}")
+                # ① 独立ツール群 ‖ pytest チェーン を並行実行
+                concurrent = [
+                    _run_cmd(name, cmd, tmpdir, env, timeout) for name, cmd in _CONCURRENT_STEPS
+                ]
+                *independent, chain = await _gather_or_cancel(
+                    *concurrent,
+                    _run_sequential(pytest_chain, tmpdir, env, timeout),
+                )
+                # ② app.py を書き換えるツールは最後に直列実行
+                mutating_started = True
+                mutating = await _run_sequential(mutating_steps, tmpdir, env, timeout)
+
+                outputs = dict([*independent, *chain, *mutating])
+                outputs.update((name, "skipped (code unchanged since last run)") for name in skipped)
+                logs = [f"=== {name} ===\n{outputs[name]}" for name in _REPORT_ORDER]
 
                 # 全ステップ完了後に結果を返却
                 return _collect_results(tmpdir, logs)
 
-            except subprocess.TimeoutExpired:
+            except asyncio.TimeoutError:
                 if attempt < retries:
-                    time.sleep(1)
+                    # mutmut / chaos を kill した場合は変異体が残り得るので app.py のみ復元
+                    if mutating_started:
+                        _write_file(app_py, source_code)
+                    await asyncio.sleep(1)
                     continue
                 return {"error": f"Timeout after {timeout}s"}
 
     return {"error": "Failed after retries"}
 
 
-def _generate_fuzz_test(source_code: str, faker: Faker) -> str:
-    """
-    簡易 Hypothesis テストコードを動的生成
-    - source_code を解析して主要関数を検出し、そのシグネチャに合わせてテスト生成可能
-    - Faker を使いランダムデータ生成をサポート
-    """
-    return f"""
-import hypothesis.strategies as st
-from hypothesis import given, settings
-import app
-
-@settings(max_examples=50)
-@given(st.text())
-def test_fuzz_input(data):
-    \"\"\"
-    ファズテスト: ランダム文字列を app.main に入力し、例外が発生しないことを確認
-    \"\"\"
-    try:
-        app.main(data)
-    except Exception as e:
-        # 失敗時は詳細ログと共に例外を再送出
-        raise AssertionError(f'Error on input: {{data}} -> {{e}}')
-"""
-
-
 def _collect_results(tmpdir: str, logs: list[str]) -> Dict[str, Any]:
     """
     ログと成果物をまとめて返却
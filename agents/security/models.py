@@ -9,14 +9,18 @@ Pydantic モデル定義：
 """
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 class SecurityScanRequest(BaseModel):
     code:       str = Field(..., description="Python ソースコード全文")
     ui:         str = Field("",  description="生成済み UI (HTML/CSS/JS)",  max_length=100_000)
     model_name: str = Field("o4-mini-high", description="利用 LLM モデル名")
 
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
+
 class SecurityScanResponse(BaseModel):
     security_report: str = Field(..., description="静的解析レポート (Markdown)")
     # 将来、構造化結果を追加する場合の例：
     # scan_summary: Optional[Dict[str, Any]] = Field(None, description="構造化スキャン結果")
+
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
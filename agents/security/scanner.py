@@ -5,19 +5,35 @@ agents.security_agent.scanner
 ────────────────────────────────────────────────────────────────────────────
 高度拡張版 静的解析ユーティリティ。
 - AST/regex による危険パターン検出
-- Bandit, Radon, pip-audit 連携
+- Bandit (プロセス内 API・AST 共有), Radon, pip-audit 連携
 - JSON と Markdown 両対応でレポート出力
 - ユーザ設定ファイルでルールの ON/OFF 切り替え可能
 """
 
 import ast
-import json
+import asyncio
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
 import re
-import subprocess
-import tempfile
-import toml
-from radon.complexity import cc_visit
-from typing import Any, Dict, List, Tuple
+import sys
+import time
+import tokenize
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import orjson
+
+# radon / bandit / toml / subprocess / tempfile は使用する関数内で遅延 import する
+# (設定で無効化された機能の import コストをワーカー起動時に払わない。bandit は約 80ms)
+try:
+    import tomllib  # Python 3.11+: 標準ライブラリ (サードパーティ toml の import コストを払わない)
+except ImportError:  # pragma: no cover - 3.10 以前は toml にフォールバック
+    tomllib = None
 
 # -----------------------------------------------------------------------------
 # 設定読み込み
@@ -32,9 +48,18 @@ DEFAULT_CONFIG = {
     "enable_hardcoded_urls": True,
 }
 
-def load_config(path: str = "scanner_config.toml") -> Dict[str, Any]:
+CONFIG_PATH = os.getenv("SCANNER_CONFIG", "scanner_config.toml")
+
+
+def load_config(path: str = CONFIG_PATH) -> Dict[str, Any]:
+    """設定ファイルを読み込む (import 時に 1 度だけ呼ばれ、結果は config に保持)"""
     try:
-        cfg = toml.load(path)
+        if tomllib is not None:
+            with open(path, "rb") as fp:
+                cfg = tomllib.load(fp)
+        else:  # pragma: no cover
+            import toml
+            cfg = toml.load(path)
         return {**DEFAULT_CONFIG, **cfg.get("scanner", {})}
     except FileNotFoundError:
         return DEFAULT_CONFIG
@@ -51,129 +76,458 @@ _AST_DANGEROUS_CALLS = [
     ("subprocess", "コマンドインジェクション: subprocess の使用"),
     ("yaml.load", "デシリアライズ攻撃: yaml.load (safe_load推奨)"),
 ]
+# 呼び出し名 → (rule, desc)。Call ノードごとに dict.get 1～2 回で判定する
+#   - eval(...)           : 関数名 "eval"
+#   - os.system(...)      : "<モジュール>.<属性>" = "os.system"
+#   - subprocess.run(...) : モジュール名 "subprocess" (モジュール単位のルール)
+_AST_RULES: Dict[str, Tuple[str, str]] = {rule: (rule, desc) for rule, desc in _AST_DANGEROUS_CALLS}
 
+# ソース全体に対して 1 パターン 1 回 finditer するため、空白は改行を跨がない [^\S\n] に限定
+# (`.` も改行に一致しないので、各マッチは従来の行単位 search と同じく 1 行内に収まる)
+# 入力 (req.code) は外部から届くため、どのパターンも入力長に対して線形で終わる形にする:
+#   - 可変長部分は否定文字クラス + 上限付き反復 ({0,512} 等) とし、.* の入れ子を作らない
+#   - 開始位置は固定リテラル (必要なら語境界) で絞り、失敗時の再試行コストを定数に抑える
+#   - SQL は行頭アンカー + 最初の引用符に固定し、引用符ごとの行末までの再走査をなくす
 _REGEX_PATTERNS = [
-    (re.compile(r"https?://", re.IGNORECASE),    "HTTP 通信: URL が HTTP/HTTPS で開始"),
-    (re.compile(r"verify\s*=\s*False"),         "TLS 検証回避: verify=False が検出"),
-    (re.compile(r"(AKIA|ASIA)[A-Z0-9]{16}"),     "AWSキー形式がハードコード"),
-    (re.compile(r"(?:api_key|password|secret)\s*=\s*['\"].+['\"]", re.IGNORECASE),
+    (re.compile(r"\bhttps?://", re.IGNORECASE),  "HTTP 通信: URL が HTTP/HTTPS で開始"),
+    (re.compile(r"verify[^\S\n]{0,64}=[^\S\n]{0,64}False\b"),
+                                               "TLS 検証回避: verify=False が検出"),
+    (re.compile(r"\b(?:AKIA|ASIA)[A-Z0-9]{16}"), "AWSキー形式がハードコード"),
+    (re.compile(r"(?:api_key|password|secret)[^\S\n]{0,64}=[^\S\n]{0,64}['\"][^'\"\n]{1,256}['\"]",
+                re.IGNORECASE),
                                                "ハードコードされたシークレット"),
-    (re.compile(r"['\"].*;\s*(SELECT|INSERT|UPDATE|DELETE)\b", re.IGNORECASE),
+    (re.compile(r"^[^'\"\n]*['\"][^\n]*?;[^\S\n]*(?:SELECT|INSERT|UPDATE|DELETE)\b",
+                re.IGNORECASE | re.MULTILINE),
                                                "SQL インジェクション疑い"),
-    (re.compile(r"cors_allowed_origins\s*=\s*\[.*\*.*\]"), 
+    (re.compile(r"\bcors_allowed_origins[^\S\n]{0,64}=[^\S\n]{0,64}\[[^\]\n*]{0,512}\*[^\]\n]{0,512}\]"),
                                                "CORS 設定: ワイルドカード許可"),
 ]
 
 # -----------------------------------------------------------------------------
 # 各種スキャナ／ツール呼び出し
 # -----------------------------------------------------------------------------
-def run_bandit(source: str) -> str:
-    """Bandit CLI を呼び出し"""
+_BANDIT_CONFIG = None  # BanditConfig は設定ファイル非依存なので 1 度だけ生成
+_BANDIT_FNAME = "app.py"
+_bandit_api: Any = None  # None = 未ロード / False = bandit 未導入 / (config, manager, visitor)
+
+
+def _load_bandit() -> Optional[Tuple[Any, Any, Any]]:
+    """
+    Bandit の Python API を初回呼び出し時に import する。
+    未導入なら None を返し、呼び出し側は CLI にフォールバックする。
+    """
+    global _bandit_api
+    if _bandit_api is None:
+        try:
+            # Bandit をプロセス内で実行 (CLI 起動 = インタプリタ起動 + import を毎回払わない)
+            from bandit.core import config as b_config
+            from bandit.core import manager as b_manager
+            from bandit.core.node_visitor import BanditNodeVisitor
+            # ファイル名からモジュール名を解決できない旨の警告を抑止 (メモリ上のソースのため)
+            logging.getLogger("bandit").setLevel(logging.ERROR)
+            _bandit_api = (b_config, b_manager, BanditNodeVisitor)
+        except ImportError:  # pragma: no cover - bandit 未導入時は CLI にフォールバック
+            _bandit_api = False
+    return _bandit_api or None
+
+
+def _bandit_nosec_lines(data: bytes, b_manager: Any) -> Dict[int, Any]:
+    """# nosec コメントを行番号ごとに収集 (CLI と同じ扱い)"""
+    nosec: Dict[int, Any] = {}
+    try:
+        for toktype, tokval, (lineno, _), _, _ in tokenize.tokenize(io.BytesIO(data).readline):
+            if toktype == tokenize.COMMENT:
+                nosec[lineno] = b_manager._parse_nosec_comment(tokval)
+    except tokenize.TokenError:
+        pass
+    return nosec
+
+
+def _format_bandit_issue(issue: Any) -> str:
+    """Bandit テキストフォーマッタ相当の 1 件分表示"""
+    return "\n".join([
+        f">> Issue: [{issue.test_id}:{issue.test}] {issue.text}",
+        f"   Severity: {issue.severity}   Confidence: {issue.confidence}",
+        f"   CWE: {issue.cwe}",
+        f"   Location: {_BANDIT_FNAME}:{issue.lineno}:{issue.col_offset}",
+    ])
+
+
+def _run_bandit_cli(source: str) -> str:
+    """
+    Bandit CLI を呼び出し (bandit の Python API が使えない環境向け)
+    - 一時ファイルは mkstemp の fd へ os.write で直接書き込み (テキスト I/O 層を経由しない)
+    - 実行後は必ず削除する (以前は delete=False のまま残り続けていた)
+    """
+    import subprocess
+    import tempfile
+
+    fd, tmp_path = tempfile.mkstemp(suffix=".py")
+    try:
+        try:
+            os.write(fd, source.encode("utf-8"))
+        finally:
+            os.close(fd)
+        res = subprocess.run(
+            ["bandit", "-q", "-r", tmp_path],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, timeout=30
+        )
+    except FileNotFoundError:
+        return "Bandit: command not found"
+    finally:
+        os.unlink(tmp_path)
+    return res.stdout.strip() or "Bandit: 問題なし"
+
+
+def run_bandit(source: str, tree: Optional[ast.AST] = None) -> str:
+    """
+    Bandit をプロセス内で実行。
+    tree に run_static_scans で parse 済みの AST を渡すと再 parse しない。
+    """
+    global _BANDIT_CONFIG
     if not config["enable_bandit"]:
         return "Bandit スキャン: 無効"
-    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as tmp:
-        tmp.write(source)
-        tmp_path = tmp.name
-    res = subprocess.run(
-        ["bandit", "-q", "-r", tmp_path],
-        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, timeout=30
+    api = _load_bandit()
+    if api is None:
+        return _run_bandit_cli(source)
+    b_config, b_manager, BanditNodeVisitor = api
+
+    if tree is None:
+        try:
+            tree = ast.parse(source)
+        except SyntaxError as e:
+            return f"Bandit: 構文エラーのためスキップ ({e})"
+
+    if _BANDIT_CONFIG is None:
+        _BANDIT_CONFIG = b_config.BanditConfig()
+    mgr = b_manager.BanditManager(_BANDIT_CONFIG, "file", quiet=True)
+
+    data = source.encode("utf-8")
+    mgr.metrics.begin(_BANDIT_FNAME)
+    visitor = BanditNodeVisitor(
+        _BANDIT_FNAME, io.BytesIO(data), mgr.b_ma, mgr.b_ts,
+        False, _bandit_nosec_lines(data, b_manager), mgr.metrics,
     )
-    return res.stdout.strip() or "Bandit: 問題なし"
+    # BanditNodeVisitor.process() から ast.parse を除いたもの
+    visitor.generic_visit(tree)
+    visitor.context = {
+        "file_data": visitor.fdata,
+        "filename": _BANDIT_FNAME,
+        "lineno": 0,
+        "linerange": [0, 1],
+        "col_offset": 0,
+    }
+    visitor.update_scores(visitor.tester.run_tests(visitor.context, "File"))
+
+    issues = visitor.tester.results
+    if not issues:
+        return "Bandit: 問題なし"
+    return "\n".join(_format_bandit_issue(i) for i in issues)
 
-def run_radon(source: str) -> List[Tuple[str,int,int]]:
-    """radon Cyclomatic Complexity 分析"""
-    if not config["enable_complexity"]:
+def run_radon(tree: Optional[ast.AST]) -> List[Tuple[str,int,int]]:
+    """radon Cyclomatic Complexity 分析 (parse 済み AST を受け取り再 parse しない)"""
+    if not config["enable_complexity"] or tree is None:
         return []
+    from radon.complexity import cc_visit_ast
+
     results = []
     try:
-        for block in cc_visit(source):
+        for block in cc_visit_ast(tree):
             if block.complexity > config["complexity_threshold"]:
                 results.append((block.name, block.lineno, block.complexity))
     except Exception:
         pass
     return results
 
-def run_dependency_audit() -> str:
-    """pip-audit を呼び出し、依存性脆弱性をチェック"""
+# pip-audit の結果は req.code ではなく実行環境 (sys.prefix) のみに依存するためプロセス内でキャッシュ
+_AUDIT_TTL = float(os.getenv("PIP_AUDIT_TTL", "600"))  # 秒
+_AUDIT_TIMEOUT = 60  # 秒
+_audit_cache: Dict[str, Tuple[float, str]] = {}
+_audit_inflight: Dict[str, "asyncio.Task[str]"] = {}
+
+
+async def _run_pip_audit() -> str:
+    """pip-audit をイベントループを塞がずに実行"""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "pip-audit", "--format", "json",
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+        )
+    except FileNotFoundError:
+        return "pip-audit: command not found"
+    try:
+        out, _ = await asyncio.wait_for(proc.communicate(), timeout=_AUDIT_TIMEOUT)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        proc.kill()
+        await proc.wait()
+        raise
+    return out.decode("utf-8", errors="replace").strip() or "pip-audit: 問題なし"
+
+
+async def run_dependency_audit() -> str:
+    """
+    pip-audit を呼び出し、依存性脆弱性をチェック。
+    結果は sys.prefix 単位で _AUDIT_TTL 秒キャッシュし、
+    同時に来たリクエストは実行中の 1 プロセスの結果を待ち合わせる。
+    """
     if not config["enable_dependency_audit"]:
         return "Dependency Audit: 無効"
-    # pip-audit 呼び出し
-    pip_res = subprocess.run(
-        ["pip-audit", "--format", "json"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-        text=True, timeout=60
-    )
-    return pip_res.stdout.strip() or "pip-audit: 問題なし"
+
+    key = sys.prefix
+    hit = _audit_cache.get(key)
+    if hit is not None and hit[0] > time.monotonic():
+        return hit[1]
+
+    task = _audit_inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_run_pip_audit())
+        _audit_inflight[key] = task
+        task.add_done_callback(lambda _t: _audit_inflight.pop(key, None))
+    try:
+        # 呼び出し元がキャンセルされても共有タスクは止めない
+        result = await asyncio.shield(task)
+    except asyncio.TimeoutError:
+        return f"pip-audit: Timeout after {_AUDIT_TIMEOUT}s"
+    _audit_cache[key] = (time.monotonic() + _AUDIT_TTL, result)
+    return result
 
 # -----------------------------------------------------------------------------
 # メインスキャン関数
 # -----------------------------------------------------------------------------
-def run_static_scans(source: str, output_json: bool = False) -> Any:
+_DOCSTRING_OWNERS = (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def _scan_tree(tree: ast.AST) -> Tuple[List[Dict[str, Any]], Set[int]]:
     """
-    拡張静的解析を実行し、JSON か Markdown で要約結果を返す。
+    AST を ast.walk で 1 回だけ平坦に走査し、次の 2 つを同時に集める。
+    - _AST_RULES に該当する呼び出し (行番号順)
+    - docstring が占める行番号 (Regex チェックの対象外にする)
+      定義行と同じ行に書かれた 1 行 docstring は、同じ行のコードを
+      見逃さないよう除外しない
+    """
+    found = []
+    doc_lines: Set[int] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Name):
+                hit = _AST_RULES.get(func.id)
+            elif isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+                mod = func.value.id
+                hit = _AST_RULES.get(f"{mod}.{func.attr}") or _AST_RULES.get(mod)
+            else:
+                hit = None
+            if hit is not None:
+                found.append((node.lineno, node.col_offset, hit))
+        elif isinstance(node, _DOCSTRING_OWNERS) and node.body:
+            first = node.body[0]
+            if (
+                isinstance(first, ast.Expr)
+                and isinstance(first.value, ast.Constant)
+                and isinstance(first.value.value, str)
+                and first.lineno != getattr(node, "lineno", 0)
+            ):
+                doc_lines.update(range(first.lineno, first.end_lineno + 1))
+    found.sort(key=lambda t: t[:2])  # ast.walk は幅優先のため出現順に並べ直す
+    calls = [
+        {"type": "AST", "rule": rule, "desc": desc, "line": lineno}
+        for lineno, _, (rule, desc) in found
+    ]
+    return calls, doc_lines
+
+
+def _scan_regex(source: str, skip_lines: Set[int] = frozenset()) -> List[Dict[str, Any]]:
+    """
+    _REGEX_PATTERNS をソース全体へ 1 パターン 1 回だけ適用する。
+    マッチ位置は昇順に並べ、直前のマッチからの改行数を str.count (C 実装) で
+    加算して行番号へ変換する。全行の開始オフセット表は作らないため、
+    追加コストは「マッチ件数」分の Python 処理だけで済む。
+    (行, パターン) 単位で重複を除いて従来と同じ並び順で返す。
+    skip_lines (docstring 行) に落ちたマッチは報告しない。
+
+    ※ 全パターンを 1 本の選択 (?P<r0>...)|(?P<r1>...) に結合する方式は採らない。
+      CPython の re は選択肢をまたいだリテラル前置フィルタを持たず、実測で
+      パターン別 finditer の約 2 倍遅い。また先行マッチが消費した範囲に含まれる
+      他ルールのマッチを取りこぼし、IGNORECASE も全枝へ波及する。
+    """
+    matches = sorted(
+        (m.start(), idx)
+        for idx, (patt, _) in enumerate(_REGEX_PATTERNS)
+        for m in patt.finditer(source)
+    )
+    hits = set()
+    lineno, prev = 1, 0
+    for pos, idx in matches:
+        lineno += source.count("\n", prev, pos)
+        prev = pos
+        if lineno not in skip_lines:
+            hits.add((lineno, idx))
+    return [
+        {"type": "Regex", "desc": _REGEX_PATTERNS[idx][1], "line": lineno}
+        for lineno, idx in sorted(hits)
+    ]
+
+
+def _analyze_source(source: str) -> Tuple[Tuple[Dict[str, Any], ...], str]:
+    """
+    ソースのみに依存する解析 (AST / Regex / Radon / Bandit) をまとめて実行。
+    - ast.parse は 1 回だけ行い、AST 検査・Radon・Bandit で共有する
+    - CPU バウンドな同期処理のため、_analyze_source_async からプロセスプールで呼ばれる
     """
     findings: List[Dict[str,Any]] = []
 
-    # AST チェック
-    if config["enable_ast_checks"]:
-        try:
-            tree = ast.parse(source)
-            class Visitor(ast.NodeVisitor):
-                def visit_Call(self, node):
-                    name = getattr(node.func, 'id', None) or getattr(node.func, 'attr', None)
-                    for rule, desc in _AST_DANGEROUS_CALLS:
-                        if rule in (name or ""):
-                            findings.append({"type":"AST","rule":rule,"desc":desc,"line":node.lineno})
-                    self.generic_visit(node)
-            Visitor().visit(tree)
-        except SyntaxError as e:
+    tree: Optional[ast.AST] = None
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        if config["enable_ast_checks"]:
             findings.append({"type":"SyntaxError","desc":str(e),"line":e.lineno or 0})
 
-    # Regex チェック
+    # AST チェック (docstring 行の収集も同じ走査で行う)
+    doc_lines: Set[int] = set()
+    if tree is not None:
+        calls, doc_lines = _scan_tree(tree)
+        if config["enable_ast_checks"]:
+            findings.extend(calls)
+
+    # Regex チェック (docstring 内の例示コード等は誤検知になるため除外)
     if config["enable_regex_checks"]:
-        for lineno, line in enumerate(source.splitlines(),1):
-            for patt, desc in _REGEX_PATTERNS:
-                if patt.search(line):
-                    findings.append({"type":"Regex","desc":desc,"line":lineno})
+        findings.extend(_scan_regex(source, doc_lines))
 
     # Radon 複雑度
-    radon_issues = run_radon(source)
+    radon_issues = run_radon(tree)
     for name, lineno, comp in radon_issues:
         findings.append({"type":"Complexity","desc":f"{name} complexity={comp}","line":lineno})
 
     # Bandit スキャン
-    bandit_output = run_bandit(source)
+    bandit_output = run_bandit(source, tree)
+
+    return tuple(findings), bandit_output
+
+
+# -----------------------------------------------------------------------------
+# 解析のオフロード (プロセスプール + LRU キャッシュ)
+# -----------------------------------------------------------------------------
+_POOL_WORKERS = int(os.getenv("SCANNER_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+_ANALYSIS_CACHE_SIZE = 512
+_pool: Optional[ProcessPoolExecutor] = None
+_AnalysisResult = Tuple[Tuple[Dict[str, Any], ...], str]
+_analysis_cache: "OrderedDict[bytes, _AnalysisResult]" = OrderedDict()
+_analysis_inflight: Dict[bytes, "asyncio.Task[_AnalysisResult]"] = {}
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    解析用プロセスプールを初回利用時に生成し、以後は使い回す。
+    - spawn で起動 (OTel 等のスレッドを抱えた親プロセスを fork しない)。
+      子は scanner モジュールだけを import し、重い依存は遅延 import される
+    - SCANNER_POOL_WORKERS=0 ならプールを作らず、asyncio.to_thread で実行
+    """
+    global _pool
+    if _pool is None and _POOL_WORKERS > 0:
+        _pool = ProcessPoolExecutor(
+            max_workers=_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    """プロセスプールを停止する (FastAPI lifespan 終了時)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _analysis_key(source: str) -> bytes:
+    """
+    解析キャッシュのキー: BLAKE2b(ソース + 有効な設定)。
+    - ソース本文をキーとして保持しない (1 MiB 級の入力を 512 件抱え込まない)
+    - config の ON/OFF・閾値が変わればキーも変わり、古い結果は使われない
+    """
+    h = hashlib.blake2b(source.encode("utf-8", "surrogatepass"), digest_size=16)
+    h.update(repr(sorted(config.items())).encode())
+    return h.digest()
+
+
+async def _run_analysis(source: str) -> _AnalysisResult:
+    """
+    _analyze_source をプロセスプールで実行する。
+    プール無効 (SCANNER_POOL_WORKERS=0) 時は asyncio.to_thread で実行し、
+    contextvars (OTel のトレースコンテキスト等) をワーカースレッドへ引き継ぐ。
+    """
+    pool = _get_pool()
+    if pool is None:
+        return await asyncio.to_thread(_analyze_source, source)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, _analyze_source, source)
+    except BrokenProcessPool:
+        shutdown_pool()
+        raise
+
+
+async def _analyze_source_async(source: str) -> _AnalysisResult:
+    """
+    _analyze_source をイベントループ外で実行し、結果を LRU キャッシュする。
+    - 同一ソースの再スキャン (CI 再実行・パッチループで変更なし等) はキャッシュから返す
+      (AST はメモリ節約のためキャッシュしない)
+    - 同一ソースの同時リクエストは実行中の 1 件の結果を待ち合わせる
+    - ワーカー異常終了でプールが壊れた場合は破棄し、次回呼び出しで作り直す
+    """
+    key = _analysis_key(source)
+    hit = _analysis_cache.get(key)
+    if hit is not None:
+        _analysis_cache.move_to_end(key)
+        return hit
+
+    task = _analysis_inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_run_analysis(source))
+        _analysis_inflight[key] = task
+        task.add_done_callback(lambda _t: _analysis_inflight.pop(key, None))
+    # 呼び出し元がキャンセルされても共有タスクは止めない
+    result = await asyncio.shield(task)
+
+    _analysis_cache[key] = result
+    _analysis_cache.move_to_end(key)
+    while len(_analysis_cache) > _ANALYSIS_CACHE_SIZE:
+        _analysis_cache.popitem(last=False)
+    return result
+
+
+async def run_static_scans(source: str, output_json: bool = False) -> Any:
+    """
+    拡張静的解析を実行し、JSON か Markdown で要約結果を返す。
+    """
+    cached_findings, bandit_output = await _analyze_source_async(source)
 
     # 依存性スキャン
-    dep_output = run_dependency_audit()
+    dep_output = await run_dependency_audit()
 
     # レポート整形
     if output_json:
         return {
-            "findings": findings,
+            "findings": [dict(f) for f in cached_findings],  # キャッシュ内容を呼び出し側に触らせない
             "bandit": bandit_output,
-            "dependencies": json.loads(dep_output) if dep_output.startswith("[") else dep_output
+            # pip-audit --format json は版により配列 / オブジェクトのどちらも返す
+            "dependencies": orjson.loads(dep_output) if dep_output[:1] in ("[", "{") else dep_output
         }
 
-    # Markdown レポート
+    # Markdown レポート (キャッシュ済み findings は読むだけなのでコピーしない)
     lines: List[str] = []
-    if findings:
+    if cached_findings:
         lines.append("## 検出結果")
-        for f in findings:
-            lines.append(f"- [{f['type']}] (行{f['line']}) {f['desc']}")
+        lines.extend(f"- [{f['type']}] (行{f['line']}) {f['desc']}" for f in cached_findings)
         lines.append("")
     else:
         lines.append("## 検出結果: 問題なし")
 
-    lines.append("## Bandit スキャン結果")
-    lines.append(f"```text\n{bandit_output}\n```")
-    lines.append("")
-    lines.append("## Dependency Audit 結果")
-    if isinstance(dep_output, str):
-        lines.append(f"```text\n{dep_output}\n```")
-    else:
-        lines.append("```json")
-        lines.append(json.dumps(dep_output, ensure_ascii=False, indent=2))
-        lines.append("```")
-
-    report = "\n".join(lines)
-    return report
+    lines.extend((
+        "## Bandit スキャン結果",
+        "```text", bandit_output, "```",
+        "",
+        "## Dependency Audit 結果",
+        "```text", dep_output, "```",
+    ))
+    return "\n".join(lines)
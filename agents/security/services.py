@@ -8,17 +8,22 @@ scanner.py で追加検査を実行、最終的な Markdown レポートを組
 """
 from __future__ import annotations
 
+import asyncio
 import textwrap
 from typing import Dict
 
 from common.ai_service import call_generative_ai
+from common.llm_cache import llm_cache
 from .models import SecurityScanRequest
 from .scanner import run_static_scans  # ★ 追加：独自スキャナ呼び出し ★
 
+# LLM 生成パラメータ (応答キャッシュのキーにも含める)
+_GEN_PARAMS = {"max_tokens": 16_384}
+
 async def scan_security(req: SecurityScanRequest) -> Dict[str, str]:
     """
     1) LLM による初期脆弱性レポート生成
-    2) scanner.run_static_scans でコード解析を実行
+    2) scanner.run_static_scans でコード解析を実行 (① と互いに独立なので並行実行)
     3) スキャナ結果をレポート末尾に追加
     """
     # ── ① LLM レポート生成 ────────────────────────────────────────────────
@@ -53,14 +58,23 @@ async def scan_security(req: SecurityScanRequest) -> Dict[str, str]:
         """
     ).strip()
 
-    llm_report: str = await call_generative_ai(
-        model=req.model_name,
-        prompt=prompt,
-        max_tokens=16_384,
+    llm_call = llm_cache.get_or_call(
+        prompt,
+        req.model_name,
+        lambda: call_generative_ai(
+            model=req.model_name,
+            prompt=prompt,
+            **_GEN_PARAMS,
+        ),
+        namespace="security",
+        params=_GEN_PARAMS,
     )
 
-    # ── ② 独自スキャナ実行 ────────────────────────────────────────────────
-    scanner_results = run_static_scans(req.code)
+    # ── ② 独自スキャナ実行 (LLM 応答待ちの間にプロセスプールで解析) ─────────
+    llm_report, scanner_results = await asyncio.gather(
+        llm_call,
+        run_static_scans(req.code),
+    )
 
     # ── ③ 最終レポート組み立て ────────────────────────────────────────────
     final_report = "\n\n".join([
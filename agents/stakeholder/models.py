@@ -10,7 +10,7 @@ Stakeholder エージェント用の Pydantic モデル定義
 
 from typing import List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from pydantic.root_model import RootModel  # 最新の推奨インポートパス
 
 
@@ -45,12 +45,15 @@ class CollectFeedbackRequest(BaseModel):
     mode: str
     model_name: str
 
-    model_config = {
-        "json_schema_extra": {
+    model_config = ConfigDict(
+        extra="forbid",
+        frozen=True,
+        str_max_length=1_048_576,
+        json_schema_extra={
             "title": "CollectFeedbackRequest",
             "description": "Request schema for collecting stakeholder feedback."
-        }
-    }
+        },
+    )
 
 
 class UsageInfo(BaseModel):
@@ -81,9 +84,12 @@ class CollectFeedbackResponse(BaseModel):
     usage: UsageInfo
     model_name: str
 
-    model_config = {
-        "json_schema_extra": {
+    model_config = ConfigDict(
+        extra="forbid",
+        frozen=True,
+        str_max_length=1_048_576,
+        json_schema_extra={
             "title": "CollectFeedbackResponse",
             "description": "Response schema for stakeholder feedback collection."
-        }
-    }
+        },
+    )
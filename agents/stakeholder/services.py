@@ -7,19 +7,25 @@ agents.stakeholder_agent.services
 """
 from __future__ import annotations
 
-import json
 import textwrap
 from typing import Dict
 
+import orjson
+
 from common.ai_service import call_generative_ai
+from common.llm_cache import llm_cache
 from .models import CollectFeedbackRequest
 
+# LLM 生成パラメータ (応答キャッシュのキーにも含める)
+_GEN_PARAMS = {"max_tokens": 16_384}
+
 
 async def summarize_feedback(req: CollectFeedbackRequest) -> Dict[str, str]:
     """
     LLM にコンテキストを渡し、要件を構造化したサマリーを返す。
     """
-    ctx_json = json.dumps(req.feedback_context.__root__, ensure_ascii=False, indent=2)
+    # RootModel の中身は .root (Pydantic v2 では __root__ は存在しない)
+    ctx_json = orjson.dumps(req.feedback_context.root, option=orjson.OPT_INDENT_2).decode()
 
     prompt = textwrap.dedent(
         f"""
@@ -49,9 +55,15 @@ async def summarize_feedback(req: CollectFeedbackRequest) -> Dict[str, str]:
         """
     ).strip()
 
-    summary = await call_generative_ai(
-        model=req.model_name,
-        prompt=prompt,
-        max_tokens=16_384,
+    summary = await llm_cache.get_or_call(
+        prompt,
+        req.model_name,
+        lambda: call_generative_ai(
+            model=req.model_name,
+            prompt=prompt,
+            **_GEN_PARAMS,
+        ),
+        namespace="stakeholder",
+        params=_GEN_PARAMS,
     )
     return {"feedback_summary": summary}
@@ -8,7 +8,7 @@ agents.ui_generation.models
 """
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class UIGenRequest(BaseModel):
@@ -20,6 +20,10 @@ class UIGenRequest(BaseModel):
         "vanilla", description="'bootstrap'|'tailwind'|'vanilla' など"
     )
 
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
+
 
 class UIGenResponse(BaseModel):
     ui: str = Field(..., description="HTML + CSS（必要に応じて JS）")
+
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
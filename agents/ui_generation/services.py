@@ -11,8 +11,12 @@ import textwrap
 from typing import Dict
 
 from common.ai_service import call_generative_ai
+from common.llm_cache import llm_cache
 from .models import UIGenRequest
 
+# LLM 生成パラメータ (応答キャッシュのキーにも含める)
+_GEN_PARAMS = {"max_tokens": 16_384}
+
 
 async def generate_ui(req: UIGenRequest) -> Dict[str, str]:
     """
@@ -43,9 +47,15 @@ async def generate_ui(req: UIGenRequest) -> Dict[str, str]:
         """
     ).strip()
 
-    ui_html = await call_generative_ai(
-        model=req.model_name,
-        prompt=prompt,
-        max_tokens=16_384,
+    ui_html = await llm_cache.get_or_call(
+        prompt,
+        req.model_name,
+        lambda: call_generative_ai(
+            model=req.model_name,
+            prompt=prompt,
+            **_GEN_PARAMS,
+        ),
+        namespace="ui_generation",
+        params=_GEN_PARAMS,
     )
     return {"ui": ui_html}
@@ -11,7 +11,9 @@ from alembic import context
 
 from backend.db.async_engine import ASYNC_DB_URL
 from backend.db.base import Base  # ← MetaData 取得用
-from backend import models        # noqa: F401  ← 全モデル import 必須
+from backend import models        # noqa: F401
+
+models.load_all()                 # ← 全モデル import 必須 (facade は遅延ロード)
 
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
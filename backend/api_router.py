@@ -16,7 +16,7 @@ api_router = APIRouter(prefix="/api")
 # 各機能ルータを include_router でマウント
 #  1. workflow: ワークフロー実行・管理
 #  2. logs: 実行履歴／ログ取得
-#  3. health: ヘルスチェック
+#  3. health: ヘルスチェック (/debug/pool は認証必須のプール状況)
 #  4. auth: 認証 (login/register/token)
 #  5. profile: 認証後ユーザー情報取得
 # ─────────────────────────────────────────────────────────────────
@@ -25,5 +25,6 @@ api_router = APIRouter(prefix="/api")
 api_router.include_router(workflow.router, prefix="/workflow", tags=["workflow"])
 api_router.include_router(logs.router,     prefix="/logs",     tags=["logs"])
 api_router.include_router(health.router,   prefix="/health",   tags=["health"])
+api_router.include_router(health.debug_router, prefix="/debug", tags=["debug"])
 api_router.include_router(auth_router_module.auth_router, prefix="/auth", tags=["auth"])
 api_router.include_router(profile_router_module.router,    prefix="/profile", tags=["profile"])
\ No newline at end of file
@@ -33,10 +33,37 @@ class Settings(BaseSettings):
     pg_db: str = Field(..., alias="PG_DB")
     pg_schema: str = Field(..., alias="PG_SCHEMA")
 
+    # ────────────────────────── DB コネクションプール ─────────────────────────
+    # 目安: pool_size × ワーカー数 + max_overflow × ワーカー数 ≦ Postgres の max_connections
+    db_pool_size: int = Field(20, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(40, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(30, alias="DB_POOL_TIMEOUT")          # 接続待ち [秒]
+    db_pool_recycle: int = Field(3600, alias="DB_POOL_RECYCLE")          # 接続の再作成周期 [秒]
+    db_pool_warmup: bool = Field(True, alias="DB_POOL_WARMUP")           # 起動時に pool_size 本を事前接続
+    # LIFO: 直近に使った接続を再利用し、サーバ側の plan / catalog キャッシュを温かく保つ
+    # (余剰のアイドル接続は pool_recycle で自然に閉じられる)
+    db_pool_use_lifo: bool = Field(True, alias="DB_POOL_USE_LIFO")
+    db_connect_timeout: float = Field(10, alias="DB_CONNECT_TIMEOUT")    # asyncpg 接続確立 [秒]
+    db_command_timeout: float = Field(60, alias="DB_COMMAND_TIMEOUT")    # 1 クエリ上限 [秒]
+    # 接続ごとのプリペアドステートメントキャッシュ件数 (asyncpg / SQLAlchemy 双方)
+    db_statement_cache_size: int = Field(100, alias="DB_STATEMENT_CACHE_SIZE")
+    # PgBouncer (transaction / statement モード) 経由ならキャッシュを無効化する
+    use_pgbouncer: bool = Field(False, alias="USE_PGBOUNCER")
+    # 外部プーラ (PgBouncer transaction モード等) に任せ、プロセス内プールを持たない (NullPool)
+    # 有効時は DB_POOL_* を無視し、ステートメントキャッシュも USE_PGBOUNCER 同様に無効化
+    use_external_pooler: bool = Field(False, alias="USE_EXTERNAL_POOLER")
+
     # ────────────────────────── オーケストレーター ────────────────────────────
     orchestrator_port: int = Field(4010, alias="ORCHESTRATOR_PORT")
     request_timeout: int = Field(120, alias="REQUEST_TIMEOUT")
     max_retries: int = Field(2, alias="MAX_RETRIES")
+    # エージェント応答キャッシュ: 同一 (agent, path, payload, model) の再実行で LLM を呼ばない
+    # 既定は無効。有効時も temperature=0 を明示した呼び出しのみ対象
+    agent_cache_enabled: bool = Field(False, alias="AGENT_CACHE_ENABLED")
+    agent_cache_ttl: int = Field(3600, alias="AGENT_CACHE_TTL")                 # [秒]
+    agent_cache_max_entries: int = Field(512, alias="AGENT_CACHE_MAX_ENTRIES")
+    # キャッシュを許可するエージェント (カンマ区切り)。code 以降は state 依存のため対象外
+    agent_cacheable_raw: str = Field("stakeholder,pm,it,dba,ui", alias="AGENT_CACHEABLE_AGENTS")
 
     # ────────────────────────── OpenAI / Azure OpenAI ─────────────────────────
     api_type: str = Field("openai", alias="API_TYPE")
@@ -49,6 +76,12 @@ class Settings(BaseSettings):
     # ────────────────────────── 認証 / セキュリティ ───────────────────────────
     jwt_secret: str = Field(..., alias="JWT_SECRET")
     patch_service_token: str | None = Field(None, alias="PATCH_SERVICE_TOKEN")
+    # JWT → ユーザ解決結果のキャッシュ秒数 (0 で無効。実際は min(TTL, exp - now))
+    jwt_cache_ttl: int = Field(60, alias="JWT_CACHE_TTL")
+
+    # ────────────────────────── 成果物 ZIP 保存先 ────────────────────────────
+    # log_archives / workflow_logs は URI のみを保持し、本体はここに置く
+    zip_storage_path: str = Field("/var/tmp/agentbased-zips", alias="ZIP_STORAGE_PATH")
 
     # ────────────────────────── CORS ─────────────────────────────────────────
     allow_origins_raw: str = Field("*", alias="ALLOW_ORIGINS")
@@ -97,6 +130,11 @@ class Settings(BaseSettings):
         # カンマ区切り
         return [item.strip() for item in raw.split(",") if item.strip()]
 
+    @property
+    def agent_cacheable_agents(self) -> frozenset[str]:
+        """AGENT_CACHEABLE_AGENTS (カンマ区切り) を集合に正規化"""
+        return frozenset(a.strip() for a in self.agent_cacheable_raw.split(",") if a.strip())
+
     @property
     def agent_urls(self) -> Dict[str, str]:
         """
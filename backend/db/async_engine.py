@@ -3,60 +3,181 @@
 """
 非同期 SQLAlchemy Engine／Session 生成ユーティリティ。
 
-• アプリケーション全体で共有する AsyncEngine を生成
-• async_session_factory: セッションファクトリ (expire_on_commit=False)
-• db_lifespan(): FastAPI Lifespan ハンドラ (起動／終了時のリソース管理)
+• get_engine(): アプリケーション全体で共有する AsyncEngine (初回呼び出し時に生成)
+• get_session_factory(): セッションファクトリ (expire_on_commit=False)
+• db_lifespan(): FastAPI Lifespan ハンドラ (起動時のプール事前接続・log_sink 起動／終了時の解放)
+• pool_status(): コネクションプールの使用状況 (運用時のサイズ調整用)
+
+プリペアドステートメントキャッシュ
+    asyncpg は接続ごとにプリペアドステートメントを保持する。
+    PgBouncer を transaction / statement モードで挟むとサーバ接続が
+    入れ替わり、キャッシュ済みステートメントが見つからずエラーになるため
+    USE_PGBOUNCER=true でキャッシュを無効化し、ステートメント名も一意にする。
+    キャッシュを有効 (既定) のまま PgBouncer を使う場合は session モード必須。
+
+外部プーラ
+    uvicorn ワーカー多数やサーバレスでは、ワーカーごとの QueuePool が
+    Postgres 側の接続数を掛け算で増やす。USE_EXTERNAL_POOLER=true で
+    NullPool (接続は使うたびに開閉) とし、プーリングは PgBouncer に任せる。
+
+遅延生成
+    import しただけでは Engine を生成しない (テスト収集や Alembic offline
+    モードで DB 設定に触れない)。テストは初回呼び出し前に get_engine を
+    差し替えられる。旧来の engine / async_session_factory / ASYNC_DB_URL は
+    モジュール属性アクセス時に解決する互換エイリアス。
 """
 from __future__ import annotations
 
-import os
+import asyncio
+import functools
 from contextlib import asynccontextmanager
+from uuid import uuid4
 from fastapi import FastAPI
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy import text
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from backend.config.settings import get_settings
 import logging
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
-
-# ── 環境変数から DB 接続情報を取得 ─────────────────────────
-PG_USER = settings.pg_user
-PG_PW   = settings.pg_pw
-PG_HOST = settings.pg_host
-PG_PORT = settings.pg_port
-PG_DB   = settings.pg_db
-
-SCHEMA  = settings.pg_schema
 
 def _build_db_url() -> str:
-    """postgresql+asyncpg 用 URL を動的生成"""
-    return f"postgresql+asyncpg://{PG_USER}:{PG_PW}@{PG_HOST}:{PG_PORT}/{PG_DB}"
+    """postgresql+asyncpg 用 URL を Settings (PG_USER など) から動的生成"""
+    s = get_settings()
+    return f"postgresql+asyncpg://{s.pg_user}:{s.pg_pw}@{s.pg_host}:{s.pg_port}/{s.pg_db}"
 
-print(_build_db_url())
+def _statement_cache_args() -> dict:
+    """asyncpg のステートメントキャッシュ設定 (connect_args に展開)"""
+    settings = get_settings()
+    if settings.use_pgbouncer or settings.use_external_pooler:
+        return {
+            "statement_cache_size": 0,            # asyncpg 側
+            "prepared_statement_cache_size": 0,   # SQLAlchemy asyncpg アダプタ側
+            # 別クライアントの同名ステートメントと衝突しないよう名前を一意化
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    size = settings.db_statement_cache_size
+    return {"statement_cache_size": size, "prepared_statement_cache_size": size}
 
-# ── AsyncEngine (singleton) ────────────────────────────────
-engine = create_async_engine(
-    _build_db_url(),
-    echo=False,
-    pool_pre_ping=True,
-    connect_args={"server_settings": {"search_path": SCHEMA}},
-)
+# ── AsyncEngine (lazy singleton) ───────────────────────────
+# プールサイズ等は Settings (DB_POOL_SIZE など) から取得
+# - pool_recycle : LB / FW にアイドル切断された接続を使い続けない
+# - AsyncAdaptedQueuePool : asyncio 対応のキュープール (create_async_engine の既定を明示)
+# - pool_use_lifo : 温まった接続を優先して再利用 (DB_POOL_USE_LIFO)
+# - jit=off      : 短い OLTP クエリでは JIT コンパイルのコストが上回る
+def _pool_args() -> dict:
+    """プール関連の create_async_engine 引数 (NullPool はサイズ指定を受け付けない)"""
+    settings = get_settings()
+    if settings.use_external_pooler:
+        return {"poolclass": NullPool}
+    return {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_use_lifo": settings.db_pool_use_lifo,
+        "pool_pre_ping": True,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
+@functools.lru_cache(maxsize=1)
+def get_engine() -> AsyncEngine:
+    settings = get_settings()
+    return create_async_engine(
+        _build_db_url(),
+        echo=False,
+        **_pool_args(),
+        connect_args={
+            "server_settings": {
+                "search_path": settings.pg_schema,
+                "jit": "off",
+                "application_name": "agentbased-api",
+            },
+            "timeout": settings.db_connect_timeout,
+            "command_timeout": settings.db_command_timeout,
+            **_statement_cache_args(),
+        },
+    )
 
 # ── Session Factory ────────────────────────────────────────
-async_session_factory = async_sessionmaker(
-    bind=engine,
-    expire_on_commit=False,
-)
+@functools.lru_cache(maxsize=1)
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind=get_engine(),
+        expire_on_commit=False,
+    )
+
+def __getattr__(name: str):
+    """旧来のモジュール属性 (engine など) を初回アクセス時に解決する"""
+    if name == "engine":
+        return get_engine()
+    if name == "async_session_factory":
+        return get_session_factory()
+    if name == "ASYNC_DB_URL":
+        return _build_db_url()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def pool_status() -> dict:
+    """コネクションプールの現在値 (size / checked_in / checked_out / overflow)"""
+    pool = get_engine().pool
+    if isinstance(pool, NullPool):
+        return {"status": pool.status()}
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "status": pool.status(),
+    }
+
+async def warm_pool(n: int) -> int:
+    """
+    n 本の接続を同時に確立して SELECT 1 を実行し、プールへ返却する。
+    初回リクエストが TCP / 認証 / セッション初期化のコストを払わないようにする。
+    DB 未起動でもアプリは起動させたいので、失敗は警告ログのみ。戻り値は成功本数。
+    """
+    engine = get_engine()
+    # 全接続を同時に保持してから返却しないと、同じ 1 本を使い回してしまう
+    conns = await asyncio.gather(*(engine.connect() for _ in range(n)), return_exceptions=True)
+    ok = 0
+    for conn in conns:
+        if isinstance(conn, BaseException):
+            continue
+        try:
+            await conn.execute(text("SELECT 1"))
+            ok += 1
+        except Exception:
+            pass
+        finally:
+            await conn.close()
+    if ok < n:
+        err = next((c for c in conns if isinstance(c, BaseException)), None)
+        logger.warning("DB pool warm-up: %d/%d connections ready (%s)", ok, n, err)
+    return ok
 
 # ── FastAPI Lifespan ハンドラ ──────────────────────────────
 @asynccontextmanager
 async def db_lifespan(app: FastAPI):
     """
     FastAPI の lifespan ハンドラ。
-    アプリ起動時は DB Pool 初期化（必要なら追加ロジックを記載）
-    アプリ終了時に engine.dispose() で全接続を解放
+    アプリ起動時は DB_POOL_WARMUP=true なら pool_size 本を事前接続し、
+    テレメトリ行のバッチ書き込み (log_sink) を開始
+    アプリ終了時に engine.dispose() で全接続を解放 (未生成なら何もしない)
     """
+    from backend.db import log_sink  # log_sink → async_engine の循環 import 回避
+
+    settings = get_settings()
+    if settings.db_pool_warmup and not settings.use_external_pooler:
+        await warm_pool(settings.db_pool_size)
+    log_sink.start()
     try:
         yield
     finally:
-        await engine.dispose()
+        await log_sink.stop()  # 書き込み待ちのテレメトリ行を書き切ってから切断
+        if get_engine.cache_info().currsize:
+            await get_engine().dispose()
@@ -10,4 +10,6 @@ from sqlalchemy.orm import DeclarativeBase
 
 class Base(DeclarativeBase):
     """プロジェクト全体で継承する基底クラス"""
-    pass
+    # server_default / onupdate=func.now() の値を INSERT / UPDATE の RETURNING で
+    # 同時取得する (flush 後に created_at 等へ触れても非同期の遅延ロードが起きない)
+    __mapper_args__ = {"eager_defaults": True}
@@ -5,20 +5,28 @@
 FastAPI 依存関数定義モジュール
 ------------------------------------------------------------
 • get_db: リクエスト単位で非同期 DB セッションを生成
-• get_current_user: Bearer JWT を検証し、DB からユーザを取得
+• get_conn: 読み取り専用エンドポイント向けの Core 接続 (ORM セッションを作らない)
+• get_current_user: Bearer JWT を検証し、DB からユーザを取得 (TTL キャッシュ付き)
+• revoke_token: ログアウト時にトークンのキャッシュを無効化
 • db_lifespan: FastAPI アプリのライフサイクルハンドラを再エクスポート
 ============================================================
 """
 
-from typing import AsyncIterator, Optional
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, Dict, NamedTuple, Optional, Tuple
+
 from fastapi import Request, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy import bindparam, select
 
-from backend.db.async_engine import async_session_factory, db_lifespan
+from backend.config.settings import get_settings
+from backend.db.async_engine import db_lifespan, get_engine, get_session_factory
 from backend.models.user import User
-from backend.security.auth import decode_access_token, UserPayload
+from backend.security.auth import decode_access_token_async, UserPayload
 
 # OAuth2PasswordBearer で Authorization ヘッダをパース (auto_error=False でエラーを自前処理)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
@@ -29,25 +37,134 @@ async def get_db() -> AsyncIterator[AsyncSession]:
     FastAPI エンドポイントの Depends で利用する非同期 DB セッション生成器。
     リクエストごとにセッションを開き、処理完了後に自動でクローズされる。
     """
-    async with async_session_factory() as session:
+    async with get_session_factory()() as session:
         yield session
 
 
+async def get_conn() -> AsyncIterator[AsyncConnection]:
+    """
+    読み取り専用エンドポイント向けの Core 接続。
+    AsyncSession (identity map / autoflush / unit-of-work) を作らず、
+    結果は ORM オブジェクトではなく Row で受け取る。
+    接続はレスポンス完了までプールから借用される点に注意。
+    """
+    async with get_engine().connect() as conn:
+        yield conn
+
+
+class AuthUser(NamedTuple):
+    """
+    get_current_user が返す認証済みユーザ。
+    ORM エンティティ (User) の代わりに必要な列だけを持つ軽量な不変タプル。
+    password_hash やリレーションは含まないため、全体が必要な
+    エンドポイントは email で User を取得し直すこと。
+    """
+    email: str
+    username: str
+    role: Optional[str]
+    created_at: datetime
+
+
+# 認証ユーザ取得クエリ (AuthUser のフィールドと同順)
+# WHERE 句まで組み立て済みの文をモジュールで 1 つだけ保持し、リクエストごとには
+# パラメータだけを渡す (式ツリーの再構築を避け、コンパイル済みキャッシュに常にヒット)
+_users = User.__table__
+_CURRENT_USER_QUERY = select(*(_users.c[name] for name in AuthUser._fields)).where(
+    _users.c.email == bindparam("email")
+)
+
+# ── JWT → ユーザ TTL キャッシュ ───────────────────────────────
+# キーはトークンの blake2b ダイジェスト (生トークンは保持しない)。
+# 有効期限は min(JWT_CACHE_TTL, exp - now) で、期限切れトークンが残ることはない。
+_USER_CACHE_SIZE = 10_000
+_user_cache: "OrderedDict[bytes, Tuple[float, AuthUser]]" = OrderedDict()
+# 失効リストはプロセス内メモリのみ (WORKERS>1 では他ワーカーに伝播しない)。
+# 他ワーカーでは失効済みトークンも exp まで有効なため、logout はその残り秒数を返す。
+_revoked: Dict[bytes, float] = {}   # ダイジェスト → トークン exp
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _cache_get(key: bytes) -> Optional[AuthUser]:
+    entry = _user_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, user = entry
+    if expires_at <= time.time():
+        del _user_cache[key]
+        return None
+    _user_cache.move_to_end(key)
+    return user
+
+
+def _cache_put(key: bytes, user: AuthUser, exp: Optional[int]) -> None:
+    now = time.time()
+    expires_at = now + get_settings().jwt_cache_ttl
+    if exp is not None:
+        expires_at = min(expires_at, exp)
+    if expires_at <= now:
+        return
+    _user_cache[key] = (expires_at, user)
+    _user_cache.move_to_end(key)
+    while len(_user_cache) > _USER_CACHE_SIZE:
+        _user_cache.popitem(last=False)
+
+
+def revoke_token(token: str, exp: Optional[int] = None) -> float:
+    """
+    ログアウト時に呼び出し、キャッシュ済みの解決結果を破棄する。
+    以後は exp までの間、署名が有効でも 401 を返す。
+
+    失効は呼び出したワーカープロセス内でのみ有効。他ワーカーではトークンが
+    exp まで受理され続けるため、その残り秒数 (露出時間) を返す。
+    """
+    key = _token_key(token)
+    _user_cache.pop(key, None)
+    now = time.time()
+    # 期限切れの失効エントリは JWT 検証で弾かれるため掃除しておく
+    for k in [k for k, e in _revoked.items() if e <= now]:
+        del _revoked[k]
+    expires_at = exp if exp is not None else now + get_settings().jwt_cache_ttl
+    _revoked[key] = expires_at
+    return max(0.0, expires_at - now)
+
+
+def extract_token(request: Request, token: Optional[str] = None) -> Optional[str]:
+    """
+    Bearer トークンを取得する。
+    token は oauth2_scheme が Authorization ヘッダから解析済みの値 (無ければ None) なので
+    ヘッダは再解析せず、無い場合のみ Cookie ("access_token") を参照する。
+    """
+    if token:
+        return token
+    raw = request.cookies.get("access_token")
+    if not raw:
+        return None
+    return raw[7:] if raw[:7].lower() == "bearer " else raw
+
+
 async def get_current_user(
     request: Request,
-    db: AsyncSession = Depends(get_db),
     token: Optional[str] = Depends(oauth2_scheme),
-) -> User:
+) -> AuthUser:
     """
     Cookie または Authorization ヘッダの Bearer トークンから
     認証済みユーザを取得する FastAPI の依存関数。
 
     フロー:
-      1. Authorization ヘッダを優先してトークンを取得
+      1. Authorization ヘッダのトークン (oauth2_scheme が解析済み) を優先
       2. ヘッダにトークンがなければ、Cookie ("access_token") を確認
-      3. トークンをデコードして UserPayload.email を取得
-      4. DB から対応するユーザレコードを取得し返却
-      5. いずれかで失敗すれば 401 Unauthorized を返す
+      3. トークンのダイジェストで TTL キャッシュを参照し、ヒットすれば
+         JWT 検証と DB 検索を省略して返却 (失効済みトークンは 401)
+      4. トークンをデコードして UserPayload.email を取得
+      5. DB から対応するユーザレコードを取得し、キャッシュして返却
+         (Core の SELECT 1 回。接続はクエリ直後に返却し、
+          エンドポイント側の get_db セッションと同時に 2 本保持しない)
+      6. いずれかで失敗すれば 401 Unauthorized を返す
+
+    戻り値は AuthUser (user.email / user.username / user.role / user.created_at)。
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -55,25 +172,24 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    # 1) Authorization ヘッダから Bearer トークン取得
-    auth_header = request.headers.get("Authorization")
-    if auth_header and auth_header.lower().startswith("bearer "):
-        token = auth_header.split(" ", 1)[1]
-
-    # 2) ヘッダにトークンがなければ Cookie を参照
-    if not token:
-        raw = request.cookies.get("access_token")
-        if raw and raw.lower().startswith("bearer "):
-            token = raw.split(" ", 1)[1]
+    # 1), 2) Authorization ヘッダ → Cookie の順でトークン取得
+    token = extract_token(request, token)
 
     # トークン未取得なら認証失敗
     if not token:
         raise credentials_exception
 
-    # 3) トークンをデコードし、UserPayload.email を取得
+    # 3) キャッシュ参照 (失効リストを優先)
+    key = _token_key(token)
+    if key in _revoked:
+        raise credentials_exception
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    # 4) トークンをデコードし、UserPayload.email を取得
     try:
-        payload: UserPayload = decode_access_token(token)
-        print(payload)
+        payload: UserPayload = await decode_access_token_async(token)
         email = payload.email
     except HTTPException:
         # decode_access_token 内で 401 を投げているため、そのまま伝播
@@ -82,16 +198,27 @@ async def get_current_user(
         # 想定外のエラーも 401 として扱う
         raise credentials_exception
 
-    # 4) DB からユーザを検索
-    result = await db.execute(select(User).where(User.email == email))
-    user = result.scalar_one_or_none()
-    if not user:
+    # 5) DB からユーザを検索
+    async with get_engine().connect() as conn:
+        result = await conn.execute(_CURRENT_USER_QUERY, {"email": email})
+        row = result.first()
+    if row is None:
         raise credentials_exception
 
-    # 5) 認証済ユーザモデルを返却
+    # 認証済ユーザを返却 (不変タプルなのでそのままキャッシュ可能)
+    user = AuthUser._make(row)
+    _cache_put(key, user, payload.exp)
     return user
 
 
 # ── 再エクスポート ────────────────────────────────────────────
 # FastAPI アプリの lifespan に設定できるように
-__all__ = ["get_db", "get_current_user", "db_lifespan"]
+__all__ = [
+    "get_db",
+    "get_conn",
+    "get_current_user",
+    "AuthUser",
+    "extract_token",
+    "revoke_token",
+    "db_lifespan",
+]
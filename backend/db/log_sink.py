@@ -0,0 +1,193 @@
+# backend/db/log_sink.py
+
+"""
+テレメトリ行 (CostLog / APIUsageLog など) のバッチ書き込みシンク。
+
+LLM 呼び出しごとに INSERT を 1 往復させず、行をメモリ上のキューに積み、
+バックグラウンドタスクが「最大 FLUSH_MAX_ROWS 行 / FLUSH_INTERVAL 秒」
+単位でモデルごとにまとめて書き込む。
+
+• COPY_COLUMNS を宣言したモデル (SystemLog など) は asyncpg の
+  COPY FROM STDIN (BINARY) で投入し、行ごとの SQL パースを省く
+• それ以外、または PostgreSQL/asyncpg 以外では executemany
+  (INSERT ... VALUES 複数行) にフォールバック
+
+• enqueue(model, row): 同期・非ブロッキング。キュー満杯時は破棄して警告
+• start() / stop(): db_lifespan から呼び出す。stop() は残りを書き切る
+  (書き込み中に停止された行もキューへ戻して最終 flush で書く)
+• 書き込み失敗は WRITE_RETRIES 回まで再試行し、なお失敗した行は件数をログして破棄
+• lifespan を持たないプロセス (各エージェント) でも、イベントループ上で
+  最初に enqueue された時点でフラッシャを起動する
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from backend.db.async_engine import get_engine
+
+logger = logging.getLogger(__name__)
+
+FLUSH_MAX_ROWS = 500
+FLUSH_INTERVAL = 0.1        # 秒
+QUEUE_MAX_SIZE = 10_000     # DB 停止時にメモリを食い潰さないための上限
+WRITE_RETRIES = 3           # 1 バッチの書き込み試行回数 (超えたら件数をログして破棄)
+RETRY_BACKOFF = 0.5         # 秒 (試行ごとに線形に延長)
+
+_Row = Tuple[Type[Any], Dict[str, Any]]
+
+_queue: Optional["asyncio.Queue[_Row]"] = None
+_task: Optional[asyncio.Task] = None
+
+
+def _get_queue() -> "asyncio.Queue[_Row]":
+    global _queue
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=QUEUE_MAX_SIZE)
+    return _queue
+
+
+def enqueue(model: Type[Any], row: Dict[str, Any]) -> None:
+    """ORM モデルクラスと列値 dict を書き込み待ちに積む (呼び出し側は待たない)"""
+    try:
+        _get_queue().put_nowait((model, row))
+    except asyncio.QueueFull:
+        logger.warning("log sink full; dropping %s row", model.__tablename__)
+        return
+    if _task is None or _task.done():
+        try:
+            start()
+        except RuntimeError:
+            pass  # イベントループ外 (同期スクリプト) では flush() 待ち
+
+
+def _requeue(rows: List[_Row]) -> None:
+    """未書き込みの行をキューへ戻す (満杯で戻せなかった件数は警告に残す)"""
+    queue = _get_queue()
+    dropped = 0
+    for item in rows:
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            dropped += 1
+    if dropped:
+        logger.warning("log sink full; dropped %d unwritten rows", dropped)
+
+
+async def _drain(rows: List[_Row], max_rows: int, timeout: float) -> None:
+    """最初の 1 行を待ち、以降は timeout 秒以内に届いた分を max_rows まで rows に集める"""
+    queue = _get_queue()
+    rows.append(await queue.get())
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while len(rows) < max_rows:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            rows.append(await asyncio.wait_for(queue.get(), remaining))
+        except asyncio.TimeoutError:
+            break
+
+
+async def _copy(conn: AsyncConnection, model: Type[Any], values: List[Dict[str, Any]]) -> None:
+    """model.COPY_COLUMNS 順のレコードを COPY FROM STDIN で投入"""
+    columns = model.COPY_COLUMNS
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        model.__table__.name,
+        schema_name=model.__table__.schema,
+        columns=columns,
+        records=[tuple(row.get(c) for c in columns) for row in values],
+    )
+
+
+async def _write(rows: List[_Row]) -> None:
+    """モデルごとに COPY か 1 文の executemany で INSERT (1 トランザクション)"""
+    by_model: Dict[Type[Any], List[Dict[str, Any]]] = defaultdict(list)
+    for model, row in rows:
+        by_model[model].append(row)
+    async with get_engine().begin() as conn:
+        use_copy = conn.dialect.driver == "asyncpg"
+        for model, values in by_model.items():
+            if use_copy and getattr(model, "COPY_COLUMNS", None):
+                await _copy(conn, model, values)
+            else:
+                await conn.execute(insert(model), values)
+
+
+async def flush() -> int:
+    """キューに残っている行をすべて書き込み、書き込んだ行数を返す"""
+    queue = _get_queue()
+    rows: List[_Row] = []
+    while not queue.empty():
+        rows.append(queue.get_nowait())
+    if rows:
+        try:
+            await _write(rows)
+        except Exception:
+            logger.exception("log sink flush failed; dropped %d rows", len(rows))
+            raise
+    return len(rows)
+
+
+async def _run() -> None:
+    while True:
+        rows: List[_Row] = []
+        try:
+            await _drain(rows, FLUSH_MAX_ROWS, FLUSH_INTERVAL)
+            await _write_with_retry(rows)
+        except asyncio.CancelledError:
+            # 収集途中・書き込み途中 (トランザクションはロールバック済み) の行は
+            # キューへ戻し、stop() の最終 flush で書き込む
+            _requeue(rows)
+            raise
+
+
+async def _write_with_retry(rows: List[_Row]) -> None:
+    """一時的な DB 障害に備えて再試行し、それでも失敗したら破棄件数をログする"""
+    for attempt in range(1, WRITE_RETRIES + 1):
+        try:
+            await _write(rows)
+            return
+        except Exception:
+            if attempt == WRITE_RETRIES:
+                # テレメトリの失敗でアプリを止めない (該当バッチは破棄)
+                logger.exception(
+                    "log sink flush failed %d times; dropped %d rows", attempt, len(rows)
+                )
+                return
+            logger.warning("log sink flush failed (attempt %d); retrying %d rows",
+                           attempt, len(rows))
+            await asyncio.sleep(RETRY_BACKOFF * attempt)
+
+
+def start() -> None:
+    """バックグラウンドのフラッシャを起動 (多重起動しない)"""
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_run(), name="log-sink")
+
+
+async def stop() -> None:
+    """フラッシャを停止し、残りの行を書き切る"""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+    try:
+        await flush()
+    except Exception:
+        pass  # 破棄件数は flush() がログ済み
+
+
+__all__ = ["enqueue", "flush", "start", "stop"]
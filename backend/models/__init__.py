@@ -19,31 +19,67 @@ Model**・`Base` (SQLAlchemy metadata) を利用できる “Facade”。
 -----
 各モデルファイル内で `relationship()` を張っているため、
 ここでは **import だけ** を行い、追加ロジックは置かない。
+
+遅延ロード
+-----
+`Base` 以外のモデルモジュールは属性アクセス時に初めて import する (PEP 562)。
+ただし relationship("Project") などの文字列参照はマッパー構成時に
+全モデルが登録済みである必要があるため、最初のマッパー構成直前
+(Mapper の before_configured イベント) で全モジュールを読み込む。
+`Base.metadata` を直接使う処理 (Alembic / create_all) は `load_all()` を呼ぶこと。
 """
 
 from __future__ import annotations
 
+import importlib
+
+from sqlalchemy import event
+from sqlalchemy.orm import Mapper
+
 # ── メタデータ (必ず最初に再エクスポート) ────────────────
 from backend.models.core import Base  # noqa: F401
 
-# ── Domain Models (アルファベット順) ─────────────────────
-from backend.models.agent_task import AgentTask  # noqa: F401
-from backend.models.api_usage_log import APIUsageLog  # noqa: F401
-from backend.models.artifact import Artifact  # noqa: F401
-from backend.models.cost_log import CostLog  # noqa: F401
-from backend.models.dba_design import DBADesign  # noqa: F401
-from backend.models.file_attachment import FileAttachment  # noqa: F401
-from backend.models.it_consulting_report import ITConsultingReport  # noqa: F401
-from backend.models.log_archive import LogArchive  # noqa: F401
-from backend.models.project import Project  # noqa: F401
-from backend.models.security_report import SecurityReport  # noqa: F401
-from backend.models.stakeholder_feedback import StakeholderFeedback  # noqa: F401
-from backend.models.system_log import SystemLog  # noqa: F401
-from backend.models.test_result import TestResult  # noqa: F401
-from backend.models.user import User  # noqa: F401
-from backend.models.workflow_execution import WorkflowExecution  # noqa: F401
-from backend.models.workflow_log import WorkflowLog  # noqa: F401
-from backend.models.workflow_log_step import WorkflowLogStep  # noqa: F401
+# ── Domain Models (アルファベット順): 公開名 → 定義モジュール ──
+_LAZY: dict[str, str] = {
+    "AgentTask": "backend.models.agent_task",
+    "APIUsageLog": "backend.models.api_usage_log",
+    "Artifact": "backend.models.artifact",
+    "CostLog": "backend.models.cost_log",
+    "DBADesign": "backend.models.dba_design",
+    "FileAttachment": "backend.models.file_attachment",
+    "ITConsultingReport": "backend.models.it_consulting_report",
+    "LogArchive": "backend.models.log_archive",
+    "Project": "backend.models.project",
+    "SecurityReport": "backend.models.security_report",
+    "StakeholderFeedback": "backend.models.stakeholder_feedback",
+    "SystemLog": "backend.models.system_log",
+    "TestResult": "backend.models.test_result",
+    "User": "backend.models.user",
+    "WorkflowExecution": "backend.models.workflow_execution",
+    "WorkflowLog": "backend.models.workflow_log",
+    "WorkflowLogStep": "backend.models.workflow_log_step",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value  # 2 回目以降は通常の属性参照
+    return value
+
+
+def load_all() -> None:
+    """全モデルを import して Base.metadata / マッパーレジストリに登録する"""
+    for module in set(_LAZY.values()):
+        importlib.import_module(module)
+
+
+@event.listens_for(Mapper, "before_configured")
+def _load_all_before_configure() -> None:
+    load_all()
+
 
 # ── 公開シンボル一覧 ────────────────────────────────────
 __all__: list[str] = [
@@ -4,7 +4,6 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 
 from sqlalchemy import BigInteger, String, DateTime, ForeignKeyConstraint
-from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.models.core import Base, PKStr, CreatedAt, Text
@@ -23,7 +22,7 @@ AI エージェントが 1 回ジョブを実行するたびにレコードを
 複合 FK: (project_user_email, project_name) → agentbased.projects テーブルの複合 PK
 ===============================================================================
 """
-class AgentTask(AsyncAttrs, Base):
+class AgentTask(Base):
     """AI エージェントのタスク実行履歴を表す ORM モデル"""
 
     __tablename__ = "agent_tasks"
@@ -93,7 +92,7 @@ class AgentTask(AsyncAttrs, Base):
     project: Mapped["Project"] = relationship(
         "Project",
         back_populates="agent_tasks",
-        lazy="selectin",
+        lazy="raise_on_sql",
         doc="このタスクが紐づくプロジェクトへの参照"
     )
 
@@ -118,9 +117,8 @@ class AgentTask(AsyncAttrs, Base):
         """
         ファクトリメソッド:
         タスクレコードの作成に必要な最低限の情報を受け取り、
-        created_at を現在 UTC 時刻で自動付与する。
+        created_at は DB 側 (server_default=now()) で付与される。
         """
-        now = datetime.utcnow()
         return cls(
             project_user_email=project_user_email,
             project_name=project_name,
@@ -129,5 +127,4 @@ class AgentTask(AsyncAttrs, Base):
             result=result,
             started_at=None,
             finished_at=None,
-            created_at=now,
         )
@@ -14,14 +14,13 @@ from typing import TYPE_CHECKING
 
 from sqlalchemy import String, Numeric, Integer
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy.ext.asyncio import AsyncAttrs
 
 from backend.models.core import Base, PKInt, CreatedAt, Text
 
 # TYPE_CHECKING ブロックは現時点で不要（外部参照が無いため省略）
 
 
-class APIUsageLog(AsyncAttrs, Base):
+class APIUsageLog(Base):
     """
     外部 API のトークン使用量／コストを記録するエンティティ。
     
@@ -26,11 +26,9 @@ Artifact モデル
 
 from __future__ import annotations
 
-from datetime import datetime as dt
 from typing import TYPE_CHECKING
 
 from sqlalchemy import BigInteger, String, ForeignKeyConstraint
-from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.models.core import Base, PKStr, CreatedAt, Text
@@ -39,7 +37,7 @@ if TYPE_CHECKING:
     from backend.models.project import Project
 
 
-class Artifact(AsyncAttrs, Base):
+class Artifact(Base):
     """プロジェクト単位で生成・保存されるアーティファクトを表す ORM モデル"""
 
     __tablename__ = "artifacts"
@@ -87,14 +85,13 @@ class Artifact(AsyncAttrs, Base):
     )
     created_at: Mapped[CreatedAt] = mapped_column(
         comment="レコード作成日時",
-        server_default="CURRENT_TIMESTAMP"
     )
 
     # ── リレーション: Project ───────────────────────────────
     project: Mapped["Project"] = relationship(
         "Project",
         back_populates="artifacts",
-        lazy="selectin",
+        lazy="raise_on_sql",
         doc="このアーティファクトが所属するプロジェクト"
     )
 
@@ -116,14 +113,12 @@ class Artifact(AsyncAttrs, Base):
     ) -> Artifact:
         """
         ファクトリメソッド:
-        - created_at を現在 UTC 時刻で自動付与
+        - created_at は DB 側 (server_default=now()) で付与
         - Artifact インスタンスを生成して返す
         """
-        now = dt.now()
         return cls(
             project_user_email=project_user_email,
             project_name=project_name,
             artifact_type=artifact_type,
             content=content,
-            created_at=now,
         )
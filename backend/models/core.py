@@ -5,14 +5,20 @@
 * Base  : DeclarativeBase（backend.db.base 内に定義）
 * type_ : Annotated[int | str] などをまとめておくと
          各モデルの import が簡潔になる
+* 日時  : created_at / updated_at は DB の now() で付与・更新する
+         (INSERT / UPDATE に Python 側の datetime パラメータを載せない)
+* BulkInsertMixin : 追記専用テーブルの複数行 INSERT (ON CONFLICT DO NOTHING)
+* 本文列 : LLM が生成するレポート等の大きな Text 列は deferred_group="body"
+         で遅延させ、必要なクエリだけ .options(undefer_group("body")) を付ける
 """
 from __future__ import annotations
 
 import datetime as _dt
-from typing import Annotated
+from typing import Annotated, Any, Mapping, Sequence
 
-from sqlalchemy import String, Text, LargeBinary, ForeignKey
-from sqlalchemy.ext.asyncio import AsyncAttrs
+from sqlalchemy import String, Text, LargeBinary, ForeignKey, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.db.base import Base  # DeclarativeBase
@@ -20,8 +26,50 @@ from backend.db.base import Base  # DeclarativeBase
 # 共通型エイリアス（可読性向上）
 PKInt      = Annotated[int,  mapped_column(primary_key=True)]
 PKStr      = Annotated[str,  mapped_column(String(255), primary_key=True)]
-CreatedAt  = Annotated[_dt.datetime, mapped_column(default=_dt.datetime.now)]
+CreatedAt  = Annotated[_dt.datetime, mapped_column(server_default=func.now())]
+# onupdate は SQL 式なので UPDATE 文中で now() がそのまま評価される (トリガ不要)
 UpdatedAt  = Annotated[_dt.datetime, mapped_column(
-    default=_dt.datetime.now,
-    onupdate=_dt.datetime.now
+    server_default=func.now(),
+    onupdate=func.now(),
 )]
+
+# asyncpg のバインドパラメータ上限 (1 文あたり Int16)
+_PG_MAX_PARAMS = 32767
+
+
+class BulkInsertMixin:
+    """
+    追記専用の子テーブル (TestResult など) 向け一括 INSERT。
+    session.add + flush の 1 行 1 往復ではなく、複数行 VALUES で投入する。
+    """
+
+    @classmethod
+    async def bulk_insert(
+        cls,
+        session: AsyncSession,
+        rows: Sequence[Mapping[str, Any]],
+        *,
+        return_keys: bool = False,
+    ) -> list:
+        """
+        rows (列名 → 値の dict) を INSERT ... ON CONFLICT DO NOTHING で一括投入する。
+
+        1 文のパラメータ数が上限を超えないよう「上限 ÷ 列数」行ごとに分割し、
+        各チャンクは SQLAlchemy の insertmanyvalues で複数行 VALUES に展開される。
+        既定では RETURNING を付けない (採番キーを読み戻さない)。
+        return_keys=True のときだけ主キーを RETURNING し、挿入された行のキーを返す
+        (ON CONFLICT で読み飛ばした行は含まれない)。
+        ORM インスタンスは生成しない。commit は呼び出し側で行う。
+        """
+        if not rows:
+            return []
+        chunk = max(1, _PG_MAX_PARAMS // len(cls.__table__.columns))
+        stmt = pg_insert(cls).on_conflict_do_nothing()
+        if return_keys:
+            stmt = stmt.returning(*cls.__table__.primary_key.columns)
+        keys: list = []
+        for start in range(0, len(rows), chunk):
+            result = await session.execute(stmt, list(rows[start:start + chunk]))
+            if return_keys:
+                keys.extend(result.scalars().all())
+        return keys
@@ -1,9 +1,8 @@
 # backend/models/cost_log.py
 from __future__ import annotations
-import datetime as _dt
 from decimal import Decimal
 
-from sqlalchemy import Column, DateTime, DECIMAL, Integer, String
+from sqlalchemy import Column, DateTime, DECIMAL, Integer, String, func
 from backend.models.core import Base  # 既存 Base
 
 class CostLog(Base):
@@ -19,4 +18,4 @@ class CostLog(Base):
     model_name   = Column(String(32), nullable=False)
     tokens       = Column(Integer, nullable=False)
     cost         = Column(DECIMAL(10, 6), nullable=False)
-    created_at   = Column(DateTime, default=_dt.datetime.utcnow, nullable=False)
+    created_at   = Column(DateTime, server_default=func.now(), nullable=False)
@@ -23,11 +23,9 @@ LLM が生成したデータベース設計スキーマを保存するテーブ
 
 from __future__ import annotations
 
-from datetime import datetime as dt
 from typing import TYPE_CHECKING
 
 from sqlalchemy import BigInteger, String, ForeignKeyConstraint, Text as SA_Text
-from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.models.core import Base, PKStr, CreatedAt
@@ -36,7 +34,7 @@ if TYPE_CHECKING:
     from backend.models.project import Project
 
 
-class DBADesign(AsyncAttrs, Base):
+class DBADesign(Base):
     """
     DBA 設計モデル
     - LLM によって生成された DB スキーマ（DDL など）を
@@ -82,14 +80,13 @@ class DBADesign(AsyncAttrs, Base):
     )
     created_at: Mapped[CreatedAt] = mapped_column(
         comment="レコード作成日時",
-        server_default="CURRENT_TIMESTAMP"
     )
 
     # ── リレーション: Project ─────────────────────────
     project: Mapped["Project"] = relationship(
         "Project",
         back_populates="dba_designs",
-        lazy="selectin",
+        lazy="raise_on_sql",
         doc="この設計が紐づくプロジェクト"
     )
 
@@ -110,12 +107,10 @@ class DBADesign(AsyncAttrs, Base):
     ) -> DBADesign:
         """
         ファクトリメソッド:
-        created_at を現在 UTC 時刻で自動付与する。
+        created_at は DB 側 (server_default=now()) で付与される。
         """
-        now = dt.utcnow()
         return cls(
             project_user_email=project_user_email,
             project_name=project_name,
             design_schema=design_schema,
-            created_at=now,
         )
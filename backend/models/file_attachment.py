@@ -1,3 +1,6 @@
+import struct
+from typing import AsyncIterable, Optional
+
 from sqlalchemy import (
     Column,
     BigInteger,
@@ -6,12 +9,28 @@ from sqlalchemy import (
     LargeBinary,
     TIMESTAMP,
     func,
-    ForeignKeyConstraint
+    text,
+    ForeignKeyConstraint,
+    Index,
+    select,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import deferred, relationship
 from backend.db.base import Base
 from backend.models.project import Project  # Project モデルをインポート
 
+# PostgreSQL COPY BINARY 形式のヘッダ (署名 + flags + 拡張領域長) / トレーラ
+_PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_PGCOPY_TRAILER = struct.pack("!h", -1)
+
+
+def _copy_text(value: Optional[str]) -> bytes:
+    """COPY BINARY のテキスト列 (長さ + UTF-8)。None は NULL (-1)"""
+    if value is None:
+        return struct.pack("!i", -1)
+    raw = value.encode("utf-8")
+    return struct.pack("!i", len(raw)) + raw
+
 class FileAttachment(Base):
     """
     agentbased.file_attachments テーブルの ORM モデル
@@ -25,6 +44,13 @@ class FileAttachment(Base):
             ["agentbased.projects.user_email", "agentbased.projects.name"],
             ondelete="CASCADE"
         ),
+        # ユーザ別アップロード履歴 (WHERE email ORDER BY upload_time DESC) を
+        # INCLUDE 列込みの index-only scan で返し、file_data を持つヒープを読まない
+        Index(
+            "ix_file_attachments_user_uploaded",
+            "project_user_email", text("upload_time DESC"),
+            postgresql_include=["file_attachment_key", "filename"],
+        ),
         {"schema": "agentbased"}
     )
 
@@ -52,7 +78,11 @@ class FileAttachment(Base):
     filename    = Column(String(255), nullable=False, comment="ファイル名")
     file_type   = Column(String(100), nullable=True,  comment="MIME タイプ")
     file_size   = Column(Integer,     nullable=True,  comment="ファイルサイズ (バイト)")
-    file_data   = Column(LargeBinary, nullable=True,  comment="ファイルバイナリデータ")
+    # 本体は ORM 取得時に読み込まない (必要な箇所で列を明示して SELECT する)
+    file_data   = deferred(
+        Column(LargeBinary, nullable=True, comment="ファイルバイナリデータ"),
+        raiseload=True,
+    )
     upload_time = Column(
         TIMESTAMP,
         server_default=func.now(),
@@ -64,6 +94,68 @@ class FileAttachment(Base):
     project = relationship(
         Project,
         back_populates="file_attachments",
-        lazy="joined",
+        lazy="raise_on_sql",
         doc="このファイルが属するプロジェクトへの参照"
     )
+
+    # ── ストリーミング保存 ─────────────────────────
+    COPY_COLUMNS = (
+        "file_attachment_key", "project_user_email", "project_name",
+        "filename", "file_type", "file_size", "file_data",
+    )
+
+    @classmethod
+    async def copy_stream(
+        cls,
+        session: AsyncSession,
+        *,
+        project_user_email: str,
+        project_name: str,
+        filename: str,
+        file_type: Optional[str],
+        file_size: int,
+        chunks: AsyncIterable[bytes],
+    ) -> int:
+        """
+        1 ファイルを COPY FROM STDIN (BINARY) で投入し、採番した主キーを返す。
+
+        file_data は chunks を受け取った順にそのままサーバへ送るため、
+        ファイル全体をメモリに載せない (bytea の長さは先頭で宣言するので
+        file_size はバイト数と一致している必要がある)。
+        COPY は RETURNING を持たないので主キーは先に nextval で確保する。
+        asyncpg 専用。commit / rollback は呼び出し側で行う。
+        """
+        table = cls.__table__
+        seq = func.pg_get_serial_sequence(f"{table.schema}.{table.name}", "file_attachment_key")
+        key = await session.scalar(select(func.nextval(seq)))
+
+        async def _source():
+            yield b"".join((
+                _PGCOPY_HEADER,
+                struct.pack("!h", len(cls.COPY_COLUMNS)),
+                struct.pack("!iq", 8, key),
+                _copy_text(project_user_email),
+                _copy_text(project_name),
+                _copy_text(filename),
+                _copy_text(file_type),
+                struct.pack("!ii", 4, file_size),
+                struct.pack("!i", file_size),
+            ))
+            sent = 0
+            async for chunk in chunks:
+                sent += len(chunk)
+                yield chunk
+            if sent != file_size:
+                raise ValueError(f"file_size mismatch: declared {file_size}, got {sent}")
+            yield _PGCOPY_TRAILER
+
+        conn = await session.connection()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_to_table(
+            table.name,
+            schema_name=table.schema,
+            columns=cls.COPY_COLUMNS,
+            source=_source(),
+            format="binary",
+        )
+        return key
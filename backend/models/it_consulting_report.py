@@ -14,7 +14,6 @@ from datetime import datetime as dt
 from typing import TYPE_CHECKING
 
 from sqlalchemy import BigInteger, String, ForeignKeyConstraint, func, DateTime, text
-from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.models.core import Base, PKStr, CreatedAt, UpdatedAt, Text
@@ -23,7 +22,7 @@ if TYPE_CHECKING:
     from backend.models.project import Project
 
 
-class ITConsultingReport(AsyncAttrs, Base):
+class ITConsultingReport(Base):
     """IT コンサルティング結果レポートを表す ORM モデル"""
 
     __tablename__ = "it_consulting_reports"
@@ -73,9 +72,8 @@ class ITConsultingReport(AsyncAttrs, Base):
     )
 
     # ── レコード作成／更新タイムスタンプ ────────────────────────
-    created_at: Mapped[CreatedAt] = mapped_column(  # サーバデフォルトで CURRENT_TIMESTAMP
+    created_at: Mapped[CreatedAt] = mapped_column(  # CreatedAt: server_default=now()
         comment="作成日時",
-        server_default="CURRENT_TIMESTAMP",
     )
 
     updated_at: Mapped[dt] = mapped_column(
@@ -90,7 +88,7 @@ class ITConsultingReport(AsyncAttrs, Base):
     project: Mapped["Project"] = relationship(
         "Project",
         back_populates="it_reports",
-        lazy="selectin",
+        lazy="raise_on_sql",
         doc="このレポートが属するプロジェクトへの参照",
     )
 
@@ -111,14 +109,11 @@ class ITConsultingReport(AsyncAttrs, Base):
     ) -> ITConsultingReport:
         """
         ファクトリメソッド:
-        created_at／updated_at を現在時刻でセットした新規インスタンスを返す。
+        新規インスタンスを返す (created_at／updated_at は DB 側で付与)。
         """
-        now = dt.utcnow()
         return cls(
             project_user_email=project_user_email,
             project_name=project_name,
             consultant=consultant,
             recommendation=recommendation,
-            created_at=now,
-            updated_at=now,
         )
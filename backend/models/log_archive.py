@@ -11,7 +11,7 @@ LogArchive モデル（Async / SQLAlchemy 2.0）
 1. **旧 sync 版 `log_archive_model.py` との重複**  
    - 旧ファイルは *Flask-SQLAlchemy* + 同期 ORM／テーブル名
      `log_file_archives`。  
-   - 本ファイルは **AsyncAttrs + declarative_base** に統一し、
+   - 本ファイルは **共通 Base (DeclarativeBase)** に統一し、
      テーブル名を `log_archives` に統一。  
    - 旧ファイルは *PRIMARY KEY* として `log_archive_id` を使用して
      いたが、プロジェクト全体の基準に合わせ **PKInt alias
@@ -32,11 +32,11 @@ LogArchive モデル（Async / SQLAlchemy 2.0）
 
 from __future__ import annotations
 
-from sqlalchemy import LargeBinary, String, ForeignKey
+from sqlalchemy import BigInteger, String, ForeignKey
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, relationship, mapped_column
-from sqlalchemy.ext.asyncio import AsyncAttrs
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable, Optional, Tuple
 
 # ── 共通型エイリアス (PKInt = BIGSERIAL, CreatedAt = TIMESTAMP) ──
 from backend.models.core import Base, PKInt, CreatedAt
@@ -48,14 +48,16 @@ if TYPE_CHECKING:  # pragma: no cover
 # ======================================================================
 # メインモデル
 # ======================================================================
-class LogArchive(AsyncAttrs, Base):
+class LogArchive(Base):
     """
     `workflow_logs` に付随する ZIP アーカイブ (成果物一式)
 
     * **id**            … 主キー (BIGSERIAL)
     * **workflow_log_id** … 親 WorkflowLog への FK
     * **filename**      … 保存時ファイル名 (例: workflow_42.zip)
-    * **zip_data**      … バイナリ (ZIP 全文)
+    * **zip_uri**       … ZIP 本体の保存先 URI (backend.services.object_store)
+    * **zip_size**      … ZIP のバイト数
+    * **zip_sha256**    … ZIP の SHA-256 (整合性確認・重複排除用)
     * **user_email**    … アーカイブ所有者 (ステータス閲覧用)
     * **project_name**  … プロジェクト名
     * **created_at**    … 登録日時
@@ -74,9 +76,12 @@ class LogArchive(AsyncAttrs, Base):
     filename: Mapped[str | None] = mapped_column(
         String(255), comment="ZIP ファイル名 (任意)"
     )
-    zip_data: Mapped[bytes] = mapped_column(
-        LargeBinary, comment="ZIP バイナリ (成果物一式)"
+    # ZIP 本体は DB に置かない (bytea の TOAST 書き込み増幅と一覧 SELECT の肥大を避ける)
+    zip_uri: Mapped[str] = mapped_column(
+        String(1024), comment="ZIP 保存先 URI (成果物一式)"
     )
+    zip_size: Mapped[int] = mapped_column(BigInteger, comment="ZIP サイズ [byte]")
+    zip_sha256: Mapped[str] = mapped_column(String(64), comment="ZIP の SHA-256")
     user_email: Mapped[str | None] = mapped_column(
         String(255), comment="アップロードしたユーザ (FK 予定)"
     )
@@ -86,12 +91,49 @@ class LogArchive(AsyncAttrs, Base):
     created_at: Mapped[CreatedAt]
 
     # ----- Relationships ----------------------------------------------
+    # 多対一は親が必ず 1 行なので JOIN しても行は増えない → joined で 1 クエリに
+    # (一対多側の log_archives は直積を避けるため selectin / 明示ロード)。
+    # カスケードは親 (WorkflowLog.log_archives) 側のみ。子の削除で親を消さない。
     workflow_log: Mapped["WorkflowLog"] = relationship(
         back_populates="log_archives",
-        cascade="all, delete-orphan",
-        single_parent=True,
+        lazy="joined",
+        innerjoin=True,            # workflow_log_id は NOT NULL
     )
 
+    # ----- Bulk loader --------------------------------------------------
+    # COPY 対象列 (id / created_at は DB 側の BIGSERIAL / now() で採番)
+    COPY_COLUMNS = (
+        "workflow_log_id", "filename", "zip_uri", "zip_size", "zip_sha256",
+        "user_email", "project_name",
+    )
+
+    @classmethod
+    async def bulk_copy(
+        cls,
+        session: AsyncSession,
+        rows: Iterable[Tuple[int, Optional[str], str, int, str, Optional[str], Optional[str]]],
+    ) -> int:
+        """
+        複数アーカイブを COPY FROM STDIN (BINARY) で一括投入し、件数を返す。
+
+        rows は COPY_COLUMNS 順のタプル。ORM の flush / INSERT 経路を通らないため
+        採番された id は返らない (1 件保存で id が必要な場合は通常の INSERT を使う)。
+        セッションの接続上で実行するので commit / rollback は呼び出し側で行う。
+        """
+        records = list(rows)
+        if not records:
+            return 0
+        await session.flush()
+        conn = await session.connection()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            cls.__tablename__,
+            schema_name=cls.__table_args__["schema"],
+            columns=cls.COPY_COLUMNS,
+            records=records,
+        )
+        return len(records)
+
     # ----- String representation --------------------------------------
     def __repr__(self) -> str:  # pragma: no cover
         return (
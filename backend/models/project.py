@@ -1,10 +1,10 @@
 from __future__ import annotations
-from datetime import datetime as dt
-from typing import List, TYPE_CHECKING
+import asyncio
+from typing import AsyncIterator, Dict, Iterable, List, TYPE_CHECKING
 
-from sqlalchemy import String, UniqueConstraint, ForeignKey
-from sqlalchemy.ext.asyncio import AsyncAttrs
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import BigInteger, Identity, String, ForeignKey, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Mapped, mapped_column, relationship, undefer_group
 
 from backend.models.core import Base, PKStr, CreatedAt, UpdatedAt, Text
 
@@ -20,16 +20,18 @@ if TYPE_CHECKING:
     from backend.models.workflow_execution import WorkflowExecution
     from backend.models.user import User
 
-class Project(AsyncAttrs, Base):
+class Project(Base):
     """
     ユーザが作成する『プロジェクト』を表す ORM モデル。
     - スキーマ：agentbased
     - 複合プライマリキー (user_email, name)
+    - サロゲートキー id (BIGINT IDENTITY, 一意): 子テーブルを 8 byte キーで
+      参照するための移行用。現時点の FK は従来どおり (user_email, name)
     - 各種子テーブルとの 1:N 双方向リレーション
     """
     __tablename__ = "projects"
+    # (user_email, name) の一意性は主キー索引が保証する (同一列の UNIQUE 制約は重複索引)
     __table_args__ = (
-        UniqueConstraint("user_email", "name", name="uq_project_user_email_name"),
         {"schema": "agentbased", "sqlite_autoincrement": False},
     )
 
@@ -45,73 +47,97 @@ class Project(AsyncAttrs, Base):
         comment="プロジェクト名 (ユーザ内で一意)"
     )
 
+    # ── サロゲートキー ──────────────────────────────
+    id: Mapped[int] = mapped_column(
+        BigInteger,
+        Identity(),
+        unique=True,
+        comment="サロゲートキー (子テーブルの project_id 参照用)"
+    )
+
     # ── 任意カラム ──────────────────────────────────
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[CreatedAt]   # 自動付与される作成日時
     updated_at: Mapped[UpdatedAt]   # 自動付与される更新日時
 
     # ── 子テーブルとのリレーション ───────────────────────
+    # 全リレーションは lazy="raise_on_sql" (暗黙の追加 SELECT を禁止)。
+    # 参照するクエリ側で .options(selectinload(Project.xxx)) を明示すること。
+    # 一対多を eager にする場合は joined ではなく selectin を使う
+    # (joined は親行を子の件数分複製し、2 コレクション以上で直積に膨らむ)。
+    # 逆参照が必要なら selectinload(Project.workflow_executions)
+    #   .selectinload(WorkflowExecution.project) のように必要な箇所だけ連鎖する。
+    # tests/test_models.py が一対多の joined eager を検出して失敗させる。
     agent_tasks: Mapped[List["AgentTask"]] = relationship(
         "AgentTask",
         back_populates="project",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,  # 子行は FK の ON DELETE CASCADE で削除
+        lazy="raise_on_sql",
         doc="エージェントタスク一覧"
     )
     artifacts: Mapped[List["Artifact"]] = relationship(
         "Artifact",
         back_populates="project",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,  # 子行は FK の ON DELETE CASCADE で削除
+        lazy="raise_on_sql",
         doc="アーティファクト一覧"
     )
     feedbacks: Mapped[List["StakeholderFeedback"]] = relationship(
         "StakeholderFeedback",
         back_populates="project",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,  # 子行は FK の ON DELETE CASCADE で削除
+        lazy="raise_on_sql",
         doc="フィードバック一覧"
     )
     test_results: Mapped[List["TestResult"]] = relationship(
         "TestResult",
         back_populates="project",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,  # 子行は FK の ON DELETE CASCADE で削除
+        lazy="raise_on_sql",
         doc="テスト結果一覧"
     )
     security_reports: Mapped[List["SecurityReport"]] = relationship(
         "SecurityReport",
         back_populates="project",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,  # 子行は FK の ON DELETE CASCADE で削除
+        lazy="raise_on_sql",
         doc="セキュリティレポート一覧"
     )
     it_reports: Mapped[List["ITConsultingReport"]] = relationship(
         "ITConsultingReport",
         back_populates="project",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,  # 子行は FK の ON DELETE CASCADE で削除
+        lazy="raise_on_sql",
         doc="ITコンサルティングレポート一覧"
     )
     dba_designs: Mapped[List["DBADesign"]] = relationship(
         "DBADesign",
         back_populates="project",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,  # 子行は FK の ON DELETE CASCADE で削除
+        lazy="raise_on_sql",
         doc="DBA設計一覧"
     )
     file_attachments: Mapped[List["FileAttachment"]] = relationship(
         "FileAttachment",
         back_populates="project",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,  # 子行は FK の ON DELETE CASCADE で削除
+        lazy="raise_on_sql",
         doc="ファイル添付一覧"
     )
     workflow_executions: Mapped[List["WorkflowExecution"]] = relationship(
         "WorkflowExecution",
         back_populates="project",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,  # 子行は FK の ON DELETE CASCADE で削除
+        lazy="raise_on_sql",
         doc="ワークフロー実行一覧"
     )
 
@@ -119,13 +145,77 @@ class Project(AsyncAttrs, Base):
     user: Mapped["User"] = relationship(
         "User",
         back_populates="projects",
-        lazy="selectin",
+        lazy="raise_on_sql",
         doc="所有ユーザ情報"
     )
 
     def __repr__(self) -> str:
         return f"<Project {self.user_email}/{self.name}>"
 
+    @classmethod
+    async def fetch_children(
+        cls,
+        session_factory: async_sessionmaker[AsyncSession],
+        user_email: str,
+        name: str,
+        *,
+        include: Iterable[str] = ("test_results", "security_reports", "workflow_executions"),
+        with_body: bool = False,
+    ) -> Dict[str, list]:
+        """
+        互いに独立した子コレクションを並行取得し {リレーション名: [行, ...]} で返す。
+
+        AsyncSession は並行利用できないため、コレクションごとに
+        session_factory から別セッションを開く (待ち時間 ≒ 最も遅い 1 本)。
+        各コレクションは created_at 降順 (ix_<table>_project_created を使用)。
+        レポート本文 (deferred_group="body") は with_body=True のときだけ読み込む。
+        """
+        rels = cls.__mapper__.relationships
+
+        async def _load(rel_name: str) -> list:
+            child = rels[rel_name].mapper.class_
+            stmt = (
+                select(child)
+                .where(child.project_user_email == user_email, child.project_name == name)
+                .order_by(child.created_at.desc())
+            )
+            if with_body:
+                stmt = stmt.options(undefer_group("body"))
+            async with session_factory() as session:
+                return list((await session.scalars(stmt)).all())
+
+        names = list(include)
+        results = await asyncio.gather(*(_load(n) for n in names))
+        return dict(zip(names, results))
+
+    async def stream_executions(
+        self,
+        session: AsyncSession,
+        *,
+        batch_size: int = 1000,
+    ) -> AsyncIterator["WorkflowExecution"]:
+        """
+        このプロジェクトの WorkflowExecution をサーバサイドカーソルで逐次返す。
+
+        全件をメモリに載せず batch_size 行ずつ取得する (件数が多いプロジェクト向け)。
+        selectinload 等の eager load とは併用しないこと (全件バッファされる)。
+        ストリーム中は session の接続を占有するので、同じ session で別クエリを
+        並行実行しないこと。
+        """
+        from backend.models.workflow_execution import WorkflowExecution
+
+        stmt = (
+            select(WorkflowExecution)
+            .where(
+                WorkflowExecution.project_user_email == self.user_email,
+                WorkflowExecution.project_name == self.name,
+            )
+            .order_by(WorkflowExecution.workflow_execution_key)
+            .execution_options(yield_per=batch_size)
+        )
+        async for execution in await session.stream_scalars(stmt):
+            yield execution
+
     @classmethod
     def create(
         cls, *,
@@ -133,12 +223,9 @@ class Project(AsyncAttrs, Base):
         name: str,
         description: str | None = None
     ):
-        """ファクトリ: 作成・更新日時を自動付与"""
-        now = dt.now()
+        """ファクトリ: 作成・更新日時は DB 側 (server_default=now()) で付与"""
         return cls(
             user_email=user_email,
             name=name,
             description=description,
-            created_at=now,
-            updated_at=now,
         )
@@ -19,20 +19,18 @@ LLM によるセキュリティスキャン（OWASP Top10 等）の結果を保
 
 from __future__ import annotations
 
-from datetime import datetime as dt
 from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, String, Integer, Text as SAText, ForeignKeyConstraint, func
-from sqlalchemy.ext.asyncio import AsyncAttrs
+from sqlalchemy import BigInteger, Identity, String, Integer, Text as SAText, ForeignKeyConstraint, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from backend.models.core import Base, PKStr, CreatedAt
+from backend.models.core import Base, PKStr, CreatedAt, BulkInsertMixin
 
 if TYPE_CHECKING:
     from backend.models.project import Project
 
 
-class SecurityReport(AsyncAttrs, Base):
+class SecurityReport(BulkInsertMixin, Base):
     """脆弱性診断レポート"""
 
     __tablename__ = "security_reports"
@@ -44,15 +42,20 @@ class SecurityReport(AsyncAttrs, Base):
             ondelete="CASCADE",
             name="security_reports_project_user_email_project_name_fkey",
         ),
+        # プロジェクト別の最新 N 件 (ORDER BY created_at DESC) を索引範囲走査で返す
+        Index(
+            "ix_security_reports_project_created",
+            "project_user_email", "project_name", text("created_at DESC"),
+        ),
         {"schema": "agentbased"},
     )
 
     # ── プライマリキー ──────────────────────────────────────────
     security_report_key: Mapped[int] = mapped_column(
         BigInteger,
+        Identity(always=False),
         primary_key=True,
-        server_default=func.nextval("agentbased.security_reports_security_report_key_seq"),
-        comment="主キー。シーケンスで自動付与"
+        comment="主キー。DB 側で自動採番 (シーケンス名に依存しない)"
     )
 
     # ── FK 一部 ────────────────────────────────────────────────
@@ -71,7 +74,10 @@ class SecurityReport(AsyncAttrs, Base):
     report: Mapped[str | None] = mapped_column(
         SAText,
         nullable=True,
-        comment="脆弱性レポート本文 (Markdown / JSON 等)"
+        comment="脆弱性レポート本文 (Markdown / JSON 等)",
+        deferred=True,             # 一覧では読まない (undefer_group("body") で取得)
+        deferred_group="body",
+        deferred_raiseload=True,
     )
     vulnerability_count: Mapped[int | None] = mapped_column(
         Integer,
@@ -90,7 +96,7 @@ class SecurityReport(AsyncAttrs, Base):
     project: Mapped["Project"] = relationship(
         "Project",
         back_populates="security_reports",
-        lazy="selectin",
+        lazy="raise_on_sql",
         doc="このレポートが属するプロジェクト"
     )
 
@@ -112,12 +118,11 @@ class SecurityReport(AsyncAttrs, Base):
     ) -> SecurityReport:
         """
         ファクトリメソッド:
-        新規レポートを作成するときに使用。作成日時を自動付与します。
+        新規レポートを作成するときに使用。作成日時は DB 側で付与されます。
         """
         return cls(
             project_user_email=project_user_email,
             project_name=project_name,
             report=report,
             vulnerability_count=vulnerability_count,
-            created_at=dt.utcnow(),
         )
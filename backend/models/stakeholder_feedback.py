@@ -16,7 +16,6 @@ StakeholderFeedback モデル
 """
 
 from __future__ import annotations
-from datetime import datetime as dt
 from typing import TYPE_CHECKING
 
 from sqlalchemy import (
@@ -24,18 +23,19 @@ from sqlalchemy import (
     String,
     Text as SAText,
     ForeignKeyConstraint,
+    Index,
     func,
+    text,
 )
-from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from backend.models.core import Base, PKStr, CreatedAt, UpdatedAt
+from backend.models.core import Base, PKStr, CreatedAt, UpdatedAt, BulkInsertMixin
 
 if TYPE_CHECKING:
     from backend.models.project import Project
 
 
-class StakeholderFeedback(AsyncAttrs, Base):
+class StakeholderFeedback(BulkInsertMixin, Base):
     """ステークホルダーからのレビュー・要望を表す ORM モデル"""
 
     __tablename__ = "stakeholder_feedback"
@@ -47,6 +47,11 @@ class StakeholderFeedback(AsyncAttrs, Base):
             ondelete="CASCADE",
             name="fk_feedback_project",
         ),
+        # プロジェクト別の最新 N 件 (ORDER BY created_at DESC) を索引範囲走査で返す
+        Index(
+            "ix_stakeholder_feedback_project_created",
+            "project_user_email", "project_name", text("created_at DESC"),
+        ),
         # スキーマ指定
         {"schema": "agentbased"},
     )
@@ -82,6 +87,9 @@ class StakeholderFeedback(AsyncAttrs, Base):
         SAText,
         nullable=True,
         comment="フィードバック本文",
+        deferred=True,             # 一覧では読まない (undefer_group("body") で取得)
+        deferred_group="body",
+        deferred_raiseload=True,
     )
 
     # ── レコード作成／更新タイムスタンプ ────────────────────────
@@ -99,7 +107,7 @@ class StakeholderFeedback(AsyncAttrs, Base):
     project: Mapped["Project"] = relationship(
         "Project",
         back_populates="feedbacks",
-        lazy="selectin",
+        lazy="raise_on_sql",
         doc="このフィードバックが属するプロジェクトへの参照",
     )
 
@@ -124,14 +132,11 @@ class StakeholderFeedback(AsyncAttrs, Base):
         """
         ファクトリメソッド:
         引数で受け取ったステークホルダー情報・フィードバックを設定し、
-        created_at/updated_at を現在 UTC 時刻でセットした新規インスタンスを返す。
+        新規インスタンスを返す (created_at/updated_at は DB 側で付与)。
         """
-        now = dt.utcnow()
         return cls(
             project_user_email=project_user_email,
             project_name=project_name,
             stakeholder=stakeholder,
             feedback=feedback,
-            created_at=now,
-            updated_at=now,
         )
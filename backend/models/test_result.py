@@ -24,20 +24,18 @@ LLM テスト実行の結果（QA レポート、カバレッジ）を保存す
 
 from __future__ import annotations
 
-from datetime import datetime as dt
 from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, String, Numeric, Text as SA_Text, ForeignKeyConstraint
-from sqlalchemy.ext.asyncio import AsyncAttrs
+from sqlalchemy import BigInteger, String, Numeric, Text as SA_Text, ForeignKeyConstraint, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from backend.models.core import Base, PKStr, CreatedAt
+from backend.models.core import Base, PKStr, CreatedAt, BulkInsertMixin
 
 if TYPE_CHECKING:
     from backend.models.project import Project
 
 
-class TestResult(AsyncAttrs, Base):
+class TestResult(BulkInsertMixin, Base):
     """
     テスト結果モデル
     - LLM が生成した QA レポートやテストカバレッジを
@@ -52,6 +50,11 @@ class TestResult(AsyncAttrs, Base):
             ondelete="CASCADE",
             name="test_results_project_fkey",
         ),
+        # プロジェクト別の最新 N 件 (ORDER BY created_at DESC) を索引範囲走査で返す
+        Index(
+            "ix_test_results_project_created",
+            "project_user_email", "project_name", text("created_at DESC"),
+        ),
         {"schema": "agentbased"},
     )
 
@@ -79,7 +82,10 @@ class TestResult(AsyncAttrs, Base):
     qa_report: Mapped[str | None] = mapped_column(
         SA_Text,
         nullable=True,
-        comment="QA レポート (Markdown / JSON など)"
+        comment="QA レポート (Markdown / JSON など)",
+        deferred=True,             # 一覧では読まない (undefer_group("body") で取得)
+        deferred_group="body",
+        deferred_raiseload=True,
     )
     test_coverage: Mapped[float | None] = mapped_column(
         Numeric(5, 2),
@@ -89,14 +95,13 @@ class TestResult(AsyncAttrs, Base):
 
     created_at: Mapped[CreatedAt] = mapped_column(
         comment="レコード作成日時",
-        server_default="CURRENT_TIMESTAMP"
     )
 
     # ── リレーション: Project ─────────────────────────
     project: Mapped["Project"] = relationship(
         "Project",
         back_populates="test_results",
-        lazy="selectin",
+        lazy="raise_on_sql",
         doc="この結果が紐づくプロジェクト"
     )
 
@@ -118,13 +123,11 @@ class TestResult(AsyncAttrs, Base):
     ) -> TestResult:
         """
         ファクトリメソッド:
-        created_at を現在時刻で自動付与する。
+        created_at は DB 側 (server_default=now()) で付与される。
         """
-        now = dt.now()
         return cls(
             project_user_email=project_user_email,
             project_name=project_name,
             qa_report=qa_report,
             test_coverage=test_coverage,
-            created_at=now,
         )
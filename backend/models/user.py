@@ -3,8 +3,7 @@ from __future__ import annotations
 
 from typing import List
 from sqlalchemy.orm import Mapped, relationship, mapped_column
-from sqlalchemy import String
-from sqlalchemy.ext.asyncio import AsyncAttrs
+from sqlalchemy import Index, String
 from backend.models.core import Base, PKStr, CreatedAt, UpdatedAt
 
 from typing import TYPE_CHECKING
@@ -12,10 +11,19 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from backend.models.project import Project  # ✅ Project クラスは project.py で定義
 
-class User(AsyncAttrs, Base):
+class User(Base):
     """ユーザ: email を主キーとした自然キー設計"""
     __tablename__ = "users"
-    __table_args__ = {"schema": "agentbased"}
+    __table_args__ = (
+        # 認証クエリ (email → username, role, created_at) を Index Only Scan で完結させる
+        Index(
+            "ix_users_email_auth",
+            "email",
+            unique=True,
+            postgresql_include=["username", "role", "created_at"],
+        ),
+        {"schema": "agentbased"},
+    )
 
     email:       Mapped[PKStr]                  # 例: alice@example.com
     username:    Mapped[str] = mapped_column(String(100), nullable=False)
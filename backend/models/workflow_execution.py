@@ -15,17 +15,16 @@ from __future__ import annotations
 from datetime import datetime as dt
 from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, String, DateTime, Text, ForeignKeyConstraint
-from sqlalchemy.ext.asyncio import AsyncAttrs
+from sqlalchemy import BigInteger, String, DateTime, Text, ForeignKeyConstraint, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from backend.models.core import Base, PKStr, CreatedAt
+from backend.models.core import Base, PKStr, CreatedAt, BulkInsertMixin
 
 if TYPE_CHECKING:
     from backend.models.project import Project
 
 
-class WorkflowExecution(AsyncAttrs, Base):
+class WorkflowExecution(BulkInsertMixin, Base):
     """ワークフロー実行ログを表す ORM モデル"""
 
     __tablename__ = "workflow_executions"
@@ -37,6 +36,11 @@ class WorkflowExecution(AsyncAttrs, Base):
             ondelete="CASCADE",
             name="workflow_executions_project_fkey",
         ),
+        # プロジェクト別の最新 N 件 (ORDER BY created_at DESC) を索引範囲走査で返す
+        Index(
+            "ix_workflow_executions_project_created",
+            "project_user_email", "project_name", text("created_at DESC"),
+        ),
         # スキーマ指定
         {"schema": "agentbased"},
     )
@@ -85,19 +89,21 @@ class WorkflowExecution(AsyncAttrs, Base):
         Text,
         nullable=True,
         comment="実行結果のサマリー・ログ (summary)",
+        deferred=True,             # 一覧では読まない (undefer_group("body") で取得)
+        deferred_group="body",
+        deferred_raiseload=True,
     )
 
     # ── 作成日時 (テーブル定義にのみ存在) ───────────────────────
     created_at: Mapped[CreatedAt] = mapped_column(
         comment="レコード作成日時",
-        server_default="CURRENT_TIMESTAMP",
     )
 
     # ── リレーション: Project への多対一 ────────────────────────
     project: Mapped["Project"] = relationship(
         "Project",
         back_populates="workflow_executions",
-        lazy="selectin",
+        lazy="raise_on_sql",
         doc="この実行が属するプロジェクトへの参照",
     )
 
@@ -124,9 +130,8 @@ class WorkflowExecution(AsyncAttrs, Base):
         """
         ファクトリメソッド:
         引数で受け取った開始／終了時刻、ステータス、サマリーを設定し、
-        created_at は現在 UTC 時刻で自動セットする。
+        created_at は DB 側 (server_default=now()) で付与される。
         """
-        now = dt.now()
         return cls(
             project_user_email=project_user_email,
             project_name=project_name,
@@ -134,5 +139,4 @@ class WorkflowExecution(AsyncAttrs, Base):
             end_time=end_time,
             status=status,
             summary=summary,
-            created_at=now,
         )
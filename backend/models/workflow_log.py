@@ -3,8 +3,7 @@ from __future__ import annotations
 
 from typing import List
 
-from sqlalchemy import Integer, LargeBinary, String, Text
-from sqlalchemy.ext.asyncio import AsyncAttrs
+from sqlalchemy import BigInteger, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.models.core import Base, CreatedAt, PKInt
@@ -14,10 +13,10 @@ if TYPE_CHECKING:  # 遅延 import 用
     from backend.models.log_archive import LogArchive
 
 
-class WorkflowLog(AsyncAttrs, Base):
+class WorkflowLog(Base):
     """
     1 ワークフロー実行単位のメタデータ
-    zip_data は完了後に ZIP でバンドルした成果物
+    zip_uri は完了後に ZIP でバンドルした成果物の保存先 (本体は DB 外)
     """
     __table_args__ = {"schema": "agentbased"}
     __tablename__ = "workflow_logs"
@@ -29,17 +28,23 @@ class WorkflowLog(AsyncAttrs, Base):
     max_cost:     Mapped[float | None]
     # ★ NEW: 最大ループ回数
     max_loops:    Mapped[int] = mapped_column(Integer, nullable=False, default=3)
-    zip_data:     Mapped[bytes | None] = mapped_column(LargeBinary)
+    zip_uri:      Mapped[str | None] = mapped_column(String(1024))
+    zip_size:     Mapped[int | None] = mapped_column(BigInteger)
+    zip_sha256:   Mapped[str | None] = mapped_column(String(64))
     created_at:   Mapped[CreatedAt]
 
     # ---------- children ----------
+    # カスケードは親側のみで宣言。子行の削除は FK の ON DELETE CASCADE に任せ、
+    # 親の削除時に子コレクションを SELECT しない (passive_deletes)。
     steps: Mapped[List["WorkflowLogStep"]] = relationship(
         back_populates="workflow_log",
         cascade="all, delete-orphan",
+        passive_deletes=True,
         order_by="WorkflowLogStep.id",
     )
     log_archives: Mapped[List["LogArchive"]] = relationship(
         back_populates="workflow_log",
         cascade="all, delete-orphan",
+        passive_deletes=True,
         order_by="LogArchive.id",
     )
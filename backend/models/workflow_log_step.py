@@ -3,7 +3,6 @@ from __future__ import annotations
 
 from sqlalchemy import Integer, String, JSON, Float, Text, ForeignKey
 from sqlalchemy.orm import Mapped, relationship, mapped_column
-from sqlalchemy.ext.asyncio import AsyncAttrs
 from backend.models.core import Base, CreatedAt, PKInt
 
 from typing import TYPE_CHECKING
@@ -11,7 +10,7 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from backend.models.workflow_log import WorkflowLog  # ✅ WorkflowLog クラスは workflow_log.py で定義
 
-class WorkflowLogStep(AsyncAttrs, Base):
+class WorkflowLogStep(Base):
     """LangGraph の各ステップ結果"""
 
     __table_args__ = {"schema": "agentbased"}
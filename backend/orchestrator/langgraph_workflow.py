@@ -3,23 +3,29 @@
 LangGraph-based Orchestrator
 ─────────────────────────────────────────────────────────────
 * 各 AI エージェント呼び出しを StateGraph で組み合わせる。
+* 互いに依存しないフロントロード 5 エージェント、および QA / Security は
+  並行実行 (fan-out / fan-in)。
+* 各ノードは更新差分だけを返し、messages / total_cost は reducer で合算する。
+* AGENT_CACHE_ENABLED 時は temperature=0 を明示した呼び出しに限り、応答を
+  (agent, path, payload, model) 単位でキャッシュする (既定は無効)。
 * QA / Security 結果を判定し、max_loops までコード修正ループを実施。
 * 逐次コールバック・コスト集計・ZIP 生成などを一括管理。
 """
 from __future__ import annotations
-import inspect
+import json
 import logging
-import re
+import operator
 import time
-from typing import Any, Awaitable, Callable, Dict, List, Optional, TypedDict
+from typing import Annotated, Any, Awaitable, Callable, Dict, List, Optional, TypedDict
 
 from langgraph.graph import StateGraph, START, END
 
 from backend.config.settings import get_settings
-from backend.services.log_archive_service import save_log_archive
+from backend.services.log_archive_service import save_workflow_archive
 from backend.services.zip_service import build_zip_bundle
 from common.agent_http import AgentHTTPError, post_json
 from common.cost_tracker import record as record_cost
+from common.llm_cache import LLMResponseCache
 
 logger = logging.getLogger("orchestrator.langgraph_workflow")
 settings = get_settings()
@@ -28,16 +34,28 @@ settings = get_settings()
 _ON_STEP: Optional[Callable[[str, str, Any], Awaitable[None]]] = None
 
 
+# ワークフロー ID → 進捗通知用の累積コスト。fan-out 中の並行ノードは同じ
+# スナップショットの state を読むため、s["total_cost"] + cost では通知値が
+# 過少・逆行する。グラフ外で 1 本のカウンタに加算する (正しい合計は reducer 側)。
+_RUN_COST: Dict[Any, float] = {}
+
+
 def set_on_step(cb: Optional[Callable[[str, str, Any], Awaitable[None]]]) -> None:
-    """外部 UI からステップ完了時のコールバックを挿入するユーティリティ"""
+    """
+    外部 UI からステップ完了時のコールバックを挿入するユーティリティ
+    (cb は async def であること。call_agent は戻り値を判定せずそのまま await する)
+    """
     global _ON_STEP
     _ON_STEP = cb
 
 
 # ---------- ワークフロー状態定義 ---------------------------------------------
 class WorkflowState(TypedDict, total=False):
+    # 並行ノードからの書き込みを合算する reducer 付きキー
+    messages:       Annotated[List[Dict[str, Any]], operator.add]
+    total_cost:     Annotated[float, operator.add]
+
     # 固定パラメータ
-    messages:       List[Dict[str, Any]]
     requirement:    str
     project_name:   str
     model_name:     str
@@ -46,7 +64,6 @@ class WorkflowState(TypedDict, total=False):
     mode:           str
     max_loops:      int
     loop_count:     int
-    total_cost:     float
 
     # 動的アウトプット
     feedback_summary: str
@@ -58,6 +75,11 @@ class WorkflowState(TypedDict, total=False):
     qa_report:        str
     security_report:  str
     patched_code:     str
+    patch_unchanged:  bool
+
+    # ループ制御
+    loop_next:        bool
+    instructions:     str
 
 
 # ---------- 各エージェントのベース URL ---------------------------------------
@@ -73,6 +95,29 @@ AGENT_URLS = {
     "patch":       settings.agent_patch_url,
 }
 
+# ---------- エージェント応答キャッシュ ---------------------------------------
+# 既定は無効 (AGENT_CACHE_ENABLED)。有効時も AGENT_CACHEABLE_AGENTS に含まれ、かつ
+# payload が temperature=0 を明示した呼び出しだけを対象にする (サンプリングされた
+# 応答を再実行で使い回さない)。各エージェント内の common.llm_cache とは別層なので、
+# 併用時の TTL は短い方が実効値になる点に注意。
+# 値はレスポンス JSON 文字列。ヒット時は LLM を呼ばないためコスト 0 として記録しない。
+_agent_cache = LLMResponseCache(
+    ttl=settings.agent_cache_ttl,
+    max_entries=settings.agent_cache_max_entries,
+    enabled=settings.agent_cache_enabled,
+)
+_CACHEABLE_AGENTS = settings.agent_cacheable_agents
+
+
+def _agent_cache_key(agent: str, path: str, payload: Dict[str, Any], model: str) -> Optional[str]:
+    """キャッシュ対象ならキー (payload はキー順を正規化して連結) を、対象外なら None を返す"""
+    if not _agent_cache.enabled or agent not in _CACHEABLE_AGENTS:
+        return None
+    if payload.get("temperature") != 0:
+        return None
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return _agent_cache.make_key(canonical, model, namespace=f"{agent}{path}")
+
 # --------------------------------------------------------------------------- #
 # 共通: エージェント呼び出しラッパー
 # --------------------------------------------------------------------------- #
@@ -82,58 +127,84 @@ async def call_agent(
     payload: Dict[str, Any],
     state_key: str,
     s: WorkflowState,
-) -> WorkflowState:
+    extra_keys: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
     """
     任意エージェントへ POST してレスポンス JSON を受け取り、
-    `state_key` に該当する値を WorkflowState に書き戻す。
-    * コストを USD 換算し累積
-    * _ON_STEP が設定されていれば（非同期）コールバック
+    `state_key` に該当する値を WorkflowState への更新差分として返す。
+    * extra_keys ({レスポンスキー: state キー}) で補助フィールドも書き戻す
+    * キャッシュ対象エージェントは同一入力の応答を再利用 (cost 0 / tokens 0)
+    * コストを USD 換算し、messages / total_cost は reducer で累積される
+      (並行ノードが同時に返しても上書きし合わない)
+    * _ON_STEP が設定されていれば await してコールバック (async def 前提)
     """
-    url = f"{AGENT_URLS[agent]}{path}"
     t0 = time.time()
-    try:
-        res = await post_json(url, payload,
-                              timeout=settings.request_timeout,
-                              max_retries=settings.max_retries)
-    except AgentHTTPError as exc:              # ← 失敗は上位で捕捉
-        logger.error("Agent %s error: %s", agent, exc, exc_info=True)
-        raise
+    cache_key = _agent_cache_key(agent, path, payload, s["model_name"])
+    cached = _agent_cache.get(cache_key) if cache_key else None
+    if cached is not None:
+        res  = {**json.loads(cached), "usage": {"total_tokens": 0}}
+        cost = 0.0
+        logger.debug("Agent cache hit: %s%s key=%s", agent, path, cache_key[:12])
+    else:
+        try:
+            res = await post_json(AGENT_URLS[agent], path, payload,
+                                  timeout=settings.request_timeout,
+                                  max_retries=settings.max_retries)
+        except AgentHTTPError as exc:          # ← 失敗は上位で捕捉
+            logger.error("Agent %s error: %s", agent, exc, exc_info=True)
+            raise
+        if cache_key:
+            _agent_cache.set(cache_key, json.dumps(res, ensure_ascii=False))
+        tokens = res.get("usage", {}).get("total_tokens", 0)
+        cost   = float(record_cost(res.get("model_name", s["model_name"]),
+                                   tokens, s["project_name"], path.lstrip("/")))
 
     elapsed = time.time() - t0
-    tokens  = res.get("usage", {}).get("total_tokens", 0)
-    cost    = record_cost(res.get("model_name", s["model_name"]),
-                          tokens, s["project_name"], path.lstrip("/"))
-
-    if _ON_STEP:
-        info = {**res, "seconds": elapsed, "cost": cost,
-                "total_cost": s["total_cost"] + cost}
-        cb_res = _ON_STEP(agent, path.lstrip("/"), info)
-        if inspect.isawaitable(cb_res):
-            await cb_res
-
-    # state 更新
+
+    if _ON_STEP is not None:
+        wid = s.get("workflow_id")
+        running = _RUN_COST[wid] = _RUN_COST.get(wid, s.get("total_cost", 0.0)) + cost
+        info = {**res, "seconds": elapsed, "cost": cost, "total_cost": running}
+        await _ON_STEP(agent, path.lstrip("/"), info)
+
+    # state 更新差分
+    extras = {dst: res[src] for src, dst in (extra_keys or {}).items() if src in res}
     return {
-        **s,
+        **extras,
         state_key: res.get(state_key, ""),
-        "messages": s["messages"] + [{
+        "messages": [{
             "agent":   agent,
             "step":    path,
             "seconds": elapsed,
             "cost":    cost,
+            "cached":  cached is not None,
         }],
-        "total_cost": s["total_cost"] + cost,
+        "total_cost": cost,
     }
 
+
+def _agent_node(
+    agent: str,
+    path: str,
+    state_key: str,
+    build_payload: Callable[[WorkflowState], Dict[str, Any]],
+    extra_keys: Optional[Dict[str, str]] = None,
+) -> Callable[[WorkflowState], Awaitable[Dict[str, Any]]]:
+    """call_agent を await する LangGraph ノード (async 関数) を生成"""
+    async def _node(s: WorkflowState) -> Dict[str, Any]:
+        return await call_agent(agent, path, build_payload(s), state_key, s, extra_keys)
+    _node.__name__ = f"{agent}_step"
+    return _node
+
 # --------------------------------------------------------------------------- #
 # LangGraph DAG 構築
 # --------------------------------------------------------------------------- #
 builder = StateGraph(WorkflowState)
 
-def _init(s: WorkflowState) -> WorkflowState:
-    """入力パラメータを初期 WorkflowState に展開"""
+def _init(s: WorkflowState) -> Dict[str, Any]:
+    """入力パラメータを初期 WorkflowState に展開 (messages は入力のまま)"""
     init = s["messages"][0]
     return {
-        **s,
         "requirement":  init["requirement"],
         "project_name": init["project_name"],
         "model_name":   init.get("model_name", "o4-mini"),
@@ -147,13 +218,16 @@ def _init(s: WorkflowState) -> WorkflowState:
         "feedback_summary": "",
         "schedule": "", "advice": "", "dba_script": "",
         "ui": "", "code": "", "qa_report": "", "security_report": "",
-        "patched_code": "",
+        "patched_code": "", "patch_unchanged": False,
     }
 
 builder.add_node("init", _init)
 builder.add_edge(START, "init")
 
 # ---------- フロントロード部分（要件 → 1st コード生成まで） -------------------
+# 5 エージェントは同じ入力だけを参照し互いの出力に依存しないため、
+# init から同一スーパーステップに fan-out し、front_join で全完了を待つ
+# (所要時間 = 5 本の合計ではなく最も遅い 1 本)。
 front_steps = [
     ("stakeholder", "/collect_feedback", "feedback_summary"),
     ("pm",          "/schedule",         "schedule"),
@@ -162,23 +236,24 @@ front_steps = [
     ("ui",          "/generate_ui",      "ui"),
 ]
 
-prev = "init"
+
+def _front_payload(s: WorkflowState) -> Dict[str, Any]:
+    return {"requirement": s["requirement"], "project_name": s["project_name"],
+            "model_name": s["model_name"]}
+
+
+front_nodes = []
 for agent, path, key in front_steps:
     node = f"{agent}_step"
-    builder.add_node(
-        node,
-        lambda s, a=agent, p=path, k=key: call_agent(
-            a, p,
-            {"requirement": s["requirement"], "project_name": s["project_name"],
-             "model_name": s["model_name"]},
-            k, s,
-        ),
-    )
-    builder.add_edge(prev, node)
-    prev = node
+    builder.add_node(node, _agent_node(agent, path, key, _front_payload))
+    builder.add_edge("init", node)
+    front_nodes.append(node)
+
+builder.add_node("front_join", lambda s: {})
+builder.add_edge(front_nodes, "front_join")   # 全ノード完了で 1 回だけ発火
 
 # ---------- ループ本体（code → qa → security） -------------------------------
-def _code_step(s: WorkflowState) -> WorkflowState:
+async def _code_step(s: WorkflowState) -> Dict[str, Any]:
     """コード生成 or パッチ適用結果を code に反映"""
     # patched_code があればそれをベースに次 QA へ回す
     payload = {
@@ -191,70 +266,74 @@ def _code_step(s: WorkflowState) -> WorkflowState:
     # patched_code が空なら通常コード生成 / 非空なら再生成をスキップ
     state_key = "code"
     if s.get("patched_code"):
-        # すでに修正コードが state にある → 何もしない
-        return s
-    return call_agent("code", "/generate_code", payload, state_key, s)
+        # すでに修正コードが state にある → 再生成せず QA 対象に差し替える
+        return {"code": s["patched_code"]}
+    return await call_agent("code", "/generate_code", payload, state_key, s)
 
 builder.add_node("code_step", _code_step)
-builder.add_edge(prev, "code_step")
+builder.add_edge("front_join", "code_step")
 
 # QA
 builder.add_node(
     "qa_step",
-    lambda s: call_agent(
-        "qa", "/run_qa",
-        {"project_name": s["project_name"],
-         "requirement":  s["requirement"],
-         "code":         s["code"],
-         "model_name":   s["model_name"]},
-        "qa_report", s,
+    _agent_node(
+        "qa", "/run_qa", "qa_report",
+        lambda s: {"project_name": s["project_name"],
+                   "requirement":  s["requirement"],
+                   "code":         s["code"],
+                   "model_name":   s["model_name"],
+                   # 直前のパッチで変更なし → QA 側で mutmut / benchmark を省略
+                   "unchanged":    s.get("patch_unchanged", False)},
     ),
 )
-builder.add_edge("code_step", "qa_step")
 
 # Security
 builder.add_node(
     "sec_step",
-    lambda s: call_agent(
-        "security", "/scan_security",
-        {"code": s["code"], "ui": s["ui"], "model_name": s["model_name"]},
-        "security_report", s,
+    _agent_node(
+        "security", "/scan_security", "security_report",
+        lambda s: {"code": s["code"], "ui": s["ui"], "model_name": s["model_name"]},
     ),
 )
-builder.add_edge("qa_step", "sec_step")
+# QA と Security は code だけに依存し互いに独立 → 並行実行し、両方の完了で evaluate
+# (各ループ周回ごとに 2 本の合計ではなく遅い 1 本分で済む)
+builder.add_edge("code_step", "qa_step")
+builder.add_edge("code_step", "sec_step")
 
 # ---------- ループ判定 --------------------------------------------------------
-def _evaluate(s: WorkflowState) -> WorkflowState:
+def _has_ok(report: str) -> bool:
+    """「問題なし」/ "No issues" (大文字小文字無視) を含むか。固定文字列なので in で判定"""
+    text = report.casefold()
+    return "問題なし" in text or "no issues" in text
+
+
+def _evaluate(s: WorkflowState) -> Dict[str, Any]:
     """
     QA / Security レポートに「問題なし」が含まれない、
     かつ max_loops 未到達なら loop フラグを立てる。
     """
-    need_fix = True
-    ok_pattern = re.compile(r"(?:問題なし|No issues)", re.IGNORECASE)
-    if ok_pattern.search(s["qa_report"]) and ok_pattern.search(s["security_report"]):
-        need_fix = False
-
+    need_fix = not (_has_ok(s["qa_report"]) and _has_ok(s["security_report"]))
     loop_next = need_fix and (s["loop_count"] < s["max_loops"])
-    return {**s, "loop_next": loop_next}
+    return {"loop_next": loop_next}
 
 builder.add_node("evaluate", _evaluate)
-builder.add_edge("sec_step", "evaluate")
+builder.add_edge(["qa_step", "sec_step"], "evaluate")
 
 # ---------- 条件付き遷移 ------------------------------------------------------
-def _increment_loop(s: WorkflowState) -> WorkflowState:
+def _increment_loop(s: WorkflowState) -> Dict[str, Any]:
     """パッチ用 instructions を生成し loop_count++"""
     instruction = f"以下のQA/Security指摘を修正してください。\nQA:\n{s['qa_report']}\nSecurity:\n{s['security_report']}"
-    return {**s, "patched_code": "", "loop_count": s["loop_count"] + 1,
+    return {"patched_code": "", "loop_count": s["loop_count"] + 1,
             "instructions": instruction}
 
 builder.add_node(
     "patch_step",
-    lambda s: call_agent(
-        "patch", "/patch_code",
-        {"source_code": s["code"],
-         "instructions": s["instructions"],
-         "model_name": s["model_name"]},
-        "patched_code", s,
+    _agent_node(
+        "patch", "/patch_code", "patched_code",
+        lambda s: {"source_code": s["code"],
+                   "instructions": s["instructions"],
+                   "model_name": s["model_name"]},
+        extra_keys={"unchanged": "patch_unchanged"},
     ),
 )
 
@@ -269,7 +348,7 @@ builder.add_conditional_edges(
 )
 builder.add_node("increment_loop", _increment_loop)
 builder.add_edge("increment_loop", "patch_step")
-# パッチ適用後、再び QA → Security へ
+# パッチ適用後、再び QA / Security へ
 builder.add_edge("patch_step", "code_step")
 
 compiled_graph = builder.compile()
@@ -290,6 +369,7 @@ async def execute_workflow(
     """LangGraph を非同期実行し、完了後 ZIP アーカイブを生成する"""
     global _ON_STEP
     _ON_STEP = on_step
+    _RUN_COST[workflow_id] = 0.0
 
     try:
         init_state: WorkflowState = {
@@ -306,10 +386,13 @@ async def execute_workflow(
         result = await compiled_graph.ainvoke(init_state)
 
         # ZIP 圧縮 & DB 保存
-        zip_bytes = build_zip_bundle(project_name, workflow_id, result)
-        archive_id = save_log_archive(project_name, workflow_id, zip_bytes)
+        zip_bytes = build_zip_bundle(workflow_id, result)
+        archive_id = await save_workflow_archive(
+            workflow_id, project_name, f"workflow_{workflow_id}.zip", zip_bytes
+        )
 
         result["messages"].append({"archive_id": archive_id})
         return {**result, "archive_id": archive_id}
     finally:
         _ON_STEP = None
+        _RUN_COST.pop(workflow_id, None)
@@ -7,19 +7,27 @@ Provides:
   - POST /api/auth/login: OAuth2 login endpoint accepting form data (email/password),
     verifies credentials against the database, issues a JWT access token,
     and sets it as an HTTPOnly cookie for browser clients.
+  - POST /api/auth/logout: revokes the presented token (drops it from the
+    JWT → user cache) and clears the cookie. Revocation is per worker process;
+    the response reports how long the token stays valid in other workers.
 """
 
 import logging
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import bindparam
 from sqlalchemy.future import select
 
-from backend.db.dependencies_async import get_db
+from backend.db.dependencies_async import extract_token, get_db, oauth2_scheme, revoke_token
 from backend.models.user import User as UserModel
 from backend.security.auth import (
     create_access_token,  # 統一された JWT 発行ロジック
-    verify_password,      # bcrypt ハッシュ検証
+    decode_access_token,  # exp 取得用
+    verify_password_async,  # bcrypt ハッシュ検証 (専用スレッド)
     TokenResponse,        # Pydantic レスポンスモデル
 )
 
@@ -27,6 +35,21 @@ from backend.security.auth import (
 logger = logging.getLogger("backend.auth")
 logger.setLevel(logging.INFO)
 
+# ── ログイン照合クエリ (モジュールで 1 度だけ組み立て、値はバインドで渡す) ──
+_LOGIN_QUERY = select(
+    UserModel.email, UserModel.password_hash, UserModel.role
+).where(UserModel.email == bindparam("email"))
+
+class LogoutResponse(BaseModel):
+    """
+    ログアウト結果。失効リストはワーカープロセス内のみのため (scope="process")、
+    他ワーカーではトークンが exposure_seconds 秒後の exp まで受理され得る。
+    """
+    revoked: bool
+    scope: str = "process"
+    exposure_seconds: int = 0
+
+
 # ── API ルータ定義 ─────────────────────────────────────────────
 auth_router = APIRouter(
     prefix="",
@@ -67,24 +90,21 @@ async def login(
     """
     # リクエスト毎に生成される request_id（ログ追跡用）
     request_id = getattr(request.state, "request_id", "N/A")
-    logger.info(f"[{request_id}] Login attempt: email='{form_data.username}'")
+    logger.info("[%s] Login attempt: email='%s'", request_id, form_data.username)
 
-    # 1) DB からユーザを検索
-    result = await session.execute(
-        select(UserModel).where(UserModel.email == form_data.username)
-    )
-    user = result.scalar_one_or_none()
+    # 1) DB からユーザを検索 (照合に必要な列のみ。ORM エンティティは生成しない)
+    user = (await session.execute(_LOGIN_QUERY, {"email": form_data.username})).first()
     if not user:
-        logger.warning(f"[{request_id}] User not found: '{form_data.username}'")
+        logger.warning("[%s] User not found: '%s'", request_id, form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # 2) パスワード検証（bcrypt via passlib）
-    if not verify_password(form_data.password, user.password_hash):
-        logger.warning(f"[{request_id}] Incorrect password for '{form_data.username}'")
+    # 2) パスワード検証（bcrypt via passlib。CPU 処理はスレッドへ退避）
+    if not await verify_password_async(form_data.password, user.password_hash):
+        logger.warning("[%s] Incorrect password for '%s'", request_id, form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -99,7 +119,7 @@ async def login(
                 extra={"role": user.role}
             )
     except Exception as e:
-        logger.error(f"[{request_id}] Token generation failed: {e}")
+        logger.error("[%s] Token generation failed: %s", request_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Token generation failed",
@@ -114,6 +134,36 @@ async def login(
         samesite="lax",
     )
 
-    logger.info(f"[{request_id}] Login successful for '{form_data.username}'")
+    logger.info("[%s] Login successful for '%s'", request_id, form_data.username)
     # 5) レスポンスボディにアクセストークンを返却
     return TokenResponse(access_token=access_token)
+
+
+@auth_router.post(
+    "/logout",
+    response_model=LogoutResponse,
+    summary="トークン失効＆クッキー削除",
+)
+async def logout(
+    request: Request,
+    response: Response,
+    token: Optional[str] = Depends(oauth2_scheme),
+) -> LogoutResponse:
+    """
+    ログアウトエンドポイント。
+
+    - 提示されたトークンを失効リストに登録し、認証キャッシュから破棄
+    - 失効はこのワーカープロセス内のみ。WORKERS>1 では他ワーカーが exp まで
+      トークンを受理するため、その残り秒数を exposure_seconds として返す
+    - 既に無効なトークンでもクッキー削除のみ行い revoked=False を返却
+    """
+    result = LogoutResponse(revoked=False)
+    token = extract_token(request, token)
+    if token:
+        try:
+            exposure = revoke_token(token, decode_access_token(token).exp)
+            result = LogoutResponse(revoked=True, exposure_seconds=int(exposure))
+        except HTTPException:
+            pass  # 期限切れ・改ざんトークンはそもそも認証を通らない
+    response.delete_cookie("access_token")
+    return result
@@ -1,9 +1,14 @@
 """
 Liveness / readiness probe
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from backend.db.async_engine import pool_status
+from backend.db.dependencies_async import get_current_user
 
 router = APIRouter()
+# プール内部状態は運用者向けのため、認証必須の別ルータ (/api/debug) に分ける
+debug_router = APIRouter(dependencies=[Depends(get_current_user)])
 
 @router.get("/live", tags=["health"])
 async def liveness() -> dict[str, str]:
@@ -13,3 +18,8 @@ async def liveness() -> dict[str, str]:
 async def readiness() -> dict[str, str]:
     # ここで DB ping などを行っても良い
     return {"status": "ready"}
+
+@debug_router.get("/pool", tags=["debug"])
+async def db_pool() -> dict:
+    """DB コネクションプールの使用状況 (pool_size = ワーカー数 × 同時接続数 の調整用)"""
+    return pool_status()
@@ -15,14 +15,14 @@ ZIP 形式のビルド成果物（ワークフローログ）を管理するル
     - 旧 Flask Blueprint + 個別 FastAPI 版を完全統合。
     - ファイル I/O は UploadFile.read() (async) を使用
       → スレッドブロッキングを回避 :contentReference[oaicite:3]{index=3}
-    - ダウンロードは StreamingResponse でメモリ効率を確保
-      （大容量でも chunk 配信可） :contentReference[oaicite:4]{index=4}
+    - ZIP 本体は object_store に置き、DB には URI のみを保持
+    - ダウンロードは FileResponse でファイルから直接 chunk 配信
+      （DB から bytea を読み出さないため大容量でもメモリを消費しない）
 """
 
 from __future__ import annotations
 
-from io import BytesIO
-from typing import List
+from typing import Any, Dict, List
 
 from fastapi import (
     APIRouter,
@@ -33,16 +33,16 @@ from fastapi import (
     UploadFile,
     status,
 )
-from fastapi.responses import StreamingResponse, JSONResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import FileResponse, JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.db.dependencies_async import get_db
-from backend.models.log_archive import LogArchive
 from backend.services.log_archive_service import (
     save_log_archive,
     list_log_archives_by_project,
     get_log_archive,
 )
+from backend.services.object_store import local_path
 
 # -------------------------------------------------------------
 # APIRouter ―― prefix と tags を一元定義
@@ -50,8 +50,17 @@ from backend.services.log_archive_service import (
 # -------------------------------------------------------------
 router = APIRouter(prefix="/api/logs", tags=["logs"])
 
+
+def _summary(row: Any) -> Dict[str, Any]:
+    """(id, filename, created_at) の射影行を一覧用 dict に変換"""
+    return {
+        "archive_id": row.id,
+        "filename": row.filename,
+        "created_at": row.created_at.isoformat(),
+    }
+
 # -------------------------------------------------------------
-# POST /upload : ZIP を DB に保存
+# POST /upload : ZIP を object_store に保存し、URI を DB に記録
 # -------------------------------------------------------------
 @router.post(
     "/upload",
@@ -62,10 +71,11 @@ async def upload_archive(
     project_user_email: str = Form(..., description="ユーザ Email"),
     project_name: str = Form(..., description="プロジェクト名"),
     attachment: UploadFile = File(..., description="ZIP ファイル"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    クライアントから送られた ZIP バイト列を DB (log_archives) に保存し
+    クライアントから送られた ZIP バイト列を object_store に保存し、
+    URI を log_archives に記録して
     `archive_id` を返す。
 
     * UploadFile は spooled file オブジェクト。`.read()` は非同期で
@@ -73,7 +83,7 @@ async def upload_archive(
     """
     data: bytes = await attachment.read()
 
-    arch = save_log_archive(
+    arch = await save_log_archive(
         db=db,
         user_email=project_user_email,
         project_name=project_name,
@@ -90,24 +100,14 @@ async def upload_archive(
     response_model=List[dict],
     summary="全アーカイブの履歴一覧",
 )
-def history(db: Session = Depends(get_db)):
+async def history(db: AsyncSession = Depends(get_db)):
     """
     すべての LogArchive を作成日時降順で返却。
     ※ 管理者専用を想定、RBAC は別ミドルウェアで制御。
+    一覧に必要な 3 列だけを SELECT し、ORM オブジェクトは生成しない。
     """
-    arches = (
-        db.query(LogArchive)
-        .order_by(LogArchive.created_at.desc())
-        .all()
-    )
-    return [
-        {
-            "archive_id": a.id,
-            "filename": a.filename,
-            "created_at": a.created_at.isoformat(),
-        }
-        for a in arches
-    ]
+    rows = await list_log_archives_by_project(db=db, user_email=None, project_name=None)
+    return [_summary(r) for r in rows]
 
 # -------------------------------------------------------------
 # GET /list/{user}/{project} : プロジェクト単位の一覧
@@ -117,55 +117,50 @@ def history(db: Session = Depends(get_db)):
     response_model=List[dict],
     summary="プロジェクト別アーカイブ一覧",
 )
-def list_by_project(
+async def list_by_project(
     project_user_email: str,
     project_name: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     user & project をキーに絞り込み。  
     log_archive_service へ処理を委譲し、SRP を維持。
     """
-    arches = list_log_archives_by_project(
+    rows = await list_log_archives_by_project(
         db=db,
         user_email=project_user_email,
         project_name=project_name,
     )
-    return [
-        {
-            "archive_id": a.id,
-            "filename": a.filename,
-            "created_at": a.created_at.isoformat(),
-        }
-        for a in arches
-    ]
+    return [_summary(r) for r in rows]
 
 # -------------------------------------------------------------
-# GET /download/{archive_id} : ZIP ストリーミング
+# GET /download/{archive_id} : ZIP ファイル配信
 # -------------------------------------------------------------
 @router.get(
     "/download/{archive_id}",
     summary="ZIP をダウンロード",
 )
-def download_archive(
+async def download_archive(
     archive_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    指定 ID の ZIP を StreamingResponse で返却。  
-    メモリコピーを 1 度に抑えるため BytesIO を直接返す方式にした。
+    指定 ID の ZIP を FileResponse で返却。
+    DB からは URI だけを読み、本体はストレージから直接送出する。
     """
-    arch = get_log_archive(archive_id, db=db)
-    if not arch or not arch.zip_data:
+    arch = await get_log_archive(db, archive_id)
+    if not arch or not arch.zip_uri:
+        raise HTTPException(status_code=404, detail="Archive not found")
+    try:
+        path = local_path(arch.zip_uri)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Archive not found")
+    if not path.is_file():
         raise HTTPException(status_code=404, detail="Archive not found")
 
-    buf = BytesIO(arch.zip_data)
-    # Content-Disposition で適切なファイル名を指定することにより
-    # ブラウザの保存ダイアログに反映される。 :contentReference[oaicite:6]{index=6}
-    return StreamingResponse(
-        buf,
+    # filename 指定で Content-Disposition: attachment が付与される
+    return FileResponse(
+        path,
         media_type="application/zip",
-        headers={
-            "Content-Disposition": f'attachment; filename="{arch.filename}"'
-        },
+        filename=arch.filename,
     )
@@ -1,20 +1,54 @@
 from __future__ import annotations
 
 import logging
-from io import BytesIO
-from typing import List
+from typing import AsyncIterator, List
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, insert, select
 
+from backend.db.async_engine import get_session_factory
 from backend.db.dependencies_async import get_db, get_current_user
 from backend.models.file_attachment import FileAttachment  # 修正後のモデル
 
 router = APIRouter(prefix="", tags=["logs"])
 logger = logging.getLogger(__name__)
 
+# ダウンロード時に 1 クエリで読み出す bytea の大きさ
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+# アップロード時に UploadFile から 1 回で読み出して COPY へ流す大きさ
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+async def _read_chunks(upload: UploadFile, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """UploadFile (spooled file) を chunk_size ずつ読み出す"""
+    while chunk := await upload.read(chunk_size):
+        yield chunk
+
+
+async def _stream_file_data(archive_id: int, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    file_data を substring() で chunk_size ずつ読み出して順に返す。
+    保持するのは常に 1 チャンク分のみ。チャンクごとに接続をプールへ返すため、
+    低速クライアントへの送出中もコネクションを占有しない
+    (リクエストスコープの get_db セッションはレスポンス送出前に閉じられる)。
+    """
+    factory = get_session_factory()
+    offset = 1                                  # substring は 1 始まり
+    while True:
+        async with factory() as session:
+            chunk = await session.scalar(
+                select(func.substring(FileAttachment.file_data, offset, chunk_size))
+                .where(FileAttachment.file_attachment_key == archive_id)
+            )
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        offset += chunk_size
+
 @router.post(
     "/upload",
     status_code=status.HTTP_201_CREATED,
@@ -28,22 +62,32 @@ async def upload_log(
 ):
     """
     ログインユーザーが ZIP をアップロードし、DB に保存して ID を返す
+    * PostgreSQL (asyncpg) では UploadFile をチャンクごとに COPY へ流し込み、
+      ファイル全体を Python のメモリに載せない
+    * それ以外 (サイズ不明の場合を含む) は読み込んで INSERT ... RETURNING
     """
-    data = await attachment.read()
-    new = FileAttachment(
-        project_user_email=current_user.email,
-        project_name=project_name,
-        filename=attachment.filename,
-        file_type=attachment.content_type,
-        file_size=len(data),
-        file_data=data,
-    )
-    db.add(new)
+    meta = {
+        "project_user_email": current_user.email,
+        "project_name": project_name,
+        "filename": attachment.filename,
+        "file_type": attachment.content_type,
+    }
+    conn = await db.connection()
+    if conn.dialect.driver == "asyncpg" and attachment.size is not None:
+        key = await FileAttachment.copy_stream(
+            db, **meta, file_size=attachment.size, chunks=_read_chunks(attachment),
+        )
+    else:
+        data = await attachment.read()
+        key = await db.scalar(
+            insert(FileAttachment)
+            .values(**meta, file_size=len(data), file_data=data)
+            .returning(FileAttachment.file_attachment_key)
+        )
     await db.commit()
-    await db.refresh(new)
 
-    logger.info("Attachment %d saved by %s", new.file_attachment_key, current_user.email)
-    return {"archive_id": new.file_attachment_key}
+    logger.info("Attachment %d saved by %s", key, current_user.email)
+    return {"archive_id": key}
 
 
 @router.get(
@@ -58,12 +102,17 @@ async def list_history(
     認証ユーザーがアップロードしたファイルの一覧を返却
     """
     # DDL で定義された主キー file_attachment_key を参照
-    stmt = select(FileAttachment).where(
+    # 一覧に必要な列だけを Row で取得 (file_data の BYTEA や ORM インスタンスを載せない)
+    stmt = select(
+        FileAttachment.file_attachment_key,
+        FileAttachment.filename,
+        FileAttachment.upload_time,
+    ).where(
         FileAttachment.project_user_email == current_user.email
     ).order_by(FileAttachment.upload_time.desc())
 
     result = await db.execute(stmt)
-    items = result.scalars().all()
+    items = result.all()
 
     # フロント側が期待するフィールド名にマッピングして返却
     return [
@@ -86,21 +135,29 @@ async def download_archive(
     db: AsyncSession = Depends(get_db),
 ):
     """
-    指定の ID のファイルをストリーミングで返却
+    指定の ID のファイルを返却
+    先にメタデータだけを取得して存在・所有者を確認し、本体は
+    _stream_file_data でチャンク単位に送出する (メモリ使用量はチャンク分のみ)。
     """
-    stmt = select(FileAttachment).where(
+    stmt = select(
+        FileAttachment.filename,
+        FileAttachment.file_type,
+        func.octet_length(FileAttachment.file_data).label("size"),
+    ).where(
         FileAttachment.file_attachment_key == archive_id,
         FileAttachment.project_user_email == current_user.email
     )
     result = await db.execute(stmt)
-    item = result.scalar_one_or_none()
+    item = result.first()
 
-    if not item or not item.file_data:
+    if not item or not item.size:
         raise HTTPException(status_code=404, detail="File not found")
 
-    buf = BytesIO(item.file_data)
     return StreamingResponse(
-        buf,
+        _stream_file_data(archive_id),
         media_type=item.file_type or "application/octet-stream",
-        headers={"Content-Disposition": f'attachment; filename="{item.filename}"'},
+        headers={
+            "Content-Disposition": f'attachment; filename="{item.filename}"',
+            "Content-Length": str(item.size),
+        },
     )
@@ -3,8 +3,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.db.dependencies_async import get_db, get_current_user
-from backend.models import User
+from backend.db.dependencies_async import AuthUser, get_db, get_current_user
 
 router = APIRouter(
     prefix="",
@@ -13,7 +12,7 @@ router = APIRouter(
 
 @router.get("/", summary="ログイン中ユーザーのプロファイル取得")
 async def read_profile(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthUser = Depends(get_current_user),
 ) -> dict:
     """
     認証済みユーザーの情報を返却
@@ -4,15 +4,18 @@
 ============================================================
 JWT 認証ユーティリティモジュール
 ------------------------------------------------------------
-• パスワードのハッシュ化／検証（bcrypt via passlib）
+• パスワードのハッシュ化／検証（bcrypt via passlib。非同期経路は専用スレッドで照合）
 • JWT アクセストークンの作成／デコード（python-jose）
 • FastAPI の OAuth2PasswordBearer を用いたトークン取得
+• 非同期経路向けの decode_access_token_async (RSA/EC 署名のみスレッドへ退避)
 ============================================================
 """
 
+import asyncio
 import datetime
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional
 
 from fastapi import Depends, HTTPException, status
@@ -69,9 +72,11 @@ class UserPayload(BaseModel):
     デコード後に最終的に返却するユーザ情報モデル。
     - email: 認証済みユーザのメールアドレス
     - role:  ユーザのロール（省略時は "user"）
+    - exp:   トークンの有効期限 (Unix タイムスタンプ)
     """
     email: str
     role: str = "user"
+    exp: Optional[int] = None
 
 
 # ── パスワード関連ユーティリティ ───────────────────────────────
@@ -89,6 +94,30 @@ def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
 
+# bcrypt の照合は 1 回数十〜数百 ms CPU を占有する (ハッシュ計算中は GIL を解放する)。
+# イベントループを止めないよう専用スレッドで実行し、同時照合数は CPU 数までに抑える
+# (ログイン集中時に既定スレッドプールを食い潰さない)。
+_pwd_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_pwd_pool() -> ThreadPoolExecutor:
+    global _pwd_pool
+    if _pwd_pool is None:
+        _pwd_pool = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            thread_name_prefix="bcrypt-verify",
+        )
+    return _pwd_pool
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """
+    verify_password の非同期版 (ログイン経路で使用)。
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pwd_pool(), verify_password, password, hashed)
+
+
 # ── JWT トークン作成／検証 ───────────────────────────────────
 def create_access_token(
     subject: str,
@@ -100,7 +129,7 @@ def create_access_token(
     - exp に現在時刻 + ACCESS_TOKEN_EXPIRE_MINUTES
     - extra を渡すとペイロードにマージされる（例: role 情報等）
     """
-    now = datetime.datetime.utcnow()
+    now = datetime.datetime.now(datetime.timezone.utc)
     expire = now + datetime.timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     payload: dict[str, Any] = {"sub": subject, "exp": expire}
     if extra:
@@ -116,8 +145,6 @@ def decode_access_token(token: str) -> UserPayload:
     - Pydantic で構造チェック
     - エラー時は 401 Unauthorized を返却
     """
-
-    print("In decode_access_token 1")
     try:
         # 1) 署名検証・期限チェック
         data = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -129,7 +156,6 @@ def decode_access_token(token: str) -> UserPayload:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    print("In decode_access_token 2")
     try:
         # 2) ペイロード構造検証 (sub, exp)
         payload = TokenPayload(**data)
@@ -141,10 +167,36 @@ def decode_access_token(token: str) -> UserPayload:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    print("In decode_access_token 3")
     # 3) UserPayload に変換して返却（role をペイロードから取得）
     user_role = data.get("role", "user")
-    return UserPayload(email=payload.sub, role=user_role)
+    return UserPayload(email=payload.sub, role=user_role, exp=payload.exp)
+
+
+# 公開鍵署名 (RS*/ES*/PS*) の検証はミリ秒級で CPU を占有するため専用スレッドで実行する。
+# HS* (HMAC) はスレッド切り替えより検証の方が安いのでイベントループ上でそのまま実行。
+_jwt_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_jwt_pool() -> ThreadPoolExecutor:
+    global _jwt_pool
+    if _jwt_pool is None:
+        _jwt_pool = ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 1) * 4),
+            thread_name_prefix="jwt-verify",
+        )
+    return _jwt_pool
+
+
+async def decode_access_token_async(token: str) -> UserPayload:
+    """
+    decode_access_token の非同期版 (get_current_user のキャッシュミス時に使用)。
+    既定の HS256 ではインラインで検証し、非対称鍵アルゴリズムの場合のみ
+    既定スレッドプール (anyio の 40 スレッド) とは別のプールへ退避する。
+    """
+    if ALGORITHM.startswith("HS"):
+        return decode_access_token(token)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_jwt_pool(), decode_access_token, token)
 
 
 def get_current_token(
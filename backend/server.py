@@ -28,6 +28,7 @@ from uvicorn import Config, Server
 from uvicorn.config import LOGGING_CONFIG as UVI_LOG_CFG
 
 from backend.db.async_engine import db_lifespan
+from common.agent_http import aclose_client as aclose_agent_client
 from backend.api_router import api_router
 from backend.telemetry import init_otel
 from backend.security.auth import TokenResponse, create_access_token
@@ -51,12 +52,17 @@ async def lifespan(app: FastAPI):
     FastAPI のライフサイクルハンドラ (async context manager)。
     - OpenTelemetry 初期化
     - DB Engine のプール初期化／破棄
+    - エージェント呼び出し用 HTTP クライアント (keep-alive プール) の破棄
     """
     # 1) 分散トレーシングの初期化
     init_otel(app)
     # 2) DB Engine 起動／破棄
-    async with db_lifespan(app):
-        yield  # 必ず yield を含めて enter/exit を定義
+    try:
+        async with db_lifespan(app):
+            yield  # 必ず yield を含めて enter/exit を定義
+    finally:
+        # 3) エージェント HTTP 接続の解放
+        await aclose_agent_client()
     logger.info("Application shutdown complete")  # シャットダウン完了ログ
 
 # ── FastAPI インスタンス ───────────────────────────────────────
@@ -78,18 +84,22 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         req_id = uuid4().hex[:8]
         request.state.request_id = req_id
 
-        body = await request.body()
-        snippet = body[:200] if body else b"-"
-        logger.debug(f"[⇢{req_id}] {request.method} {request.url.path} body={snippet.decode(errors='ignore')}")
+        # ボディ読み出し・デコードは DEBUG 有効時のみ
+        if logger.isEnabledFor(logging.DEBUG):
+            body = await request.body()
+            snippet = body[:200] if body else b"-"
+            logger.debug("[⇢%s] %s %s body=%s", req_id, request.method, request.url.path,
+                         snippet.decode(errors="ignore"))
 
         start = time()
         try:
             response = await call_next(request)
         except Exception as exc:
-            logger.exception(f"[{req_id}] Exception during request processing: {exc}")
+            logger.exception("[%s] Exception during request processing: %s", req_id, exc)
             raise
         elapsed = (time() - start) * 1000
-        logger.info(f"[⇠{req_id}] {request.method} {request.url.path} {response.status_code} {elapsed:.1f} ms")
+        logger.info("[⇠%s] %s %s %d %.1f ms", req_id, request.method, request.url.path,
+                    response.status_code, elapsed)
         return response
 
 # ミドルウェア登録
@@ -123,14 +133,15 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         body = (await request.body()).decode(errors="ignore")
     except Exception:
         body = "<unreadable body>"
-    logger.error(f"[{req_id}] Validation failed {request.method} {request.url.path} errors={exc.errors()} body={body}")
+    logger.error("[%s] Validation failed %s %s errors=%s body=%s",
+                 req_id, request.method, request.url.path, exc.errors(), body)
     return JSONResponse(status_code=422, content={"detail": exc.errors()})
 
 # ── 全例外キャッチオール ───────────────────────────────────────
 @app.exception_handler(Exception)
 async def all_exception_handler(request: Request, exc: Exception):
     req_id = getattr(request.state, "request_id", "N/A")
-    logger.exception(f"[{req_id}] Unhandled error: {request.method} {request.url.path} - {exc}")
+    logger.exception("[%s] Unhandled error: %s %s - %s", req_id, request.method, request.url.path, exc)
     origin = request.headers.get("origin", "*")
     return JSONResponse(
         {"detail": "Internal Server Error"},
@@ -30,9 +30,9 @@ def log_api_usage(api_name: str, tokens_used: int, cost: float, details: str) ->
         cursor = conn.cursor()
         cursor.execute(query, (api_name, tokens_used, cost, details))
         conn.commit()
-        logger.info(f"Logged API usage for {api_name} successfully.")
+        logger.info("Logged API usage for %s successfully.", api_name)
     except Exception as e:
-        logger.error(f"Error logging API usage: {e}")
+        logger.error("Error logging API usage: %s", e)
         raise e
     finally:
         if cursor:
@@ -3,11 +3,16 @@
 # 非同期 AsyncSession を用いてログアーカイブを保存・取得するサービスモジュール
 # - AsyncSession に対応し、select/execute を用いたクエリ実行
 # - CRUD 処理をすべて async/await ベースで実装
+# - ZIP 本体は object_store に保存し、DB には URI / サイズ / SHA-256 のみを記録
 
-from typing import Optional, List
-from sqlalchemy import select
+import asyncio
+from datetime import datetime
+from typing import Iterable, Optional, Sequence, Tuple
+from sqlalchemy import Row, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from backend.db.async_engine import get_session_factory
 from backend.models.log_archive import LogArchive
+from backend.services.object_store import put_zip
 
 async def save_log_archive(
     db: AsyncSession,
@@ -22,15 +27,18 @@ async def save_log_archive(
     - user_email: アーカイブ所有者のメールアドレス
     - project_name: 対象プロジェクト名
     - filename: アーカイブファイル名
-    - zip_data: バイナリ形式の ZIP データ
+    - zip_data: バイナリ形式の ZIP データ (object_store に保存)
     成功時に DB 保存済みの LogArchive インスタンスを返却
     """
-    # 1) モデルインスタンスを生成してセッションに追加
+    # 1) ZIP 本体を保存し、URI を持つモデルインスタンスをセッションに追加
+    stored = await put_zip(zip_data)
     arch = LogArchive(
         user_email=user_email,
         project_name=project_name,
         filename=filename,
-        zip_data=zip_data
+        zip_uri=stored.uri,
+        zip_size=stored.size,
+        zip_sha256=stored.sha256,
     )
     db.add(arch)
 
@@ -41,18 +49,66 @@ async def save_log_archive(
     await db.refresh(arch)
     return arch
 
+async def save_workflow_archive(
+    workflow_log_id: int,
+    project_name: str,
+    filename: str,
+    zip_data: bytes,
+    user_email: Optional[str] = None,
+) -> int:
+    """
+    ワークフロー完了時の ZIP を 1 件保存し、採番された id を返却
+    - ZIP 本体は object_store へ、DB 行は数百バイトの URI / メタデータのみ
+    - ORM インスタンスを作らず INSERT ... RETURNING id の 1 往復で完結
+    """
+    stored = await put_zip(zip_data)
+    stmt = insert(LogArchive).values(
+        workflow_log_id=workflow_log_id,
+        filename=filename,
+        zip_uri=stored.uri,
+        zip_size=stored.size,
+        zip_sha256=stored.sha256,
+        user_email=user_email,
+        project_name=project_name,
+    ).returning(LogArchive.id)
+    async with get_session_factory()() as db:
+        archive_id = (await db.execute(stmt)).scalar_one()
+        await db.commit()
+    return archive_id
+
+async def save_workflow_archives_bulk(
+    db: AsyncSession,
+    rows: Iterable[Tuple[int, Optional[str], bytes, Optional[str], Optional[str]]],
+) -> int:
+    """
+    複数の ZIP を一括保存 (再投入・移行などのバッチ用途)
+    - rows は (workflow_log_id, filename, zip_data, user_email, project_name)
+    - ZIP 本体を並行して object_store に保存し、メタデータ行を COPY (BINARY) で投入
+    - 件数を返却 (id は返らない)
+    """
+    rows = list(rows)
+    stored = await asyncio.gather(*(put_zip(r[2]) for r in rows))
+    count = await LogArchive.bulk_copy(db, (
+        (wf_id, filename, s.uri, s.size, s.sha256, email, project)
+        for (wf_id, filename, _, email, project), s in zip(rows, stored)
+    ))
+    await db.commit()
+    return count
+
 async def list_log_archives_by_project(
     db: AsyncSession,
     user_email: Optional[str],
     project_name: Optional[str]
-) -> List[LogArchive]:
+) -> Sequence[Row[Tuple[int, Optional[str], datetime]]]:
     """
     指定されたユーザ(email)およびプロジェクト名に紐づくアーカイブ一覧を取得
     - user_email または project_name が None の場合はそのフィルタをスキップ
     - 作成日時の降順でソート
+    - 一覧表示に必要な (id, filename, created_at) だけを射影して返す
+      (ORM 化や workflow_log の joined eager load を行わない)
     """
     # 1) ベースとなる SELECT 文を組み立て
-    stmt = select(LogArchive)
+    stmt = select(LogArchive.id, LogArchive.filename, LogArchive.created_at)
 
     # 2) フィルタ条件を動的に追加
     if user_email is not None:
@@ -65,8 +121,8 @@ async def list_log_archives_by_project(
 
     # 4) クエリを実行して結果を取得
     result = await db.execute(stmt)
-    # 5) ORM スカラーをリスト化して返却
-    return result.scalars().all()
+    # 5) 射影した Row をリスト化して返却
+    return result.all()
 
 async def get_log_archive(
     db: AsyncSession,
@@ -82,6 +138,8 @@ async def get_log_archive(
 # public re-exports
 __all__ = [
     'save_log_archive',
+    'save_workflow_archive',
+    'save_workflow_archives_bulk',
     'list_log_archives_by_project',
     'get_log_archive',
 ]
@@ -0,0 +1,82 @@
+"""
+backend/services/object_store.py
+--------------------------------
+成果物 ZIP を DB の外 (オブジェクトストア) に保存するユーティリティ。
+
+* DB には URI・サイズ・SHA-256 だけを保存し、数 MB の bytea を
+  INSERT / SELECT / TOAST の経路に載せない。
+* 保存先は ZIP_STORAGE_PATH 配下のローカルファイル
+  (`file://` URI)。パスは SHA-256 によるコンテンツアドレスなので
+  同一 ZIP は 1 度しか書かれない。
+* 書き込みは一時ファイル → os.replace のアトミック置換で、
+  読み手が書きかけのファイルを見ることはない。
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from backend.config.settings import get_settings
+
+
+class StoredObject(NamedTuple):
+    """put_zip の戻り値 (log_archives の zip_uri / zip_size / zip_sha256 に対応)"""
+    uri: str
+    size: int
+    sha256: str
+
+
+def _root() -> Path:
+    return Path(get_settings().zip_storage_path).resolve()
+
+
+def _put_sync(data: bytes) -> StoredObject:
+    digest = hashlib.sha256(data).hexdigest()
+    path = _root() / digest[:2] / f"{digest}.zip"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+    return StoredObject(path.as_uri(), len(data), digest)
+
+
+async def put_zip(data: bytes) -> StoredObject:
+    """ZIP バイト列を保存し URI を返す (ファイル I/O はスレッドで実行)"""
+    return await asyncio.to_thread(_put_sync, data)
+
+
+def _uri_to_os_path(netloc: str, url_path: str) -> str:
+    """file URI の host / path 部分を OS ネイティブのパス文字列に変換"""
+    if netloc and netloc != "localhost":      # UNC (file://server/share/...)
+        url_path = f"//{netloc}{url_path}"
+    return url2pathname(url_path)
+
+
+def local_path(uri: str) -> Path:
+    """
+    file:// URI をローカルパスに変換する。
+    保存ルート外を指す URI (改ざん・設定変更後の旧データ) は ValueError。
+    url2pathname で OS 表記へ戻す (Windows の file:///C:/... → C:\\...)。
+    """
+    parsed = urlparse(uri)
+    if parsed.scheme != "file":
+        raise ValueError(f"unsupported object URI: {uri}")
+    path = Path(_uri_to_os_path(parsed.netloc, parsed.path)).resolve()
+    if not path.is_relative_to(_root()):
+        raise ValueError(f"object URI outside storage root: {uri}")
+    return path
+
+
+__all__ = ["StoredObject", "put_zip", "local_path"]
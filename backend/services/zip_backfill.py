@@ -0,0 +1,65 @@
+"""
+backend/services/zip_backfill.py
+--------------------------------
+旧スキーマ (log_archives / workflow_logs の zip_data BYTEA) から
+object_store への移行用バックフィル。
+
+db/ini_ddl.sql の移行手順 2) で 1 度だけ実行する:
+    python -m backend.services.zip_backfill
+
+* zip_uri が未設定で zip_data を持つ行を batch_size 件ずつ読み出し、
+  put_zip で ZIP_STORAGE_PATH 配下へ書き出して zip_uri / zip_size /
+  zip_sha256 を埋める (バッチごとに commit するので中断しても再実行可)
+* zip_data 列の削除は全件の移行を確認してから手順 3) で行う
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from sqlalchemy import text
+
+from backend.db.async_engine import get_session_factory
+from backend.services.object_store import put_zip
+
+logger = logging.getLogger(__name__)
+
+TABLES = ("log_archives", "workflow_logs")
+
+
+async def backfill_table(table: str, batch_size: int = 50) -> int:
+    """1 テーブル分を移行し、移行した行数を返す"""
+    if table not in TABLES:
+        raise ValueError(f"unsupported table: {table}")
+    select_sql = text(
+        f"SELECT id, zip_data FROM agentbased.{table} "
+        "WHERE zip_uri IS NULL AND zip_data IS NOT NULL ORDER BY id LIMIT :n"
+    )
+    update_sql = text(
+        f"UPDATE agentbased.{table} "
+        "SET zip_uri = :uri, zip_size = :size, zip_sha256 = :sha256 WHERE id = :id"
+    )
+    factory = get_session_factory()
+    total = 0
+    while True:
+        async with factory() as session:
+            rows = (await session.execute(select_sql, {"n": batch_size})).all()
+            if not rows:
+                return total
+            stored = await asyncio.gather(*(put_zip(bytes(r.zip_data)) for r in rows))
+            await session.execute(update_sql, [
+                {"id": r.id, "uri": s.uri, "size": s.size, "sha256": s.sha256}
+                for r, s in zip(rows, stored)
+            ])
+            await session.commit()
+        total += len(rows)
+        logger.info("zip backfill: %s %d rows", table, total)
+
+
+async def backfill_all(batch_size: int = 50) -> dict[str, int]:
+    return {table: await backfill_table(table, batch_size) for table in TABLES}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(asyncio.run(backfill_all()))
@@ -40,6 +40,7 @@ from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.sampling import ParentBasedTraceIdRatio
 from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 
@@ -51,6 +52,22 @@ logger = logging.getLogger(__name__)
 # ──────────────────────────────────────────────────────────────
 OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318")
 
+# ──────────────────────────────────────────────────────────────
+# サンプリング / エクスポート設定
+# - ルートスパンは TRACE_SAMPLE_RATIO の確率で採取 (親スパンの判定は継承)
+#   非採取スパンは NonRecordingSpan となり属性オブジェクトを確保しない
+# - BatchSpanProcessor はキューを大きく・送信間隔を長めにしてエクスポートを集約
+# ──────────────────────────────────────────────────────────────
+TRACE_SAMPLE_RATIO = float(os.getenv("OTEL_TRACES_SAMPLER_ARG", "0.05"))
+SPAN_QUEUE_SIZE = 8192
+SPAN_EXPORT_DELAY_MS = 5000
+
+# 業務ロジック外のルート (静的アセット / ヘルスチェック / メトリクス) は計装しない
+EXCLUDED_URLS = ".*\\.ico,.*\\.png,healthz,health,metrics"
+
+# Provider / グローバル計装はプロセスにつき 1 度だけ (複数アプリを同居させる場合の二重登録防止)
+_PROVIDERS_READY = False
+
 
 def init_otel(
     service_name: str,
@@ -61,7 +78,7 @@ def init_otel(
     """
     OpenTelemetry SDK / Exporter / Instrumentation を初期化する。
 
-    - トレース: OTLPSpanExporter + BatchSpanProcessor
+    - トレース: OTLPSpanExporter + BatchSpanProcessor (ParentBasedTraceIdRatio でサンプリング)
     - メトリクス: OTLPMetricExporter + PeriodicExportingMetricReader
     - ロギング: LoggingInstrumentor (構造化ログ → Loki 等)
     - HTTP クライアント: HTTPXClientInstrumentor
@@ -78,37 +95,50 @@ def init_otel(
         トレース対象にする SQLAlchemy Engine (省略可)
     """
 
-    # ── 1. Resource 属性を生成 ───────────────────────────────────
-    #    - OpenTelemetry リソース仕様では service.name に必ず文字列を
-    #      指定することが求められるため、インスタンスではなく文字列を設定
-    resource = Resource.create({
-        "service.name": service_name,
-    })
+    global _PROVIDERS_READY
+    if not _PROVIDERS_READY:
+        # ── 1. Resource 属性を生成 ───────────────────────────────────
+        #    - OpenTelemetry リソース仕様では service.name に必ず文字列を
+        #      指定することが求められるため、インスタンスではなく文字列を設定
+        resource = Resource.create({
+            "service.name": service_name,
+        })
+
+        # ── 2. Trace Provider 設定 ──────────────────────────────────
+        tracer_provider = TracerProvider(
+            resource=resource,
+            sampler=ParentBasedTraceIdRatio(TRACE_SAMPLE_RATIO),
+        )
+        span_exporter = OTLPSpanExporter(endpoint=f"{OTLP_ENDPOINT}/v1/traces")
+        tracer_provider.add_span_processor(
+            BatchSpanProcessor(
+                span_exporter,
+                max_queue_size=SPAN_QUEUE_SIZE,
+                schedule_delay_millis=SPAN_EXPORT_DELAY_MS,
+            )
+        )
+        trace.set_tracer_provider(tracer_provider)
 
-    # ── 2. Trace Provider 設定 ──────────────────────────────────
-    tracer_provider = TracerProvider(resource=resource)
-    span_exporter = OTLPSpanExporter(endpoint=f"{OTLP_ENDPOINT}/v1/traces")
-    tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
-    trace.set_tracer_provider(tracer_provider)
+        # ── 3. Metric Provider 設定 ─────────────────────────────────
+        metric_exporter = OTLPMetricExporter(endpoint=f"{OTLP_ENDPOINT}/v1/metrics")
+        metric_reader = PeriodicExportingMetricReader(metric_exporter, export_interval_millis=10_000)
+        meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader])
+        metrics.set_meter_provider(meter_provider)
 
-    # ── 3. Metric Provider 設定 ─────────────────────────────────
-    metric_exporter = OTLPMetricExporter(endpoint=f"{OTLP_ENDPOINT}/v1/metrics")
-    metric_reader = PeriodicExportingMetricReader(metric_exporter, export_interval_millis=10_000)
-    meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader])
-    metrics.set_meter_provider(meter_provider)
+        # ── 4. ロギング自動計装 ──────────────────────────────────────
+        #    - 構造化ログ出力フォーマットを OTLP に合わせて自動設定
+        LoggingInstrumentor().instrument(set_logging_format=True)
 
-    # ── 4. ロギング自動計装 ──────────────────────────────────────
-    #    - 構造化ログ出力フォーマットを OTLP に合わせて自動設定
-    LoggingInstrumentor().instrument(set_logging_format=True)
+        # ── 5. HTTPX クライアント自動計装 ────────────────────────────
+        HTTPXClientInstrumentor().instrument()
 
-    # ── 5. HTTPX クライアント自動計装 ────────────────────────────
-    HTTPXClientInstrumentor().instrument()
+        _PROVIDERS_READY = True
 
     # ── 6. FastAPI アプリ自動計装 ────────────────────────────────
     if fastapi_app is not None:
         FastAPIInstrumentor().instrument_app(
             fastapi_app,
-            excluded_urls=".*\\.ico,.*\\.png",  # 静的アセットを計測対象外
+            excluded_urls=EXCLUDED_URLS,
         )
 
     # ── 7. SQLAlchemy Engine 自動計装 ───────────────────────────
@@ -117,7 +147,8 @@ def init_otel(
 
     # ── 8. 初期化完了ログ ────────────────────────────────────────
     logger.info(
-        "OpenTelemetry 初期化完了 (service.name=%s, endpoint=%s)",
+        "OpenTelemetry 初期化完了 (service.name=%s, endpoint=%s, sample_ratio=%s)",
         service_name,
         OTLP_ENDPOINT,
+        TRACE_SAMPLE_RATIO,
     )
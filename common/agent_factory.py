@@ -0,0 +1,149 @@
+# common/agent_factory.py
+# ───────────────────────────────
+# エージェント FastAPI アプリの共通ファクトリ
+# 1. make_agent_app : ログ設定 / FastAPI 生成 / gzip / OTel 計装 / ルート登録を 1 か所で実施
+#    - 同一プロセスに複数エージェントを載せても httpx プール・LLM キャッシュ・
+#      マイクロバッチャ (common.ai_service / common.llm_cache のモジュール単位 Singleton) と
+#      OTel Provider は共有される
+# 2. serve_agent    : ポート単位の多重起動ロック + uvicorn (multi-worker / uvloop / httptools)
+# ───────────────────────────────
+
+from __future__ import annotations
+
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Type
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from backend.telemetry import init_otel
+from common.agent_http import agent_endpoint, agent_stream_endpoint
+from common.ai_service import ai_client_lifespan
+from common.logging_setup import setup_logging
+from common.utils import ensure_singleton
+
+
+async def _orjson_http_exception(request: Request, exc: StarletteHTTPException) -> ORJSONResponse:
+    """HTTPException (precheck の 400 等) も ORJSONResponse で返す"""
+    return ORJSONResponse(
+        {"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers,
+    )
+
+
+def make_agent_app(
+    name: str,
+    service_fn: Callable[[Any], Awaitable[Dict[str, Any]]],
+    request_model: Type[BaseModel],
+    response_model: Type[BaseModel],
+    route: str,
+    output_key: str,
+    port: int,
+    *,
+    stream_fn: Optional[Callable[[Any], AsyncIterator[str]]] = None,
+    precheck: Optional[Callable[[Any], None]] = None,
+    on_shutdown: Optional[Callable[[], None]] = None,
+    title: Optional[str] = None,
+    description: str = "",
+) -> FastAPI:
+    """
+    エージェント 1 つ分の FastAPI アプリを組み立てて返す。
+
+    Parameters
+    ----------
+    name : str
+        OTel の service.name (例: "code-generation-agent")
+    service_fn : async (request_model) -> dict
+        サービス層関数。戻り値 dict (``output_key`` を含む) をそのままレスポンスにする
+    request_model / response_model : Type[BaseModel]
+        入出力スキーマ
+    route : str
+        エンドポイントパス (例: "/generate_code")
+    output_key : str
+        レスポンス JSON のキー
+    port : int
+        待受ポート (``app.state.port`` に保持し serve_agent で使用)
+    stream_fn : async generator | None
+        指定時は ``<route>/stream`` に SSE 版エンドポイントを追加
+    precheck : (request_model) -> None | None
+        サービス呼び出し前の入力検証。HTTPException を送出して 4xx を返す
+    on_shutdown : () -> None | None
+        アプリ終了時に呼ぶ後始末 (エージェント固有のプロセスプール停止など)
+    """
+    setup_logging()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        try:
+            async with ai_client_lifespan(app):
+                yield
+        finally:
+            if on_shutdown is not None:
+                on_shutdown()
+
+    app = FastAPI(
+        title=title or name.replace("-", " ").title(),
+        version="1.0.0",
+        description=description,
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
+    )
+    app.state.port = port
+    app.add_exception_handler(StarletteHTTPException, _orjson_http_exception)
+    # 1 KB 以上のレスポンスを gzip 圧縮 (SSE は Starlette 側で除外される)
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+    init_otel(name, fastapi_app=app)
+
+    async def endpoint(req_model):
+        if precheck is not None:
+            precheck(req_model)
+        # dict はそのまま返却 (output_key 以外の補助フィールドも保持)
+        return await service_fn(req_model)
+
+    endpoint.__name__ = f"_{service_fn.__name__}"
+    endpoint.__doc__ = service_fn.__doc__
+    app.post(route, response_model=response_model)(
+        agent_endpoint(request_model, output_key=output_key)(endpoint)
+    )
+
+    if stream_fn is not None:
+        async def stream_endpoint(req_model):
+            if precheck is not None:
+                precheck(req_model)
+            async for delta in stream_fn(req_model):
+                yield delta
+
+        stream_endpoint.__name__ = f"_{stream_fn.__name__}"
+        stream_endpoint.__doc__ = stream_fn.__doc__
+        app.post(f"{route}/stream", summary=f"{route} (SSE)")(
+            agent_stream_endpoint(request_model)(stream_endpoint)
+        )
+
+    return app
+
+
+def serve_agent(app_path: str, port: int) -> None:
+    """
+    ``python -m agents.<name>.app`` 用の起動処理。
+
+    ワーカーは app を import するだけなので、多重起動ロックは親プロセスでポート単位に取る。
+    * 待受アドレスは AGENT_HOST (既定 127.0.0.1)。エージェントは認証なしで LLM 予算を
+      消費するため、外部公開 (0.0.0.0 等) は明示的に指定した場合のみ
+    * loop="auto": uvloop が入っていれば使い、無い環境 (Windows) では asyncio
+    """
+    ensure_singleton(app_path, port=port)
+    uvicorn.run(
+        app_path,
+        host=os.getenv("AGENT_HOST", "127.0.0.1"),
+        port=port,
+        workers=int(os.getenv("WORKERS", "2")),
+        loop="auto",
+        http="httptools",
+        log_level="info",
+        access_log=False,
+    )
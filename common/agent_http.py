@@ -2,20 +2,26 @@
 # ───────────────────────────────
 # FastAPI エージェントで使う HTTP クライアント & エンドポイントデコレータ
 # 1. HTTP クライアント: post_json / post_json_sync
-# 2. エージェント用デコレータ: agent_endpoint
-#    - Pydantic モデルによる入力バリデーション
+#    - 1 KB 以上のリクエストボディは gzip 圧縮して送信 (Content-Encoding: gzip)
+#    - イベントループごとに 1 つの永続 AsyncClient を共有し、keep-alive 接続を再利用
+#      (エージェント呼び出しごとの TCP ハンドシェイクを省く)。終了時は aclose_client()
+# 2. エージェント用デコレータ: agent_endpoint / agent_stream_endpoint (SSE)
+#    - Pydantic v2 (pydantic-core) による生バイト列の直接バリデーション
+#    - Content-Encoding: gzip のリクエストボディは展開してから検証
 #    - 出力を指定のキーでラップ
-#    - 例外時は統一 JSON レスポンス返却
+#    - 例外時は統一 JSON レスポンス返却 (orjson でシリアライズ)
 # ───────────────────────────────
 
 from __future__ import annotations
 import asyncio
 import logging
-from typing import Any, Dict, Optional, Type, Callable
+import zlib
+from typing import Any, AsyncIterator, Dict, Optional, Type, Callable
 import httpx
+import orjson
 from fastapi import HTTPException, Request
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 
 from .exceptions import AgentHTTPError
 
@@ -25,6 +31,59 @@ logger = logging.getLogger("common.agent_http")
 # HTTP クライアント部
 # ───────────────────────────────────────────────────
 _DEFAULT_TIMEOUT = 120.0  # 秒
+_GZIP_MIN_SIZE = 1024        # これ未満のボディは圧縮しない (サーバ側 GZipMiddleware と同じ閾値)
+_MAX_INFLATED_SIZE = 32 * 1024 * 1024  # 展開後サイズ上限 (圧縮爆弾対策)
+# エージェント 9 種 × 並行ワークフロー数を収める接続プール
+_POOL_LIMITS = httpx.Limits(
+    max_keepalive_connections=64,
+    max_connections=128,
+    keepalive_expiry=60,
+)
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    実行中のイベントループに紐づく共有 AsyncClient を返す (なければ生成)。
+    httpx の接続はループをまたげないため、ループが変わった場合は作り直す
+    (post_json_sync の asyncio.run など)。
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            limits=_POOL_LIMITS,
+            timeout=_DEFAULT_TIMEOUT,
+            follow_redirects=True,
+        )
+        _client_loop = loop
+    return _client
+
+
+async def aclose_client() -> None:
+    """共有 AsyncClient の接続をすべて閉じる (FastAPI lifespan 終了時に呼ぶ)"""
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+def _encode_body(payload: Dict[str, Any]) -> tuple[bytes, Dict[str, str]]:
+    """
+    JSON ボディを orjson でエンコードし、閾値以上なら gzip 圧縮する。
+    ソースコード全文などテキスト主体のペイロードは 5〜10 倍程度小さくなる。
+    """
+    body = orjson.dumps(payload)
+    headers = {"Content-Type": "application/json"}
+    if len(body) >= _GZIP_MIN_SIZE:
+        comp = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip フォーマット
+        body = comp.compress(body) + comp.flush()
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
 
 async def _async_request(
     method: str,
@@ -37,13 +96,14 @@ async def _async_request(
     backoff = 1.5
     attempt = 0
     last_exc: Optional[Exception] = None
+    body, headers = _encode_body(json) if json is not None else (None, {})
 
+    cli = get_client()
     while attempt <= max_retries:
         try:
-            async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as cli:
-                resp = await cli.request(method, url, json=json)
-                resp.raise_for_status()
-                return resp
+            resp = await cli.request(method, url, content=body, headers=headers, timeout=timeout)
+            resp.raise_for_status()
+            return resp
         except (httpx.RequestError, httpx.HTTPStatusError) as e:
             last_exc = e
             logger.warning(
@@ -93,13 +153,45 @@ def post_json_sync(
 ) -> Dict[str, Any]:
     """
     同期版 JSON POST。CLI や同期処理用。
+    呼び出しごとにループを作るため、共有クライアントもループ終了前に閉じる。
     """
-    return asyncio.run(post_json(base_url, path, payload, timeout=timeout, max_retries=max_retries))
+    async def _run() -> Dict[str, Any]:
+        try:
+            return await post_json(base_url, path, payload, timeout=timeout, max_retries=max_retries)
+        finally:
+            await aclose_client()
+
+    return asyncio.run(_run())
 
 
 # ───────────────────────────────────────────────────
 # エージェントサーバ用デコレータ部
 # ───────────────────────────────────────────────────
+class _BodyDecodeError(ValueError):
+    pass
+
+
+async def _read_body(request: Request) -> bytes:
+    """
+    リクエストボディを取得。Content-Encoding: gzip なら展開して返す
+    (展開後 _MAX_INFLATED_SIZE を超える場合は _BodyDecodeError)。
+    """
+    raw = await request.body()
+    encoding = request.headers.get("content-encoding", "").strip().lower()
+    if not encoding or encoding == "identity":
+        return raw
+    if encoding != "gzip":
+        raise _BodyDecodeError(f"unsupported content-encoding: {encoding}")
+    try:
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        data = inflater.decompress(raw, _MAX_INFLATED_SIZE)
+    except zlib.error as e:
+        raise _BodyDecodeError(f"invalid gzip body: {e}") from e
+    if inflater.unconsumed_tail:
+        raise _BodyDecodeError("decompressed body too large")
+    return data
+
+
 def agent_endpoint(
     request_model: Type[BaseModel],
     output_key: str,
@@ -107,30 +199,35 @@ def agent_endpoint(
     """
     FastAPI エージェントアプリ内のエンドポイントを簡潔に定義するデコレータ。
 
-    - リクエストボディを Pydantic でバリデーション
+    - リクエストボディ (bytes) を model_validate_json で直接バリデーション
+      (json.loads → dict → Python 側フィールド走査の 2 パスを省略)
+    - バリデーション失敗時は {"error": "..."} を 400 で返却
     - 戻り値を {output_key: result} 形式にラップして返却
     - 例外発生時は {"error": "..."} を 500 で返却
     """
     def decorator(func: Callable[[BaseModel], Any]) -> Callable[..., Any]:
-        async def wrapper(request: Request) -> JSONResponse:
+        async def wrapper(request: Request) -> ORJSONResponse:
             try:
-                # Pydantic モデルにパース
-                payload = await request.json()
-                req_model = request_model(**payload)
+                # Pydantic モデルにパース (Rust 実装の JSON パーサで 1 パス)
+                req_model = request_model.model_validate_json(await _read_body(request))
+            except (ValidationError, _BodyDecodeError) as e:
+                logger.warning("Invalid request body for %s: %s", func.__name__, e)
+                return ORJSONResponse({"error": str(e)}, status_code=400)
 
+            try:
                 # 実際のビジネスロジック呼び出し
                 result = await func(req_model)
 
                 # 辞書だったらマージ、それ以外は output_key でラップ
                 if isinstance(result, dict):
-                    return JSONResponse(result)
-                return JSONResponse({output_key: result})
+                    return ORJSONResponse(result)
+                return ORJSONResponse({output_key: result})
             except HTTPException:
                 # FastAPI の HTTPException はそのまま伝播
                 raise
             except Exception as e:
                 logger.exception("Error in agent endpoint %s", func.__name__)
-                return JSONResponse({"error": str(e)}, status_code=500)
+                return ORJSONResponse({"error": str(e)}, status_code=500)
 
         # FastAPI がエンドポイントとして認識できるように属性を付与
         wrapper.__name__ = func.__name__
@@ -138,3 +235,56 @@ def agent_endpoint(
         return wrapper
 
     return decorator
+
+
+def _sse_event(data: Any, event: str | None = None) -> bytes:
+    """
+    SSE フレームを生成。data は JSON エンコードするため改行を含むテキストも 1 行に収まる。
+    """
+    head = f"event: {event}\n".encode() if event else b""
+    return head + b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+def agent_stream_endpoint(
+    request_model: Type[BaseModel],
+) -> Callable[[Callable[..., AsyncIterator[str]]], Callable[..., Any]]:
+    """
+    LLM 出力を Server-Sent Events で逐次返すエンドポイント用デコレータ。
+
+    - リクエストボディを model_validate_json でバリデーション (失敗時 400)
+    - func は async generator (テキスト断片を yield)
+    - 各断片は `data: "<JSON 文字列>"`、完了時 `event: done`、
+      途中失敗時 `event: error` を送出
+    """
+    def decorator(func: Callable[[BaseModel], AsyncIterator[str]]) -> Callable[..., Any]:
+        async def wrapper(request: Request) -> Any:
+            try:
+                req_model = request_model.model_validate_json(await _read_body(request))
+            except (ValidationError, _BodyDecodeError) as e:
+                logger.warning("Invalid request body for %s: %s", func.__name__, e)
+                return ORJSONResponse({"error": str(e)}, status_code=400)
+
+            async def event_source() -> AsyncIterator[bytes]:
+                try:
+                    async for delta in func(req_model):
+                        yield _sse_event(delta)
+                except HTTPException as e:
+                    yield _sse_event({"error": e.detail, "status_code": e.status_code}, event="error")
+                    return
+                except Exception as e:
+                    logger.exception("Error in agent stream endpoint %s", func.__name__)
+                    yield _sse_event({"error": str(e)}, event="error")
+                    return
+                yield _sse_event({}, event="done")
+
+            return StreamingResponse(
+                event_source(),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__  = func.__doc__
+        return wrapper
+
+    return decorator
@@ -11,13 +11,14 @@ OpenAI / Azure OpenAI 汎用ラッパー
 from __future__ import annotations
 
 import asyncio
+import importlib.util
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import httpx
-import openai
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI, AsyncOpenAI
 
 from common.cost_tracker import record as record_cost  # 非同期セッション化対応済み
 
@@ -51,27 +52,53 @@ for alias, base in HIGH_REASONING_ALIAS.items():
 # top_k を使うモデル
 MODELS_USE_TOP_K = {"o1", "o1-mini"}
 
+# system ロールを受け付けないモデル (cached_prefix は user メッセージ先頭へ連結)
+MODELS_WITHOUT_SYSTEM_ROLE = {"o1-mini"}
+
 # ──────────────────────────────────────────────────────────────
 # シングルトン httpx.AsyncClient
 # ──────────────────────────────────────────────────────────────
 _httpx_client: httpx.AsyncClient | None = None
 
+# h2 未導入環境では HTTP/1.1 keep-alive にフォールバック
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
 
 def _get_httpx_client() -> httpx.AsyncClient:
     """
     HTTP/2 + Connection pooling 付きのクライアントを 1 つだけ生成。
+    OpenAI / Azure OpenAI の SDK クライアントへ http_client として渡し、
+    全リクエストで TCP/TLS コネクションを再利用する。
     """
     global _httpx_client
-    if _httpx_client is None:
+    if _httpx_client is None or _httpx_client.is_closed:
         _httpx_client = httpx.AsyncClient(
-            http2=True,
-            timeout=30,
-            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            http2=_HTTP2_AVAILABLE,
+            timeout=60,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=32),
             headers={"User-Agent": "agent-webapp/1.0"},
         )
     return _httpx_client
 
 
+async def close_httpx_client() -> None:
+    """共有クライアントのコネクションプールを解放する (アプリ終了時)。"""
+    global _httpx_client
+    if _httpx_client is not None and not _httpx_client.is_closed:
+        await _httpx_client.aclose()
+    _httpx_client = None
+
+
+@asynccontextmanager
+async def ai_client_lifespan(app):
+    """
+    FastAPI の lifespan ハンドラ。
+    終了時に共有 httpx.AsyncClient をクローズする。
+    """
+    yield
+    await close_httpx_client()
+
+
 # ──────────────────────────────────────────────────────────────
 # 環境変数ヘルパ
 # ──────────────────────────────────────────────────────────────
@@ -96,33 +123,42 @@ class AIService:
     """
 
     def __init__(self) -> None:
-        env = _get_env()
-        self.api_type = env["API_TYPE"]
-        self.client   = self._init_client(env)
+        self._env     = _get_env()
+        self.api_type = self._env["API_TYPE"]
+        self._http: httpx.AsyncClient | None = None
+        self._client  = self._init_client(self._env)
+
+    @property
+    def client(self) -> Any:
+        """
+        SDK クライアント。束ねている共有 httpx.AsyncClient が close_httpx_client()
+        で閉じられていれば (lifespan の再起動・テストなど) 新しい共有クライアントで作り直す。
+        """
+        if self._http is None or self._http.is_closed:
+            self._client = self._init_client(self._env)
+        return self._client
 
     # ---------- クライアント初期化 ----------
     def _init_client(self, env: Dict[str, str]) -> Any:
+        self._http = _get_httpx_client()
         if self.api_type == "openai":
             key = env["OPENAI_API_KEY"]
             if not key:
                 raise RuntimeError("OPENAI_API_KEY が設定されていません。")
-            openai.api_type = "openai"
-            openai.api_key  = key
-            # OpenAI 公式ラッパは非同期で internal に httpx を使う
-            return openai.chat.completions  # type: ignore[attr-defined]
+            return AsyncOpenAI(
+                api_key=key,
+                http_client=self._http,
+            ).chat.completions
 
         if self.api_type == "azure":
             required = ["AZURE_OPENAI_API_KEY", "AZURE_OPENAI_API_BASE", "AZURE_OPENAI_API_VERSION"]
             if not all(env[k] for k in required):
                 raise RuntimeError("Azure OpenAI 環境変数が不足しています。")
-            openai.api_type    = "azure"
-            openai.api_key     = env["AZURE_OPENAI_API_KEY"]
-            openai.api_base    = env["AZURE_OPENAI_API_BASE"]
-            openai.api_version = env["AZURE_OPENAI_API_VERSION"]
-            return AzureOpenAI(
+            return AsyncAzureOpenAI(
                 api_key=env["AZURE_OPENAI_API_KEY"],
                 api_version=env["AZURE_OPENAI_API_VERSION"],
-                http_client=_get_httpx_client(),
+                azure_endpoint=env["AZURE_OPENAI_API_BASE"],
+                http_client=self._http,
             ).chat.completions
 
         raise RuntimeError(f"Unsupported API_TYPE: {self.api_type}")
@@ -137,26 +173,40 @@ class AIService:
             )
         return min(requested, limit)
 
-    # ---------- メインメソッド ----------
-    async def call_generative_ai(
+    # ---------- キャッシュ向けメッセージ ----------
+    @staticmethod
+    def _build_cached_messages(model: str, prefix: str, suffix: str) -> List[Dict[str, str]]:
+        """
+        静的プレフィックスを常にメッセージ列の先頭に置き、
+        リクエスト間でバイト一致させる (= キャッシュヒット条件)。
+        """
+        if model in MODELS_WITHOUT_SYSTEM_ROLE:
+            return [{"role": "user", "content": f"{prefix}\n\n{suffix}"}]
+        return [
+            {"role": "system", "content": prefix},
+            {"role": "user",   "content": suffix},
+        ]
+
+    # ---------- API ディスパッチ ----------
+    async def _dispatch(self, params: Dict[str, Any]) -> Any:
+        # Async SDK クライアント: 共有 httpx.AsyncClient 上で直接 await (スレッド不要)
+        return await self.client.create(**params)
+
+    # ---------- リクエストパラメータ組み立て ----------
+    def _build_params(
         self,
         *,
         model: str,
-        messages: Optional[List[Dict[str, str]]] = None,
-        prompt: Optional[str] = None,
-        max_tokens: Optional[int] = None,
-        temperature: Optional[float] = None,
-        top_p: Optional[float] = None,
-        top_k: Optional[int] = None,
-        timeout: float = 60.0,
-        **kwargs
+        messages: Optional[List[Dict[str, str]]],
+        prompt: Optional[str],
+        cached_prefix: Optional[str],
+        user_suffix: Optional[str],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        top_p: Optional[float],
+        top_k: Optional[int],
+        extra: Dict[str, Any],
     ) -> Dict[str, Any]:
-        """
-        project_name, step_name を kwargs で受け取り、cost_tracker へ転送。
-        """
-        project_name: str = kwargs.pop("project_name", "unknown")
-        step_name:    str = kwargs.pop("step_name",    "unknown")
-
         # --- “-high” エイリアス解決 ---
         reasoning_effort = None
         if model in HIGH_REASONING_ALIAS:
@@ -165,9 +215,12 @@ class AIService:
 
         # --- メッセージ組み立て ---
         if messages is None:
-            if prompt is None:
-                raise ValueError("messages または prompt を指定してください。")
-            messages = [{"role": "user", "content": prompt}]
+            if cached_prefix is not None:
+                messages = self._build_cached_messages(model, cached_prefix, user_suffix or "")
+            elif prompt is None:
+                raise ValueError("messages / prompt / cached_prefix のいずれかを指定してください。")
+            else:
+                messages = [{"role": "user", "content": prompt}]
 
         # --- モデル設定 & デフォルト ---
         cfg       = MODEL_CONFIG.get(model, {})
@@ -185,7 +238,7 @@ class AIService:
             "model":       model,
             "messages":    messages,
             "temperature": temperature,
-            **kwargs,
+            **extra,
         }
         # top_k / top_p
         if model in MODELS_USE_TOP_K:
@@ -197,16 +250,79 @@ class AIService:
         # reasoning_effort
         if reasoning_effort:
             params["reasoning_effort"] = reasoning_effort
+        return params
+
+    # ---------- コスト記録 ----------
+    def _record_usage(self, model: str, usage: Any, project_name: str, step_name: str) -> float:
+        """
+        usage.total_tokens を cost_tracker へ転送する。
+        記録失敗で LLM 応答自体を失わないよう、例外はログのみに留める。
+        """
+        tokens = int(getattr(usage, "total_tokens", 0) or 0)
+        if not tokens:
+            return 0.0
+        try:
+            total_cost = record_cost(
+                model_name=model,
+                tokens=tokens,
+                project=project_name,
+                step=step_name,
+            )
+        except Exception as e:
+            logger.warning("Cost record failed: project=%s step=%s: %s", project_name, step_name, e)
+            return 0.0
+        logger.debug(
+            "Cost recorded: project=%s step=%s tokens=%d cost=%s",
+            project_name, step_name, tokens, total_cost
+        )
+        return float(total_cost)
+
+    # ---------- メインメソッド ----------
+    async def call_generative_ai(
+        self,
+        *,
+        model: str,
+        messages: Optional[List[Dict[str, str]]] = None,
+        prompt: Optional[str] = None,
+        cached_prefix: Optional[str] = None,
+        user_suffix: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        top_k: Optional[int] = None,
+        timeout: float = 60.0,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        project_name, step_name を kwargs で受け取り、cost_tracker へ転送。
+
+        cached_prefix / user_suffix を渡した場合は静的プレフィックスを先頭の
+        system メッセージに固定し、プロバイダ側の prompt caching
+        (OpenAI: 1024 tokens 以上の共通プレフィックスを自動キャッシュ) を効かせる。
+        """
+        project_name: str = kwargs.pop("project_name", "unknown")
+        step_name:    str = kwargs.pop("step_name",    "unknown")
+
+        params = self._build_params(
+            model=model,
+            messages=messages,
+            prompt=prompt,
+            cached_prefix=cached_prefix,
+            user_suffix=user_suffix,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            top_k=top_k,
+            extra=kwargs,
+        )
+        model = params["model"]
 
         # --- API 呼び出し ---
         try:
-            if hasattr(self.client, "acreate"):  # async supported
-                resp = await asyncio.wait_for(self.client.acreate(**params), timeout=timeout)
-            else:  # sync -> offload to thread
-                resp = await asyncio.wait_for(
-                    asyncio.to_thread(self.client.create, **params),
-                    timeout=timeout
-                )
+            resp = await asyncio.wait_for(
+                self._dispatch(params),
+                timeout=timeout,
+            )
 
             # --- レスポンス解析 ---
             choice   = resp.choices[0]
@@ -216,21 +332,9 @@ class AIService:
                 else getattr(choice, "text", "").strip()
             )
             usage    = getattr(resp, "usage", None)
-            tokens   = int(getattr(usage, "total_tokens", 0) or 0)
 
             # ---------- コスト記録 ----------
-            total_cost = 0.0
-            if tokens:
-                total_cost = record_cost(
-                    model_name=model,
-                    tokens=tokens,
-                    project=project_name,
-                    step=step_name,
-                )
-                logger.debug(
-                    "Cost recorded: project=%s step=%s tokens=%d cost=%s",
-                    project_name, step_name, tokens, total_cost
-                )
+            total_cost = self._record_usage(model, usage, project_name, step_name)
 
             return {"content": content, "usage": usage, "total_cost": total_cost}
 
@@ -238,6 +342,60 @@ class AIService:
             logger.exception("AI API error: %s", e)
             raise
 
+    # ---------- ストリーミング ----------
+    async def call_generative_ai_stream(
+        self,
+        *,
+        model: str,
+        messages: Optional[List[Dict[str, str]]] = None,
+        prompt: Optional[str] = None,
+        cached_prefix: Optional[str] = None,
+        user_suffix: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        top_k: Optional[int] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        stream=True で呼び出し、生成されたテキスト断片を到着順に yield する。
+        usage は最終チャンク (stream_options.include_usage) から取得してコスト記録。
+        マイクロバッチャは経由しない (長時間接続を窓に滞留させないため)。
+        """
+        project_name: str = kwargs.pop("project_name", "unknown")
+        step_name:    str = kwargs.pop("step_name",    "unknown")
+
+        params = self._build_params(
+            model=model,
+            messages=messages,
+            prompt=prompt,
+            cached_prefix=cached_prefix,
+            user_suffix=user_suffix,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            top_k=top_k,
+            extra=kwargs,
+        )
+        params["stream"] = True
+        params["stream_options"] = {"include_usage": True}
+
+        usage = None
+        try:
+            stream = await self.client.create(**params)
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield delta
+        except Exception as e:
+            logger.exception("AI API stream error: %s", e)
+            raise
+
+        self._record_usage(params["model"], usage, project_name, step_name)
+
 
 # ──────────────────────────────────────────────────────────────
 # シンプルラッパー
@@ -251,3 +409,11 @@ async def call_generative_ai(**kwargs) -> str:
     """
     res = await ai_service.call_generative_ai(**kwargs)
     return res["content"]
+
+
+async def call_generative_ai_stream(**kwargs) -> AsyncIterator[str]:
+    """
+    service.call_generative_ai_stream() の syntactic sugar。テキスト断片を yield する。
+    """
+    async for delta in ai_service.call_generative_ai_stream(**kwargs):
+        yield delta
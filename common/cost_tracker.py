@@ -5,87 +5,67 @@
 API 呼び出しコストの集計・記録ユーティリティ
 ------------------------------------------------------------
 このモジュールは、各種 AI ワークフローや HTTP API 呼び出しに伴って発生する
-コストをデータベースに永続化する関数を提供します。
+コストを算出し、データベースに永続化する関数を提供します。
 
 主な機能：
-  • JWT トークンをデコードしてユーザ識別子 (email) を取得
-  • 非同期 SQLAlchemy セッション (async_session_factory) を用いたトランザクション管理
-  • コストレコードエントリ (CostLog モデル) の生成・保存
-  • エラー時のロギング
+  • モデル名 → 1 トークンあたり単価 (USD) の参照 (get_price)
+  • トークン数からコストを算出し、CostLog 行を書き込みキューへ投入 (record)
+  • 書き込みは backend.db.log_sink がまとめて executemany する
+    (呼び出し 1 回ごとに INSERT の往復を発生させない)
 
 使い方例：
     from common.cost_tracker import record as record_cost
-    await record_cost(workflow_id, "openai.chat", 0.0023, "Bearer <JWT>")
+    cost = record_cost("o4-mini", tokens=1200, project="demo", step="generate_code")
 ============================================================
 """
 
 import logging
-from typing import Mapping, Any
+from decimal import Decimal
 
-# 非同期セッションファクトリを直接インポート
-from backend.db.async_engine import async_session_factory
-# JWT デコード関数を正しい名前でインポート
-from backend.security.auth import decode_access_token  
-from backend.models.cost_log import CostLog   # CostLog: workflow_id, user_email, api_name, cost, timestamp などを持つ ORM モデル
+from backend.db import log_sink
+from backend.models.cost_log import CostLog   # CostLog: project_name, step_name, model_name, tokens, cost
 
-logger = logging.getLogger(__name__)
+log = logging.getLogger(__name__)
 
+# ── 単価表 (USD / token, 入出力の概算平均) ─────────────────────
+_PRICE_PER_TOKEN: dict[str, Decimal] = {
+    "gpt-4o":       Decimal("0.0000060"),
+    "gpt-4o-mini":  Decimal("0.0000004"),
+    "gpt-4.1":      Decimal("0.0000050"),
+    "o1":           Decimal("0.0000375"),
+    "o1-mini":      Decimal("0.0000030"),
+    "o3":           Decimal("0.0000050"),
+    "o3-mini":      Decimal("0.0000030"),
+    "o4-mini":      Decimal("0.0000030"),
+}
 
-async def record(
-    workflow_id: int,
-    api_name: str,
-    cost: float,
-    token: str,
-) -> None:
-    """
-    DB にコストレコードを追加する。
 
-    Parameters
-    ----------
-    workflow_id : int
-        対象ワークフローの識別子
-    api_name : str
-        呼び出した API 名称（例："openai.chat"）
-    cost : float
-        発生したコスト (USD)
-    token : str
-        `Authorization` ヘッダに含まれる "Bearer <JWT>" 文字列
+def get_price(model_name: str) -> Decimal:
+    """
+    モデルの 1 トークンあたり単価を返す。
+    "-high" などの推論強度サフィックスは同一単価として扱い、未知のモデルは 0。
     """
-    # 1) "Bearer " プレフィックスを除去し、純粋な JWT 部分を取得
-    raw_token = token.split(" ", 1)[1] if token.lower().startswith("bearer ") else token
+    price = _PRICE_PER_TOKEN.get(model_name)
+    if price is None and model_name.endswith("-high"):
+        price = _PRICE_PER_TOKEN.get(model_name[: -len("-high")])
+    return price if price is not None else Decimal("0.0")
 
-    # 2) JWT をデコードしてペイロードを取得 (sub: email フィールドを参照)
-    try:
-        payload: Mapping[str, Any] = decode_access_token(raw_token)
-        user_email = payload.get("sub")
-        if not user_email:
-            raise ValueError("Token payload missing 'sub' claim")
-    except Exception as exc:
-        logger.error("コスト記録失敗: トークンデコードエラー (%s)", exc)
-        raise
 
-    # 3) 非同期セッションを用いたトランザクション管理下でコストを永続化
-    #    async_session_factory() は AsyncSession を生成するファクトリ
-    async with async_session_factory() as session:
-        try:
-            # session.begin() コンテキストで commit/rollback を自動管理
-            async with session.begin():
-                cost_entry = CostLog(
-                    workflow_id=workflow_id,
-                    user_email=user_email,
-                    api_name=api_name,
-                    cost=cost,
-                )
-                session.add(cost_entry)
-            # 正常終了時は自動的にコミットされる
-            logger.info(
-                "コスト記録成功: workflow=%s user=%s api=%s cost=%.6f",
-                workflow_id, user_email, api_name, cost
-            )
-        except Exception:
-            # 異常時は自動的にロールバックされる
-            logger.exception(
-                "コスト記録中に例外発生: workflow=%s user=%s api=%s",
-                workflow_id, user_email, api_name
-            )
-            raise
+def record(model_name: str, tokens: int, project: str, step: str) -> Decimal:
+    """
+    コストを算出して CostLog 行を書き込みキューへ積み、コストを返す。
+    DB への INSERT は log_sink が非同期にまとめて行うため、呼び出し側は待たない。
+    """
+    cost = get_price(model_name) * int(tokens)
+    log_sink.enqueue(CostLog, {
+        "project_name": project,
+        "step_name": step,
+        "model_name": model_name,
+        "tokens": int(tokens),
+        "cost": cost,
+    })
+    log.info(
+        "コスト記録: project=%s step=%s model=%s tokens=%d cost=%.6f",
+        project, step, model_name, tokens, cost,
+    )
+    return cost
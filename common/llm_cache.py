@@ -0,0 +1,282 @@
+"""
+common/llm_cache.py
+────────────────────────────────────────────────────────────
+LLM 応答キャッシュ (プロセス内)
+
+* キー   : BLAKE2b(namespace + model + 生成パラメータ + 静的プレフィックス + 正規化済みプロンプト)
+           - 正規化は改行コード (CRLF / CR → LF) と行末空白・前後の空行のみ。
+             インデントや行内の空白はコードの意味を変え得るためそのまま扱う
+           - max_tokens / temperature などの生成パラメータ (params) もキーに含め、
+             条件の異なる呼び出しで応答を使い回さない
+           - key_text に含まれない静的プレフィックス (system 指示) も prefix で渡し、
+             テンプレート変更後に永続化済みの旧応答を返さない
+* 保持   : TTL 付き LRU (OrderedDict)。上限超過時は最古エントリから破棄
+* 同時性 : 同一キーの同時リクエストは 1 回の LLM 呼び出しを共有 (single-flight)。
+           呼び出しは独立タスクで実行し、待ち手は shield 越しに待つので、
+           最初の呼び出し元がキャンセルされても他の待ち手は結果を受け取れる
+* 永続化 : LLM_CACHE_PATH を指定すると JSONL へ追記 (スレッドで実行) し、
+           再起動時に復元。読み込み時と追記行数が上限の 2 倍を超えた時点で
+           有効エントリだけのファイルへ書き直す (コンパクション)
+
+既定では無効。出力はサンプリングされるため、同一プロンプトで同じ応答を
+返してよい用途 (開発・デモの再実行など) でのみ明示的に有効化する。
+
+環境変数
+--------
+LLM_CACHE_ENABLED      : "1" で有効化 (既定 "0")
+LLM_CACHE_TTL          : 有効期間 [秒] (既定 86400)
+LLM_CACHE_MAX_ENTRIES  : 最大保持件数 (既定 1024)
+LLM_CACHE_PATH         : JSONL チェックポイントのパス (既定: 永続化なし)
+
+使い方例:
+    from common.llm_cache import llm_cache
+    gen = {"max_tokens": 16_384}
+    text = await llm_cache.get_or_call(
+        user_suffix, req.model_name,
+        lambda: call_generative_ai(model=req.model_name, ..., **gen),
+        namespace="code_generation",
+        params=gen,
+    )
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(text: str) -> str:
+    """
+    改行コードを LF に揃え、行末空白と前後の空行を除去する。
+    行頭インデント・行内の空白は保持する (Python では意味が変わるため)。
+    """
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(ln.rstrip() for ln in lines).strip("\n")
+
+
+class LLMResponseCache:
+    """
+    LLM 応答 (文字列) を保持する TTL 付き LRU キャッシュ。
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 86_400,
+        max_entries: int = 1024,
+        path: Optional[str] = None,
+        enabled: bool = True,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._appended = 0                  # 直近のコンパクション以降の追記行数
+        self._io_lock = asyncio.Lock()      # 追記とコンパクションを直列化
+        if enabled and path:
+            self._load()
+            self._compact()
+
+    # ---------- 生成ヘルパ ----------
+    @classmethod
+    def from_env(cls) -> "LLMResponseCache":
+        return cls(
+            ttl=float(os.getenv("LLM_CACHE_TTL", "86400")),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")),
+            path=os.getenv("LLM_CACHE_PATH") or None,
+            enabled=os.getenv("LLM_CACHE_ENABLED", "0") == "1",
+        )
+
+    # ---------- キー ----------
+    @staticmethod
+    def make_key(
+        key_text: str,
+        model: str,
+        namespace: str = "",
+        params: Optional[Mapping[str, Any]] = None,
+        prefix: str = "",
+    ) -> str:
+        h = hashlib.blake2b(digest_size=20)
+        h.update(namespace.encode())
+        h.update(b"\x00")
+        h.update(model.encode())
+        h.update(b"\x00")
+        h.update(json.dumps(params or {}, sort_keys=True, default=str).encode())
+        h.update(b"\x00")
+        h.update(hashlib.blake2b(prefix.encode(), digest_size=16).digest())
+        h.update(b"\x00")
+        h.update(_normalize(key_text).encode())
+        return h.hexdigest()
+
+    # ---------- 参照 / 登録 ----------
+    def get(self, key: str) -> Optional[str]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """同期版 (永続化なしのインスタンス向け。path 指定時はその場で追記する)"""
+        expires_at = time.time() + self.ttl
+        self._store(key, expires_at, value)
+        if self.path:
+            self._append(key, expires_at, value)
+
+    async def aset(self, key: str, value: str) -> None:
+        """登録し、JSONL への追記・コンパクションはスレッドで行う"""
+        expires_at = time.time() + self.ttl
+        self._store(key, expires_at, value)
+        if not self.path:
+            return
+        async with self._io_lock:
+            await asyncio.to_thread(self._append, key, expires_at, value)
+            if self._appended > 2 * self.max_entries:
+                await asyncio.to_thread(self._compact, list(self._entries.items()))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _store(self, key: str, expires_at: float, value: str) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ---------- メイン API ----------
+    async def get_or_call(
+        self,
+        key_text: str,
+        model: str,
+        coro_factory: Callable[[], Awaitable[str]],
+        *,
+        namespace: str = "",
+        params: Optional[Mapping[str, Any]] = None,
+        prefix: str = "",
+    ) -> str:
+        """
+        キャッシュヒット時は保存済み応答を返し、ミス時のみ coro_factory() を await する。
+        同一キーの呼び出しが進行中ならその結果を待ち合わせる。
+        params には coro_factory に渡す生成パラメータ (max_tokens 等)、
+        prefix には key_text に含まれない静的プレフィックスを指定する。
+        """
+        if not self.enabled:
+            return await coro_factory()
+
+        key = self.make_key(key_text, model, namespace, params, prefix)
+        cached = self.get(key)
+        if cached is not None:
+            logger.debug("LLM cache hit: ns=%s model=%s key=%s", namespace, model, key[:12])
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fill(key, coro_factory))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._fill_done(k, t))
+        # 呼び出し元のキャンセルを共有タスク (他の待ち手) へ伝播させない
+        return await asyncio.shield(task)
+
+    async def _fill(self, key: str, coro_factory: Callable[[], Awaitable[str]]) -> str:
+        value = await coro_factory()
+        await self.aset(key, value)
+        return value
+
+    def _fill_done(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # 待ち手がいない場合の未取得警告を抑止
+
+    async def stream_or_replay(
+        self,
+        key_text: str,
+        model: str,
+        stream_factory: Callable[[], AsyncIterator[str]],
+        *,
+        namespace: str = "",
+        params: Optional[Mapping[str, Any]] = None,
+        prefix: str = "",
+    ) -> AsyncIterator[str]:
+        """
+        ストリーミング版。ヒット時は保存済み応答を 1 チャンクで返し、
+        ミス時は stream_factory() の断片を逐次中継しつつ完走後に全文を登録する。
+        """
+        if not self.enabled:
+            async for delta in stream_factory():
+                yield delta
+            return
+
+        key = self.make_key(key_text, model, namespace, params, prefix)
+        cached = self.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        async for delta in stream_factory():
+            parts.append(delta)
+            yield delta
+        await self.aset(key, "".join(parts).strip())
+
+    # ---------- JSONL 永続化 ----------
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as fp:  # type: ignore[arg-type]
+                now = time.time()
+                for line in fp:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if rec.get("exp", 0) >= now:
+                        self._store(rec["key"], rec["exp"], rec["value"])
+            logger.info("LLM cache restored: %d entries from %s", len(self._entries), self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logger.warning("LLM cache load failed (%s): %s", self.path, exc)
+
+    def _append(self, key: str, expires_at: float, value: str) -> None:
+        try:
+            with open(self.path, "a", encoding="utf-8") as fp:  # type: ignore[arg-type]
+                fp.write(json.dumps({"key": key, "exp": expires_at, "value": value}, ensure_ascii=False))
+                fp.write("\n")
+            self._appended += 1
+        except OSError as exc:
+            logger.warning("LLM cache persist failed (%s): %s", self.path, exc)
+
+    def _compact(self, entries: Optional[List[Tuple[str, Tuple[float, str]]]] = None) -> None:
+        """有効エントリだけの JSONL を一時ファイルに書き、アトミックに置き換える"""
+        if entries is None:
+            entries = list(self._entries.items())
+        now = time.time()
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fp:
+                for key, (exp, value) in entries:
+                    if exp >= now:
+                        fp.write(json.dumps({"key": key, "exp": exp, "value": value}, ensure_ascii=False))
+                        fp.write("\n")
+            os.replace(tmp, self.path)  # type: ignore[arg-type]
+            self._appended = 0
+        except OSError as exc:
+            logger.warning("LLM cache compaction failed (%s): %s", self.path, exc)
+
+
+# ──────────────────────────────────────────────────────────────
+# アプリ全体で共有する Singleton
+# ──────────────────────────────────────────────────────────────
+llm_cache = LLMResponseCache.from_env()
@@ -1,16 +1,29 @@
 # common/logging_setup.py
+from __future__ import annotations
+
 import logging
+import os
 import sys
 
-def setup_logging(level: str = "INFO"):
+_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+_FORMAT_NO_TIME = "[%(levelname)s] %(name)s: %(message)s"
+
+def setup_logging(level: str | None = None):
     """
     標準出力へログを出力するハンドラを設定し、
     Uvicorn のアクセス・エラーロガーにも同一ハンドラを適用します。
+
+    - level 未指定時は環境変数 LOG_LEVEL (既定 INFO)。本番で DEBUG を
+      落とせば、%-style の遅延フォーマットにより文字列組み立て自体が行われない
+    - LOG_TIMESTAMPS=0 で asctime を省略 (コンテナランタイム側で時刻を付与する場合)
     """
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    fmt = _FORMAT if os.getenv("LOG_TIMESTAMPS", "1") != "0" else _FORMAT_NO_TIME
+
     # ルートロガー設定
     logging.basicConfig(
         level=getattr(logging, level),
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        format=fmt,
         handlers=[logging.StreamHandler(sys.stdout)]
     )
 
@@ -0,0 +1,104 @@
+"""
+common/pipeline.py
+────────────────────────────────────────────────────────────
+エージェント・パイプライン (同一プロセス内でサービス関数を直接呼び出す)
+
+    ┌ design_schema   ┐
+    ├ generate_advice ┼─▶ generate_code ─▶ run_qa
+    └ create_schedule ┘
+      (asyncio.gather で並行)
+
+* HTTP を経由しないため 1 ホップ分の RTT / JSON 往復が不要
+* 互いに独立な DBA / IT コンサル / PM は並行実行し、
+  壁時計時間を「最も遅い 1 本 + コード生成 + QA」に短縮
+* 生成コードには DBA が設計した DDL を渡す
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from agents.code_generation.models import CodeGenRequest
+from agents.code_generation.services import generate_code
+from agents.dba.models import DesignSchemaRequest
+from agents.dba.services import design_schema
+from agents.it_consulting.models import AdviceRequest
+from agents.it_consulting.services import generate_advice
+from agents.project_manager.models import ScheduleRequest
+from agents.project_manager.services import create_schedule
+from agents.qa.models import QARunRequest
+from agents.qa.services import run_qa
+
+
+class PipelineRequest(BaseModel):
+    """
+    入力モデル:
+      • project_name : プロジェクト名
+      • prompt       : 要件（自然言語）
+      • model_name   : 全ステップ共通の LLM モデル名
+      • timeline     : PM エージェントに渡すタイムライン (省略時は要件のみ)
+      • ui_design    : 既存 UI (HTML/CSS、省略可)
+    """
+    project_name: str = Field(..., description="プロジェクト名")
+    prompt: str = Field(..., description="自然言語での要件説明")
+    model_name: str = Field("o4-mini-high", description="使用する LLM モデル名")
+    timeline: Optional[dict] = Field(None, description="要件や現状フィードバック概要")
+    ui_design: Optional[str] = Field(None, description="既存UI設計(HTML/CSS)")
+
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
+
+
+class PipelineResponse(BaseModel):
+    """
+    応答モデル: 各ステップの成果物
+    """
+    dba_script: str = Field(..., description="DDL および初期データの SQL スクリプト")
+    advice: str = Field(..., description="ベストプラクティス提案（Markdown）")
+    schedule: str = Field(..., description="CSV 形式のスプリントスケジュール")
+    code: str = Field(..., description="生成されたソースコード")
+    qa_report: str = Field(..., description="テスト実行結果を含む Markdown レポート")
+
+    model_config = ConfigDict(extra="forbid", frozen=True, str_max_length=1_048_576)
+
+
+async def run_pipeline(req: PipelineRequest) -> Dict[str, Any]:
+    """
+    DBA / IT コンサル / PM を並行実行 → コード生成 → QA の順に実行し、
+    全成果物を 1 つの dict で返す。
+    """
+    common = {"project_name": req.project_name, "model_name": req.model_name}
+
+    # ① 互いに独立なステップを並行実行
+    schema, advice, schedule = await asyncio.gather(
+        design_schema(DesignSchemaRequest(prompt=req.prompt, **common)),
+        generate_advice(AdviceRequest(prompt=req.prompt, **common)),
+        create_schedule(ScheduleRequest(
+            timeline=req.timeline or {"requirement": req.prompt}, **common,
+        )),
+    )
+
+    # ② DDL を踏まえてコード生成
+    code = (await generate_code(CodeGenRequest(
+        prompt=req.prompt,
+        db_schema=schema["dba_script"],
+        ui_design=req.ui_design,
+        **common,
+    )))["code"]
+
+    # ③ 生成コードを QA
+    qa = await run_qa(QARunRequest(
+        requirement=req.prompt,
+        code=code,
+        ui=req.ui_design or "",
+        **common,
+    ))
+
+    return {
+        "dba_script": schema["dba_script"],
+        "advice": advice["advice"],
+        "schedule": schedule["schedule"],
+        "code": code,
+        "qa_report": qa["qa_report"],
+    }
@@ -22,7 +22,7 @@ def translate_text(text: str, target_lang: str = "en") -> str:
         return text
 
     prompt = f"Translate the following text into {target_lang}:\n{text}"
-    logger.info(f"Translation prompt: {prompt}")
+    logger.debug("Translation prompt: %s", prompt)
 
     try:
         # 動的インポートで循環参照を回避
@@ -34,5 +34,5 @@ def translate_text(text: str, target_lang: str = "en") -> str:
         ))
         return translated_text
     except Exception as e:
-        logger.error(f"Translation error: {e}")
+        logger.error("Translation error: %s", e)
         return text
@@ -59,7 +59,16 @@ logger = structlog.get_logger()
 # ────────────────────────────────────────────
 # PID ファイルベース Singleton ロック
 # ────────────────────────────────────────────
-def ensure_singleton(app_name: str, *, pid_dir: Optional[str] = None) -> None:
+# 取得した PID ファイルの fd (プロセス終了まで開いたままにして flock を保持)
+_LOCK_FDS: list[int] = []
+
+
+def ensure_singleton(
+    app_name: str,
+    *,
+    port: Optional[int] = None,
+    pid_dir: Optional[str] = None,
+) -> None:
     """
     同一ホストで ``app_name`` が二重起動しないように PID ファイルでロックする。
 
@@ -67,6 +76,10 @@ def ensure_singleton(app_name: str, *, pid_dir: Optional[str] = None) -> None:
     ----------
     app_name : str
         エージェント名や ``__name__`` など、一意になる名前。
+    port : int | None
+        指定時はモジュール名ではなく待受ポート単位でロックする
+        (``port-<port>.pid``)。uvicorn の multi-worker 起動では各ワーカーが
+        アプリモジュールを import するため、ロックは親プロセスでポート単位に取る。
     pid_dir : str | None
         PID ファイル格納ディレクトリ。未指定時は OS のテンポラリ領域
         (`tempfile.gettempdir()`).
@@ -74,20 +87,21 @@ def ensure_singleton(app_name: str, *, pid_dir: Optional[str] = None) -> None:
     pid_dir = pid_dir or tempfile.gettempdir()  # 標準の tmp ディレクトリ&#8203;:contentReference[oaicite:5]{index=5}
     os.makedirs(pid_dir, exist_ok=True)
 
-    pid_file = os.path.join(pid_dir, f"{app_name}.pid")
+    lock_name = f"port-{port}" if port is not None else app_name
+    pid_file = os.path.join(pid_dir, f"{lock_name}.pid")
     current_pid = os.getpid()
 
     flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY  # 排他生成&#8203;:contentReference[oaicite:6]{index=6}
     try:
         # ── 排他生成に成功 → 新規起動 ────────────────────
         fd = os.open(pid_file, flags, 0o644)
-        with os.fdopen(fd, "w", encoding="utf-8") as fp:
-            fp.write(str(current_pid))
+        os.write(fd, str(current_pid).encode())
         logger.info("PID file created: %s (pid=%d)", pid_file, current_pid)
 
-        # 追加: POSIX ファイルロック
+        # 追加: POSIX ファイルロック (fd は閉じずに保持)
         if fcntl:  # pragma: posix-only
-            fcntl.flock(fp, fcntl.LOCK_EX | fcntl.LOCK_NB)  # 非ブロッキング排他&#8203;:contentReference[oaicite:7]{index=7}
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)  # 非ブロッキング排他&#8203;:contentReference[oaicite:7]{index=7}
+        _LOCK_FDS.append(fd)
 
     except FileExistsError:
         # ── 既存 PID ファイルがある場合 ─────────────────
@@ -97,9 +111,9 @@ def ensure_singleton(app_name: str, *, pid_dir: Optional[str] = None) -> None:
         except (ValueError, OSError):
             old_pid = 0
 
-        if old_pid and psutil.pid_exists(old_pid):  # まだ生存&#8203;:contentReference[oaicite:8]{index=8}
+        if old_pid and old_pid != current_pid and psutil.pid_exists(old_pid):  # まだ生存&#8203;:contentReference[oaicite:8]{index=8}
             raise RuntimeError(
-                f"[ensure_singleton] '{app_name}' は既に起動中です (PID={old_pid})"
+                f"[ensure_singleton] '{lock_name}' は既に起動中です (PID={old_pid})"
             )
 
         # スタレ PID → 上書き再生成
@@ -122,7 +136,7 @@ def ensure_singleton(app_name: str, *, pid_dir: Optional[str] = None) -> None:
             logger.warning("Failed to remove PID file %s: %s", pid_file, exc)
 
     atexit.register(_cleanup)
-    logger.info("Singleton lock acquired for '%s' (pid=%d)", app_name, current_pid)
+    logger.info("Singleton lock acquired for '%s' (pid=%d)", lock_name, current_pid)
 
 
 # ────────────────────────────────────────────
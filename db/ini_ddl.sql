@@ -12,11 +12,18 @@ CREATE TABLE agentbased.users (
   updated_at     TIMESTAMP       NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 CREATE INDEX  agentbased.idx_users_username ON users(username);
+-- 認証 (get_current_user) の email 検索を Index Only Scan にするカバリングインデックス
+-- 既存 DB へは: CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ... (トランザクション外で実行)
+CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email_auth
+  ON agentbased.users (email) INCLUDE (username, role, created_at);
 
 -- 2. プロジェクトテーブル
 CREATE TABLE agentbased.projects (
   user_email   VARCHAR(255)    NOT NULL,
   name         VARCHAR(255)    NOT NULL,
+  -- サロゲートキー (既存 DB へは ALTER TABLE agentbased.projects
+  --   ADD COLUMN id BIGINT GENERATED BY DEFAULT AS IDENTITY UNIQUE; で既存行も採番される)
+  id           BIGINT          GENERATED BY DEFAULT AS IDENTITY UNIQUE,
   description  TEXT,
   created_at   TIMESTAMP       NOT NULL DEFAULT CURRENT_TIMESTAMP,
   updated_at   TIMESTAMP       NOT NULL DEFAULT CURRENT_TIMESTAMP,
@@ -70,6 +77,11 @@ CREATE TABLE agentbased.stakeholder_feedback (
     ON DELETE CASCADE
 );
 
+-- プロジェクト別の最新 N 件 (ORDER BY created_at DESC) 用の複合インデックス
+-- 既存 DB へは: CREATE INDEX CONCURRENTLY IF NOT EXISTS ... (トランザクション外で実行)
+CREATE INDEX  agentbased.ix_stakeholder_feedback_project_created
+  ON stakeholder_feedback(project_user_email, project_name, created_at DESC);
+
 -- 6. 品質テスト結果テーブル
 CREATE TABLE agentbased.test_results (
   test_result_key    BIGSERIAL     PRIMARY KEY,
@@ -83,6 +95,9 @@ CREATE TABLE agentbased.test_results (
     ON DELETE CASCADE
 );
 
+CREATE INDEX  agentbased.ix_test_results_project_created
+  ON test_results(project_user_email, project_name, created_at DESC);
+
 -- 7. セキュリティレポートテーブル
 CREATE TABLE agentbased.security_reports (
   security_report_key BIGSERIAL    PRIMARY KEY,
@@ -96,6 +111,9 @@ CREATE TABLE agentbased.security_reports (
     ON DELETE CASCADE
 );
 
+CREATE INDEX  agentbased.ix_security_reports_project_created
+  ON security_reports(project_user_email, project_name, created_at DESC);
+
 -- 8. ITコンサルティングレポートテーブル
 CREATE TABLE agentbased.it_consulting_reports (
   it_consult_report_key BIGSERIAL  PRIMARY KEY,
@@ -145,6 +163,13 @@ CREATE TABLE agentbased.file_attachments (
     ON DELETE CASCADE
 );
 CREATE INDEX  agentbased.idx_file_attachments_filename ON file_attachments(filename);
+-- ユーザ別アップロード履歴を index-only scan で返すカバリングインデックス
+CREATE INDEX  agentbased.ix_file_attachments_user_uploaded
+  ON file_attachments(project_user_email, upload_time DESC)
+  INCLUDE (file_attachment_key, filename);
+-- ZIP は圧縮済みなので TOAST 圧縮を行わず、substring() による部分読み出しを
+-- 該当チャンクの TOAST 行だけで済ませる (ダウンロードのチャンク配信用)
+ALTER TABLE agentbased.file_attachments ALTER COLUMN file_data SET STORAGE EXTERNAL;
 
 -- 12. ワークフロー実行テーブル
 CREATE TABLE agentbased.workflow_executions (
@@ -161,6 +186,8 @@ CREATE TABLE agentbased.workflow_executions (
     ON DELETE CASCADE
 );
 CREATE INDEX  agentbased.idx_workflow_executions_status ON workflow_executions(status);
+CREATE INDEX  agentbased.ix_workflow_executions_project_created
+  ON workflow_executions(project_user_email, project_name, created_at DESC);
 
 -- 13. API利用ログテーブル
 CREATE TABLE agentbased.api_usage_logs (
@@ -196,11 +223,33 @@ CREATE INDEX  agentbased.idx_log_file_archives_created_at
   ON agentbased.log_file_archives(created_at);
 
 -- ワークフロー実行ログ
+-- ZIP 本体は object_store (ZIP_STORAGE_PATH) に置き、zip_uri / zip_size / zip_sha256 のみ保持。
+-- 旧スキーマ (zip_data BYTEA) の既存 DB からの移行手順 (workflow_logs / log_archives 共通):
+--   1) ALTER TABLE agentbased.workflow_logs
+--        ADD COLUMN IF NOT EXISTS zip_uri VARCHAR(1024),
+--        ADD COLUMN IF NOT EXISTS zip_size BIGINT,
+--        ADD COLUMN IF NOT EXISTS zip_sha256 VARCHAR(64);
+--      ALTER TABLE agentbased.log_archives
+--        ADD COLUMN IF NOT EXISTS zip_uri VARCHAR(1024),
+--        ADD COLUMN IF NOT EXISTS zip_size BIGINT,
+--        ADD COLUMN IF NOT EXISTS zip_sha256 VARCHAR(64);
+--   2) python -m backend.services.zip_backfill
+--      (zip_data をストレージへ書き出し URI 等を埋める。中断しても再実行可)
+--   3) 未移行行が無いことを確認してから
+--      SELECT count(*) FROM agentbased.log_archives WHERE zip_uri IS NULL;  -- 0 であること
+--      ALTER TABLE agentbased.log_archives
+--        ALTER COLUMN zip_uri SET NOT NULL,
+--        ALTER COLUMN zip_size SET NOT NULL,
+--        ALTER COLUMN zip_sha256 SET NOT NULL,
+--        DROP COLUMN zip_data;
+--      ALTER TABLE agentbased.workflow_logs DROP COLUMN zip_data;
 CREATE TABLE agentbased.agentbased.workflow_logs (
   id            SERIAL       PRIMARY KEY,
   project_name  VARCHAR(256) NOT NULL,
   requirement   TEXT         NOT NULL,
-  zip_data      BYTEA,
+  zip_uri       VARCHAR(1024),
+  zip_size      BIGINT,
+  zip_sha256    VARCHAR(64),
   model         VARCHAR(50),
   max_cost      DOUBLE PRECISION,
   created_at    TIMESTAMPTZ  NOT NULL DEFAULT now()
@@ -228,7 +277,9 @@ CREATE TABLE agentbased.agentbased.log_archives (
   user_email      VARCHAR(255),
   project_name    VARCHAR(255),
   filename        VARCHAR(255),
-  zip_data        BYTEA,
+  zip_uri         VARCHAR(1024) NOT NULL,
+  zip_size        BIGINT        NOT NULL,
+  zip_sha256      VARCHAR(64)   NOT NULL,
   created_at      TIMESTAMPTZ  NOT NULL DEFAULT now(),
   CONSTRAINT fk_log_archives_workflow_log
     FOREIGN KEY (workflow_log_id)
@@ -17,6 +17,7 @@ from backend.config.settings import get_settings
 from backend.db.base import Base            # ← ここを修正
 # 各モデルモジュールをインポートすることで、Base.metadata に登録されるようにする
 import backend.models
+backend.models.load_all()
 # 必要に応じて他のモデルもここにインポート
 
 def main():
@@ -0,0 +1,44 @@
+# tests/test_agent_factory.py
+"""
+common.agent_factory (ORJSONResponse 既定化) の単体テスト
+"""
+import importlib
+
+import pytest
+from fastapi.responses import ORJSONResponse
+from fastapi.testclient import TestClient
+
+
+@pytest.mark.parametrize("module", [
+    "agents.security.app",
+    "agents.stakeholder.app",
+    "agents.ui_generation.app",
+])
+def test_agent_apps_default_to_orjson(module):
+    app = importlib.import_module(module).app
+    assert app.router.default_response_class is ORJSONResponse
+
+
+def test_precheck_error_uses_orjson_handler():
+    from agents.security.app import app
+
+    res = TestClient(app).post("/scan_security", json={"code": "   "})
+    assert res.status_code == 400
+    assert res.json() == {"detail": "code is required for security scan"}
+    from starlette.exceptions import HTTPException
+    from common.agent_factory import _orjson_http_exception
+    assert app.exception_handlers[HTTPException] is _orjson_http_exception
+
+
+def test_serve_agent_binds_loopback_and_auto_loop_by_default(monkeypatch):
+    from common import agent_factory
+
+    runs = []
+    monkeypatch.setattr(agent_factory, "ensure_singleton", lambda *a, **k: None)
+    monkeypatch.setattr(agent_factory.uvicorn, "run", lambda app, **kw: runs.append(kw))
+    monkeypatch.delenv("AGENT_HOST", raising=False)
+    agent_factory.serve_agent("agents.qa.app:app", 8003)
+    monkeypatch.setenv("AGENT_HOST", "0.0.0.0")
+    agent_factory.serve_agent("agents.qa.app:app", 8003)
+    assert [r["host"] for r in runs] == ["127.0.0.1", "0.0.0.0"]
+    assert runs[0]["loop"] == "auto"
@@ -0,0 +1,89 @@
+# tests/test_agent_http.py
+"""
+common.agent_http (エンドポイントデコレータ / gzip ボディ) の単体テスト
+"""
+import gzip
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from common.agent_http import _encode_body, agent_endpoint, agent_stream_endpoint
+
+
+class _Req(BaseModel):
+    text: str
+
+
+app = FastAPI()
+
+
+@app.post("/echo")
+@agent_endpoint(_Req, output_key="text")
+async def _echo(req: _Req):
+    return req.text
+
+
+@app.post("/echo/stream")
+@agent_stream_endpoint(_Req)
+async def _echo_stream(req: _Req):
+    yield req.text[:3]
+    yield req.text[3:]
+
+
+client = TestClient(app)
+
+
+def test_gzip_request_body_is_inflated():
+    body, headers = _encode_body({"text": "x" * 4096})
+    assert headers["Content-Encoding"] == "gzip"
+    res = client.post("/echo", content=body, headers=headers)
+    assert res.status_code == 200
+    assert res.json() == {"text": "x" * 4096}
+
+
+def test_small_body_is_sent_plain():
+    body, headers = _encode_body({"text": "hi"})
+    assert "Content-Encoding" not in headers
+    assert client.post("/echo", content=body, headers=headers).json() == {"text": "hi"}
+
+
+def test_oversized_gzip_body_is_rejected():
+    bomb = gzip.compress(b" " * (40 * 1024 * 1024))
+    res = client.post("/echo", content=bomb, headers={"Content-Encoding": "gzip"})
+    assert res.status_code == 400
+
+
+def test_stream_endpoint_emits_sse_frames():
+    res = client.post("/echo/stream", json={"text": "hello"})
+    assert res.headers["content-type"].startswith("text/event-stream")
+    assert res.text == 'data: "hel"\n\ndata: "lo"\n\nevent: done\ndata: {}\n\n'
+
+
+def test_post_json_reuses_one_pooled_client(monkeypatch):
+    import asyncio
+    import httpx
+    from common import agent_http
+
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.path)
+        return httpx.Response(200, json={"ok": True})
+
+    async def run():
+        await agent_http.aclose_client()
+        real_client = httpx.AsyncClient
+        monkeypatch.setattr(agent_http.httpx, "AsyncClient",
+                            lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw))
+        first = await agent_http.post_json("http://agent", "/a", {"x": 1})
+        client = agent_http.get_client()
+        second = await agent_http.post_json("http://agent", "/b", {"x": 2})
+        assert agent_http.get_client() is client and not client.is_closed
+        await agent_http.aclose_client()
+        assert client.is_closed
+        return first, second
+
+    assert asyncio.run(run()) == ({"ok": True}, {"ok": True})
+    assert seen == ["/a", "/b"]
+
@@ -0,0 +1,126 @@
+# tests/test_auth_cache.py
+"""
+backend.db.dependencies_async.get_current_user の JWT → ユーザ TTL キャッシュ検証
+"""
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import backend.db.dependencies_async as deps
+from backend.security.auth import UserPayload
+
+
+def _request(cookie: str = "") -> Request:
+    headers = [(b"cookie", f"access_token={cookie}".encode())] if cookie else []
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    calls = {"decode": 0, "select": 0}
+
+    async def fake_decode(token):
+        calls["decode"] += 1
+        return UserPayload(email="a@example.com", exp=int(time.time()) + 3600)
+
+    class FakeResult:
+        def first(self):
+            return ("a@example.com", "alice", "user", None)
+
+    class FakeConn:
+        async def execute(self, _stmt, params=None):
+            assert params == {"email": "a@example.com"}
+            calls["select"] += 1
+            return FakeResult()
+
+    class FakeEngine:
+        @asynccontextmanager
+        async def connect(self):
+            yield FakeConn()
+
+    monkeypatch.setattr(deps, "decode_access_token_async", fake_decode)
+    monkeypatch.setattr(deps, "get_engine", FakeEngine)
+    monkeypatch.setattr(deps, "_user_cache", OrderedDict())
+    monkeypatch.setattr(deps, "_revoked", {})
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_current_user_is_cached_per_token(fake_backend):
+    for _ in range(3):
+        user = await deps.get_current_user(_request(), "tok-1")
+    assert isinstance(user, deps.AuthUser)
+    assert (user.email, user.username, user.role) == ("a@example.com", "alice", "user")
+    assert fake_backend == {"decode": 1, "select": 1}
+    assert all(isinstance(k, bytes) and b"tok-1" not in k for k in deps._user_cache)
+
+    await deps.get_current_user(_request(), "tok-2")
+    assert fake_backend["select"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_entry_never_outlives_token(fake_backend):
+    deps._cache_put(deps._token_key("old"), ("x",), int(time.time()) - 1)
+    assert not deps._user_cache
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_is_rejected(fake_backend):
+    await deps.get_current_user(_request(), "tok-1")
+    exposure = deps.revoke_token("tok-1", int(time.time()) + 3600)
+    with pytest.raises(HTTPException) as exc:
+        await deps.get_current_user(_request(), "tok-1")
+    assert exc.value.status_code == 401
+    # 失効はプロセス内のみ: 他ワーカーでの残り有効秒数を返す
+    assert 3590 < exposure <= 3600
+
+
+def test_extract_token_prefers_parsed_header_then_cookie():
+    assert deps.extract_token(_request("c"), "h") == "h"
+    assert deps.extract_token(_request('"Bearer c"'), None) == "c"
+    assert deps.extract_token(_request("c"), None) == "c"
+    assert deps.extract_token(_request(), None) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("algorithm, offloaded", [("HS256", False), ("RS256", True)])
+async def test_async_decode_offloads_only_asymmetric_algorithms(monkeypatch, algorithm, offloaded):
+    import threading
+    from backend.security import auth
+
+    seen = []
+    monkeypatch.setattr(auth, "ALGORITHM", algorithm)
+    monkeypatch.setattr(auth, "decode_access_token",
+                        lambda t: seen.append(threading.current_thread().name) or UserPayload(email=t))
+    assert (await auth.decode_access_token_async("a@example.com")).email == "a@example.com"
+    assert seen[0].startswith("jwt-verify") is offloaded
+
+
+@pytest.mark.asyncio
+async def test_verify_password_async_runs_off_the_event_loop(monkeypatch):
+    import threading
+    from backend.security import auth
+
+    seen = []
+    monkeypatch.setattr(auth, "verify_password",
+                        lambda p, h: seen.append(threading.current_thread().name) or p == h)
+    assert await auth.verify_password_async("pw", "pw") is True
+    assert await auth.verify_password_async("pw", "other") is False
+    assert all(name.startswith("bcrypt-verify") for name in seen) and len(seen) == 2
+
+
+def test_pool_status_requires_auth_and_moved_under_debug():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from backend.routers import health
+
+    app = FastAPI()
+    app.include_router(health.router, prefix="/health")
+    app.include_router(health.debug_router, prefix="/debug")
+    client = TestClient(app)
+    assert client.get("/health/pool").status_code == 404
+    assert client.get("/debug/pool").status_code == 401
@@ -0,0 +1,30 @@
+# tests/test_code_patch.py
+"""
+agents.code_patch.services (変更なし判定) の単体テスト
+"""
+import pytest
+
+import agents.code_patch.services as svc
+from agents.code_patch.models import PatchCodeRequest
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("llm_output, unchanged", [
+    ("def f():\r\n    return 1\r\n", True),     # 改行コード・末尾空白のみの差分
+    ("def f():\n    return 2\n", False),
+    # プロンプト指定どおりのフェンス付き応答 (タイトルラベル付き)
+    ("```python:title=patched_code.py\r\ndef f():\r\n    return 1\r\n```\r\n", True),
+    ("```python:title=patched_code.py\ndef f():\n    return 2\n```", False),
+])
+async def test_patch_code_reports_unchanged(monkeypatch, llm_output, unchanged):
+    async def fake_get_or_call(key_text, model, coro_factory, *, namespace="", params=None, prefix=""):
+        return llm_output
+
+    monkeypatch.setattr(svc.llm_cache, "get_or_call", fake_get_or_call)
+    req = PatchCodeRequest(source_code="def f():\n    return 1", instructions="none")
+
+    result = await svc.patch_code(req)
+
+    assert result["unchanged"] is unchanged
+    if unchanged:
+        assert result["patched_code"] == req.source_code
@@ -52,6 +52,19 @@ def test_clamp_tokens(model_name, requested):
     clamped = svc._clamp_tokens(model_name, requested)
     assert clamped <= MODEL_CONFIG[model_name]["token_limit"]
 
+def test_client_rebuilt_after_httpx_close(monkeypatch):
+    from common.ai_service import close_httpx_client
+    monkeypatch.setenv("API_TYPE", "openai")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    svc = AIService()
+    old_client, old_http = svc.client, svc._http
+    asyncio.run(close_httpx_client())
+    assert old_http.is_closed
+    new_client = svc.client
+    assert new_client is not old_client
+    assert not svc._http.is_closed
+    asyncio.run(close_httpx_client())
+
 # --- translation_service ---
 from common.translation_service import translate_text
 
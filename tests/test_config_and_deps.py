@@ -27,3 +27,304 @@ def test_get_db_session_close():
     assert hasattr(db, "close")
     db.close()
     gen.close()
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_opens_connections_concurrently(monkeypatch):
+    from backend.db import async_engine
+
+    opened, closed = [], []
+
+    class FakeConn:
+        def __await__(self):
+            opened.append(self)
+            if False:
+                yield
+            return self
+
+        async def execute(self, _stmt):
+            # 全接続が同時に保持されていること (1 本の使い回しではない)
+            assert len(opened) == 3
+
+        async def close(self):
+            closed.append(self)
+
+    class FakeEngine:
+        def connect(self):
+            return FakeConn()
+
+    monkeypatch.setattr(async_engine, "get_engine", FakeEngine)
+    assert await async_engine.warm_pool(3) == 3
+    assert len(closed) == 3
+
+
+@pytest.mark.asyncio
+async def test_gather_reads_runs_statements_concurrently_in_order(monkeypatch):
+    import asyncio
+    from contextlib import asynccontextmanager
+
+    from sqlalchemy import literal, select
+
+    from backend.db import pipeline
+
+    active, peak = 0, 0
+
+    class FakeResult:
+        def __init__(self, value):
+            self.value = value
+
+        def all(self):
+            return [(self.value,)]
+
+    class FakeConn:
+        async def execute(self, stmt):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return FakeResult(stmt.compile().params["param_1"])
+
+    class FakeEngine:
+        @asynccontextmanager
+        async def connect(self):
+            yield FakeConn()
+
+    monkeypatch.setattr(pipeline, "get_engine", FakeEngine)
+    out = await pipeline.gather_reads(*(select(literal(i)) for i in range(3)))
+    assert out == [[(0,)], [(1,)], [(2,)]]
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_log_sink_batches_rows_per_model(monkeypatch):
+    import asyncio
+    import logging
+    from contextlib import asynccontextmanager
+    from types import SimpleNamespace
+
+    from backend.db import log_sink
+    from backend.models import APIUsageLog, CostLog, SystemLog
+    from common import cost_tracker
+
+    executed = []
+    copied = []
+
+    class FakeDriver:
+        async def copy_records_to_table(self, table, *, schema_name, columns, records):
+            copied.append((schema_name, table, columns, records))
+
+    class FakeConn:
+        dialect = SimpleNamespace(driver="asyncpg")
+
+        async def execute(self, stmt, params):
+            executed.append((stmt.table.name, list(params)))
+
+        async def get_raw_connection(self):
+            return SimpleNamespace(driver_connection=FakeDriver())
+
+    class FakeEngine:
+        @asynccontextmanager
+        async def begin(self):
+            yield FakeConn()
+
+    monkeypatch.setattr(log_sink, "get_engine", FakeEngine)
+    monkeypatch.setattr(log_sink, "_queue", None)
+    monkeypatch.setattr(log_sink, "_task", None)
+
+    for i in range(3):
+        assert cost_tracker.record("o4-mini-high", tokens=10, project="P", step=f"s{i}") > 0
+    log_sink.enqueue(APIUsageLog, {"api_name": "x"})
+    SystemLog.create(logging.WARNING, "w1")
+    SystemLog.create(logging.INFO, "i1")
+    await asyncio.sleep(log_sink.FLUSH_INTERVAL * 3)
+    await log_sink.stop()
+
+    assert sorted((name, len(rows)) for name, rows in executed) == [
+        ("api_usage_logs", 1), (CostLog.__tablename__, 3),
+    ]
+    (schema, table, columns, records), = copied
+    assert (schema, table) == ("agentbased", "system_logs")
+    assert columns == SystemLog.COPY_COLUMNS
+    assert records == [("WARNING", "w1"), ("INFO", "i1")]
+
+
+@pytest.mark.asyncio
+async def test_log_sink_retries_and_requeues_rows_cancelled_mid_write(monkeypatch):
+    import asyncio
+    from backend.db import log_sink
+    from backend.models import APIUsageLog
+
+    written, calls = [], {"n": 0}
+    blocked = asyncio.Event()
+
+    async def flaky_write(rows):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise RuntimeError("db down")
+        if calls["n"] == 2:
+            blocked.set()
+            await asyncio.sleep(3600)  # stop() によるキャンセル待ち
+        written.extend(row["api_name"] for _, row in rows)
+
+    monkeypatch.setattr(log_sink, "_write", flaky_write)
+    monkeypatch.setattr(log_sink, "RETRY_BACKOFF", 0)
+    monkeypatch.setattr(log_sink, "_queue", None)
+    monkeypatch.setattr(log_sink, "_task", None)
+
+    log_sink.enqueue(APIUsageLog, {"api_name": "a"})
+    log_sink.enqueue(APIUsageLog, {"api_name": "b"})
+    await asyncio.wait_for(blocked.wait(), 1)
+    await log_sink.stop()
+
+    assert written == ["a", "b"] and calls["n"] == 3
+
+
+@pytest.mark.asyncio
+async def test_object_store_is_content_addressed_and_confined(monkeypatch, tmp_path):
+    from types import SimpleNamespace
+    from backend.services import object_store
+
+    monkeypatch.setattr(object_store, "get_settings",
+                        lambda: SimpleNamespace(zip_storage_path=str(tmp_path)))
+    first = await object_store.put_zip(b"PK\x05\x06zip")
+    second = await object_store.put_zip(b"PK\x05\x06zip")
+    assert first == second and first.size == 7
+    path = object_store.local_path(first.uri)
+    assert path.read_bytes() == b"PK\x05\x06zip"
+    assert path.name == f"{first.sha256}.zip"
+    with pytest.raises(ValueError):
+        object_store.local_path((tmp_path.parent / "etc.zip").as_uri())
+    with pytest.raises(ValueError):
+        object_store.local_path("s3://bucket/key.zip")
+
+
+def test_system_log_create_enqueues_without_db(monkeypatch):
+    import logging
+    from backend.db import log_sink
+    from backend.models.system_log import SystemLog
+
+    queued = []
+    monkeypatch.setattr(log_sink, "enqueue", lambda model, row: queued.append((model, row)))
+    assert SystemLog.create(logging.ERROR, "boom") is None
+    (model, row), = queued
+    assert model is SystemLog
+    assert row == {"log_level": "ERROR", "message": "boom"}  # created_at は DB 側で付与
+
+
+def test_system_log_add_joins_caller_transaction():
+    import logging
+    from backend.models.system_log import SystemLog
+
+    class FakeSession:
+        def __init__(self):
+            self.added = []
+
+        def add(self, obj):
+            self.added.append(obj)
+
+        async def commit(self):  # 呼ばれてはならない
+            raise AssertionError("SystemLog.add must not commit")
+
+    session = FakeSession()
+    log = SystemLog.add(session, logging.DEBUG, "dbg")
+    assert session.added == [log]
+    assert (log.log_level, log.message, log.log_key) == ("DEBUG", "dbg", None)
+
+
+
+@pytest.mark.asyncio
+async def test_log_archive_list_projects_summary_columns_only():
+    from datetime import datetime
+    from sqlalchemy.dialects import postgresql
+    from backend.services.log_archive_service import list_log_archives_by_project
+
+    class FakeSession:
+        async def execute(self, stmt):
+            self.sql = str(stmt.compile(dialect=postgresql.dialect()))
+            row = type("R", (), {"id": 1, "filename": "a.zip", "created_at": datetime(2024, 1, 1)})
+            return type("Res", (), {"all": lambda _self: [row]})()
+
+    db = FakeSession()
+    rows = await list_log_archives_by_project(db, "u@example.com", None)
+    assert rows[0].filename == "a.zip"
+    select_list = db.sql.split(" FROM ")[0]
+    assert select_list.count(",") == 2 and "created_at" in select_list
+    # workflow_log の joined eager load も走らない
+    assert "workflow_logs" not in db.sql and "project_name" not in db.sql
+
+
+@pytest.mark.asyncio
+async def test_attachment_download_streams_in_chunks(monkeypatch):
+    from backend.routers import logs
+
+    blob = bytes(range(256)) * 10
+    reads = []
+
+    class FakeSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def scalar(self, stmt):
+            off, n = (p.value for p in stmt.selected_columns[0].clauses.clauses[1:])
+            reads.append(n)
+            return blob[off - 1: off - 1 + n]
+
+    monkeypatch.setattr(logs, "get_session_factory", lambda: FakeSession)
+    chunks = [c async for c in logs._stream_file_data(1, chunk_size=1000)]
+    assert b"".join(chunks) == blob
+    assert [len(c) for c in chunks] == [1000, 1000, 560] and reads == [1000] * 3
+
+
+def test_object_store_uri_to_windows_path(monkeypatch):
+    import nturl2path
+    from pathlib import PureWindowsPath
+    from backend.services import object_store
+
+    monkeypatch.setattr(object_store, "url2pathname", nturl2path.url2pathname)
+    uri = PureWindowsPath(r"C:\zips\ab\abc.zip").as_uri()
+    parsed = object_store.urlparse(uri)
+    assert object_store._uri_to_os_path(parsed.netloc, parsed.path) == r"C:\zips\ab\abc.zip"
+    unc = object_store.urlparse(PureWindowsPath(r"\\srv\share\ab\abc.zip").as_uri())
+    assert object_store._uri_to_os_path(unc.netloc, unc.path) == r"\\srv\share\ab\abc.zip"
+
+
+@pytest.mark.asyncio
+async def test_zip_backfill_moves_bytea_into_object_store(monkeypatch):
+    from types import SimpleNamespace
+    from backend.services import object_store, zip_backfill
+
+    pending = [SimpleNamespace(id=1, zip_data=b"a"), SimpleNamespace(id=2, zip_data=b"b"),
+               SimpleNamespace(id=3, zip_data=b"c")]
+    updates, commits = [], []
+
+    class Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, stmt, params):
+            if str(stmt).startswith("SELECT"):
+                batch = pending[: params["n"]]
+                del pending[: params["n"]]
+                return SimpleNamespace(all=lambda: batch)
+            updates.extend(params)
+
+        async def commit(self):
+            commits.append(1)
+
+    async def fake_put(data):
+        return object_store.StoredObject(f"file:///z/{data.decode()}.zip", len(data), data.decode())
+
+    monkeypatch.setattr(zip_backfill, "get_session_factory", lambda: Session)
+    monkeypatch.setattr(zip_backfill, "put_zip", fake_put)
+    assert await zip_backfill.backfill_table("log_archives", batch_size=2) == 3
+    assert [u["id"] for u in updates] == [1, 2, 3] and len(commits) == 2
+    assert updates[2] == {"id": 3, "uri": "file:///z/c.zip", "size": 1, "sha256": "c"}
+    with pytest.raises(ValueError):
+        await zip_backfill.backfill_table("users")
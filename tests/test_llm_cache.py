@@ -0,0 +1,126 @@
+# tests/test_llm_cache.py
+"""
+common.llm_cache (LLM 応答キャッシュ) の単体テスト
+"""
+import asyncio
+import pytest
+
+from common.llm_cache import LLMResponseCache
+
+
+@pytest.mark.asyncio
+async def test_get_or_call_hits_on_line_ending_variant():
+    cache = LLMResponseCache()
+    calls = []
+
+    async def fake_llm():
+        calls.append(1)
+        return "answer"
+
+    assert await cache.get_or_call("a b  \r\nc\r\n", "m", fake_llm) == "answer"
+    assert await cache.get_or_call("a b\nc", "m", fake_llm) == "answer"
+    assert len(calls) == 1
+    # モデルが異なれば別キー
+    await cache.get_or_call("a b\nc", "other", fake_llm)
+    assert len(calls) == 2
+
+
+def test_key_keeps_indentation_and_generation_params():
+    make_key = LLMResponseCache.make_key
+    # インデントだけが異なるコードは意味が違うので別キー
+    assert make_key("if x:\n    y()\nz()", "m") != make_key("if x:\n    y()\n    z()", "m")
+    assert make_key("a  b", "m") != make_key("a b", "m")
+    # 生成パラメータが異なれば別キー (dict の順序には依存しない)
+    base = make_key("p", "m", "qa", {"max_tokens": 10, "temperature": 0.3})
+    assert base == make_key("p", "m", "qa", {"temperature": 0.3, "max_tokens": 10})
+    assert base != make_key("p", "m", "qa", {"max_tokens": 20, "temperature": 0.3})
+    assert base != make_key("p", "m", "qa", {"max_tokens": 10})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_call():
+    cache = LLMResponseCache()
+    calls = []
+
+    async def slow_llm():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "x"
+
+    results = await asyncio.gather(*(cache.get_or_call("p", "m", slow_llm) for _ in range(5)))
+    assert results == ["x"] * 5
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_jsonl_persistence_roundtrip(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    first = LLMResponseCache(path=path)
+
+    async def llm():
+        return "persisted"
+
+    await first.get_or_call("p", "m", llm, namespace="qa")
+
+    async def must_not_call():
+        raise AssertionError("cache miss")
+
+    second = LLMResponseCache(path=path)
+    assert await second.get_or_call("p", "m", must_not_call, namespace="qa") == "persisted"
+
+
+@pytest.mark.asyncio
+async def test_static_prefix_change_invalidates_persisted_entries(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+
+    async def llm():
+        return "old"
+
+    await LLMResponseCache(path=path).get_or_call("p", "m", llm, prefix="template v1")
+
+    async def new_llm():
+        return "new"
+
+    second = LLMResponseCache(path=path)
+    assert await second.get_or_call("p", "m", new_llm, prefix="template v2") == "new"
+
+
+@pytest.mark.asyncio
+async def test_cancelling_first_caller_does_not_cancel_waiters():
+    cache = LLMResponseCache()
+
+    async def slow_llm():
+        await asyncio.sleep(0.05)
+        return "x"
+
+    leader = asyncio.ensure_future(cache.get_or_call("p", "m", slow_llm))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(cache.get_or_call("p", "m", slow_llm))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await waiter == "x"
+    assert leader.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_jsonl_is_compacted_on_load_and_after_many_appends(tmp_path):
+    path = tmp_path / "results.jsonl"
+    cache = LLMResponseCache(path=str(path), max_entries=2)
+
+    for i in range(5):
+        async def llm(i=i):
+            return f"v{i}"
+        await cache.get_or_call(f"p{i}", "m", llm)
+
+    # 5 行追記 > 2 × max_entries でコンパクション → 有効な 2 件だけが残る
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+    path.write_text(path.read_text(encoding="utf-8") * 3, encoding="utf-8")
+    LLMResponseCache(path=str(path), max_entries=2)
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_shared_cache_is_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("LLM_CACHE_ENABLED", raising=False)
+    assert LLMResponseCache.from_env().enabled is False
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "1")
+    assert LLMResponseCache.from_env().enabled is True
@@ -15,3 +15,249 @@ def test_user_model_columns():
     cols = [c.name for c in User.__table__.columns]
     for expected in ("email","username","password_hash"):
         assert expected in cols
+
+def test_project_relationships_are_not_eager():
+    """Project 取得時に子コレクションを暗黙ロードしない (必要時は selectinload で明示)"""
+    from sqlalchemy import inspect, select
+    from sqlalchemy.orm import selectinload
+    from backend.models import load_all
+
+    load_all()
+    rels = inspect(Project).relationships
+    assert len(rels) == 10
+    assert {r.lazy for r in rels} == {"raise_on_sql"}
+    # 明示的な opt-in は引き続き利用できる
+    select(Project).options(selectinload(Project.test_results))
+
+
+def test_no_joined_eager_on_one_to_many():
+    """一対多の joined eager (直積による親行の複製) を全モデルで禁止"""
+    import pathlib
+    import re
+    from backend.models import load_all
+    from backend.db.base import Base
+
+    load_all()
+    offenders = [
+        str(rel)
+        for mapper in Base.registry.mappers
+        for rel in mapper.relationships
+        if rel.uselist and rel.lazy in ("joined", "subquery")
+    ]
+    assert offenders == []
+
+    root = pathlib.Path(__file__).resolve().parents[1]
+    pattern = re.compile(r"joinedload\(\s*Project\.")
+    hits = [
+        str(path.relative_to(root))
+        for sub in ("backend", "agents", "common")
+        for path in (root / sub).rglob("*.py")
+        if pattern.search(path.read_text(encoding="utf-8", errors="ignore"))
+    ]
+    assert hits == []
+
+
+def test_foreign_key_types_match_referenced_columns():
+    """FK 列と参照先列の型を一致させる (暗黙キャストで結合時の索引が使えなくなるのを防ぐ)"""
+    from backend.models import load_all
+    from backend.db.base import Base
+
+    load_all()
+    mismatched = [
+        f"{fk.parent.table.name}.{fk.parent.name}"
+        for table in Base.metadata.tables.values()
+        for fk in table.foreign_keys
+        if repr(fk.parent.type) != repr(fk.column.type)
+    ]
+    assert mismatched == []
+
+
+@pytest.mark.asyncio
+async def test_project_fetch_children_uses_one_session_per_collection():
+    import asyncio
+    import time
+    from backend.models import load_all
+
+    load_all()
+    sessions = []
+
+    class FakeSession:
+        async def __aenter__(self):
+            sessions.append(self)
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def scalars(self, stmt):
+            await asyncio.sleep(0.1)
+            table = stmt.get_final_froms()[0].name
+            return type("R", (), {"all": lambda _self: [table]})()
+
+    t0 = time.perf_counter()
+    out = await Project.fetch_children(FakeSession, "u@example.com", "p")
+    assert time.perf_counter() - t0 < 0.25
+    assert out == {
+        "test_results": ["test_results"],
+        "security_reports": ["security_reports"],
+        "workflow_executions": ["workflow_executions"],
+    }
+    assert len(set(map(id, sessions))) == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_chunks_by_parameter_limit(monkeypatch):
+    from sqlalchemy.dialects import postgresql
+    from backend.models import core, load_all
+    from backend.models.test_result import TestResult
+
+    load_all()
+    calls = []
+
+    class FakeSession:
+        async def execute(self, stmt, params):
+            calls.append((str(stmt.compile(dialect=postgresql.dialect())), params))
+
+    ncols = len(TestResult.__table__.columns)
+    monkeypatch.setattr(core, "_PG_MAX_PARAMS", ncols * 2)
+    rows = [{"project_user_email": "u", "project_name": "p", "qa_report": str(i)} for i in range(5)]
+    await TestResult.bulk_insert(FakeSession(), rows)
+    await TestResult.bulk_insert(FakeSession(), [])
+
+    assert [len(params) for _, params in calls] == [2, 2, 1]
+    assert all("ON CONFLICT DO NOTHING" in sql for sql, _ in calls)
+    assert not any("RETURNING" in sql for sql, _ in calls)
+    assert [r["qa_report"] for _, params in calls for r in params] == list("01234")
+
+
+def test_report_bodies_are_deferred_until_requested():
+    from sqlalchemy import select
+    from sqlalchemy.orm import undefer_group
+    from backend.models import load_all
+    from backend.models.security_report import SecurityReport
+    from backend.models.system_log import SystemLog
+
+    load_all()
+    assert "security_reports.report," not in str(select(SecurityReport))
+    assert "system_logs.message" not in str(select(SystemLog))
+    assert "security_reports.report," in str(select(SecurityReport).options(undefer_group("body")))
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_returns_keys_only_when_asked():
+    from backend.models import load_all
+    from backend.models.workflow_execution import WorkflowExecution
+
+    load_all()
+    sqls = []
+
+    class FakeResult:
+        def scalars(self):
+            return type("S", (), {"all": lambda _self: [10, 11]})()
+
+    class FakeSession:
+        async def execute(self, stmt, params):
+            sqls.append(str(stmt))
+            return FakeResult()
+
+    rows = [{"status": "SUCCESS"}, {"status": "FAILURE"}]
+    keys = await WorkflowExecution.bulk_insert(FakeSession(), rows, return_keys=True)
+    assert keys == [10, 11]
+    assert "RETURNING agentbased.workflow_executions.wf_exec_key" in sqls[0]
+
+
+def test_workflow_log_cascade_lives_on_parent_side_only():
+    from sqlalchemy import inspect
+    from backend.models import load_all
+    from backend.models.log_archive import LogArchive
+    from backend.models.workflow_log import WorkflowLog
+
+    load_all()
+    child = inspect(LogArchive).relationships["workflow_log"]
+    parent = inspect(WorkflowLog).relationships["log_archives"]
+    assert not child.cascade.delete and not child.single_parent
+    assert parent.cascade.delete_orphan and parent.passive_deletes
+
+
+@pytest.mark.asyncio
+async def test_project_stream_executions_uses_server_side_cursor():
+    from backend.models import load_all
+
+    load_all()
+    seen = []
+
+    async def _rows():
+        for i in range(3):
+            yield i
+
+    class FakeSession:
+        async def stream_scalars(self, stmt):
+            seen.append(stmt)
+            return _rows()
+
+    project = Project.create(user_email="u@example.com", name="p")
+    out = [e async for e in project.stream_executions(FakeSession(), batch_size=50)]
+    assert out == [0, 1, 2]
+    (stmt,) = seen
+    assert stmt.get_execution_options()["yield_per"] == 50
+    assert "ORDER BY agentbased.workflow_executions.wf_exec_key" in str(stmt)
+
+
+
+def test_file_attachment_history_index_covers_listing():
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.schema import CreateIndex
+    from backend.models.file_attachment import FileAttachment
+
+    idx, = (i for i in FileAttachment.__table__.indexes if i.name == "ix_file_attachments_user_uploaded")
+    ddl = str(CreateIndex(idx).compile(dialect=postgresql.dialect()))
+    assert "(project_user_email, upload_time DESC)" in ddl
+    assert "INCLUDE (file_attachment_key, filename)" in ddl
+
+
+@pytest.mark.asyncio
+async def test_file_attachment_copy_stream_pipes_chunks_into_binary_copy():
+    import struct
+    from backend.models.file_attachment import FileAttachment
+
+    sent = {}
+
+    class Driver:
+        async def copy_to_table(self, table, *, schema_name, columns, source, format):
+            sent.update(table=table, columns=columns, format=format,
+                        parts=[p async for p in source])
+
+    class Conn:
+        async def get_raw_connection(self):
+            return type("Raw", (), {"driver_connection": Driver()})()
+
+    class Session:
+        async def scalar(self, stmt):
+            return 42
+
+        async def connection(self):
+            return Conn()
+
+    async def chunks():
+        yield b"PK\x03"
+        yield b"\x04zip"
+
+    key = await FileAttachment.copy_stream(
+        Session(), project_user_email="u@example.com", project_name="p",
+        filename="a.zip", file_type=None, file_size=7, chunks=chunks(),
+    )
+    assert key == 42 and sent["format"] == "binary" and sent["table"] == "file_attachments"
+    # ファイル本体はチャンクのまま中継される (連結しない)
+    head, *body, trailer = sent["parts"]
+    assert body == [b"PK\x03", b"\x04zip"] and trailer == struct.pack("!h", -1)
+    assert head.startswith(b"PGCOPY\n\xff\r\n\x00")
+    assert head.endswith(struct.pack("!i", -1) + struct.pack("!ii", 4, 7) + struct.pack("!i", 7))
+
+    async def short():
+        yield b"PK"
+
+    with pytest.raises(ValueError):
+        await FileAttachment.copy_stream(
+            Session(), project_user_email="u", project_name="p",
+            filename="a.zip", file_type="application/zip", file_size=7, chunks=short(),
+        )
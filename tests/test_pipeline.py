@@ -0,0 +1,40 @@
+# tests/test_pipeline.py
+"""
+common.pipeline (同一プロセス内パイプライン) の単体テスト
+"""
+import asyncio
+import pytest
+
+import common.pipeline as pipeline
+from common.pipeline import PipelineRequest
+
+
+@pytest.mark.asyncio
+async def test_independent_steps_run_concurrently(monkeypatch):
+    running, peak, order = 0, 0, []
+
+    def fake(name, key):
+        async def _call(req):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            order.append(name)
+            return {key: f"<{name}>"}
+        return _call
+
+    monkeypatch.setattr(pipeline, "design_schema", fake("dba", "dba_script"))
+    monkeypatch.setattr(pipeline, "generate_advice", fake("it", "advice"))
+    monkeypatch.setattr(pipeline, "create_schedule", fake("pm", "schedule"))
+    monkeypatch.setattr(pipeline, "generate_code", fake("code", "code"))
+    monkeypatch.setattr(pipeline, "run_qa", fake("qa", "qa_report"))
+
+    result = await pipeline.run_pipeline(PipelineRequest(project_name="P", prompt="R"))
+
+    assert peak == 3
+    assert order[-2:] == ["code", "qa"]
+    assert result == {
+        "dba_script": "<dba>", "advice": "<it>", "schedule": "<pm>",
+        "code": "<code>", "qa_report": "<qa>",
+    }
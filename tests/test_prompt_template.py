@@ -0,0 +1,24 @@
+# tests/test_prompt_template.py
+"""
+common.prompt_template (事前分解テンプレート) の単体テスト
+"""
+import pytest
+
+from common.prompt_template import PromptTemplate
+
+
+def test_format_matches_str_format():
+    src = "# Req\n{prompt}\n{{literal}}\n- {project_name} / {prompt}"
+    tmpl = PromptTemplate(src)
+    kw = {"prompt": "p", "project_name": 3}
+    assert tmpl.format(**kw) == src.format(**kw)
+
+
+def test_missing_key_raises():
+    with pytest.raises(KeyError):
+        PromptTemplate("{a}{b}").format(a="x")
+
+
+def test_format_spec_is_rejected():
+    with pytest.raises(ValueError):
+        PromptTemplate("{a:>10}")
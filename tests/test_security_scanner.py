@@ -0,0 +1,241 @@
+# tests/test_security_scanner.py
+"""
+agents.security.scanner (プロセス内 Bandit) の単体テスト
+"""
+import ast
+
+import pytest
+
+pytest.importorskip("bandit")
+
+from agents.security import scanner
+
+
+def test_run_bandit_reports_issues_and_honours_nosec():
+    src = "import subprocess\nexec('x')\nsubprocess.call('ls', shell=True)  # nosec\n"
+    out = scanner.run_bandit(src, ast.parse(src))
+    assert "[B102:exec_used]" in out
+    assert "app.py:3" not in out
+
+
+def test_run_bandit_clean_source():
+    assert scanner.run_bandit("x = 1\n") == "Bandit: 問題なし"
+
+
+@pytest.mark.asyncio
+async def test_dependency_audit_is_shared_and_cached(monkeypatch):
+    import asyncio
+    calls = []
+
+    async def fake_audit():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "[]"
+
+    monkeypatch.setattr(scanner, "_run_pip_audit", fake_audit)
+    monkeypatch.setattr(scanner, "_audit_cache", {})
+    monkeypatch.setitem(scanner.config, "enable_dependency_audit", True)
+
+    results = await asyncio.gather(*(scanner.run_dependency_audit() for _ in range(4)))
+    assert results == ["[]"] * 4
+    assert await scanner.run_dependency_audit() == "[]"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_static_scans_parse_once_and_cache(monkeypatch):
+    parses = []
+    real_parse = scanner.ast.parse
+    monkeypatch.setattr(scanner.ast, "parse", lambda *a, **k: parses.append(1) or real_parse(*a, **k))
+    # プール無効 (既定スレッドプール) にして同一プロセス内で parse 回数を数える
+    monkeypatch.setattr(scanner, "_POOL_WORKERS", 0)
+    monkeypatch.setattr(scanner, "_analysis_cache", scanner.OrderedDict())
+    monkeypatch.setitem(scanner.config, "enable_dependency_audit", False)
+
+    src = "def f(x):\n" + "".join(f"    if x == {i}: return {i}\n" for i in range(12)) + "eval('1')\n"
+    first = await scanner.run_static_scans(src, output_json=True)
+    types = {f["type"] for f in first["findings"]}
+    assert {"AST", "Complexity"} <= types
+    assert "[B307:blacklist]" in first["bandit"]
+    assert len(parses) == 1
+
+    first["findings"].clear()
+    second = await scanner.run_static_scans(src, output_json=True)
+    assert second["findings"] and len(parses) == 1
+
+
+def test_scan_regex_line_numbers_and_dedup():
+    src = (
+        "x = 1\r\n"
+        "requests.get('http://a', verify=False); requests.get('https://b')\n"
+        "\n"
+        "password = 'hunter2'\n"
+        "verify\n= False\n"
+    )
+    hits = [(f["line"], f["desc"]) for f in scanner._scan_regex(src)]
+    descs = [d for _, d in scanner._REGEX_PATTERNS]
+    assert hits == [(2, descs[0]), (2, descs[1]), (4, descs[3])]
+
+
+def test_scan_regex_union_keeps_overlapping_rules_and_case():
+    src = "password = \"https://x; select 1\"\nakia" + "A" * 16 + "\n"
+    descs = [d for _, d in scanner._REGEX_PATTERNS]
+    hits = [(f["line"], f["desc"]) for f in scanner._scan_regex(src)]
+    # 大文字小文字を区別する AWS キー規則は小文字 akia に反応しない
+    assert hits == [(1, descs[0]), (1, descs[3]), (1, descs[4])]
+
+
+@pytest.mark.parametrize("payload", [
+    " " * 5000 + "!",
+    "'" * 20000,
+    "'; " * 20000,
+    "password='" * 4000,
+    "verify" + " " * 20000,
+    "cors_allowed_origins=[" * 1000 + "x" * 5000,
+])
+def test_regex_patterns_run_in_linear_time(payload):
+    import time
+    for patt, _ in scanner._REGEX_PATTERNS:
+        t0 = time.perf_counter()
+        list(patt.finditer(payload))
+        assert time.perf_counter() - t0 < 0.05, patt.pattern
+
+
+def test_regex_patterns_still_detect_typical_cases():
+    src = (
+        "db_password = 'hunter2'\n"
+        "q = \"x'; DELETE FROM users\"\n"
+        "CORS = dict(cors_allowed_origins=['*'])\n"
+        "key = 'AKIA" + "A" * 16 + "'\n"
+    )
+    descs = {f["desc"] for f in scanner._scan_regex(src)}
+    assert descs == {d for _, d in scanner._REGEX_PATTERNS[2:]}
+
+
+@pytest.mark.asyncio
+async def test_static_scans_run_in_process_pool(monkeypatch):
+    monkeypatch.setattr(scanner, "_POOL_WORKERS", 1)
+    monkeypatch.setattr(scanner, "_analysis_cache", scanner.OrderedDict())
+    monkeypatch.setitem(scanner.config, "enable_dependency_audit", False)
+    try:
+        out = await scanner.run_static_scans("exec('x')\n", output_json=True)
+        assert scanner._pool is not None
+    finally:
+        scanner.shutdown_pool()
+    assert any(f["type"] == "AST" for f in out["findings"])
+    assert "[B102:exec_used]" in out["bandit"]
+
+
+@pytest.mark.asyncio
+async def test_scan_security_overlaps_llm_and_static_scan(monkeypatch):
+    import asyncio
+    import time
+    from agents.security import services
+    from agents.security.models import SecurityScanRequest
+
+    async def slow_llm(*_a, **_k):
+        await asyncio.sleep(0.2)
+        return "llm"
+
+    async def slow_scan(_code):
+        await asyncio.sleep(0.2)
+        return "scan"
+
+    monkeypatch.setattr(services.llm_cache, "get_or_call", slow_llm)
+    monkeypatch.setattr(services, "run_static_scans", slow_scan)
+    t0 = time.perf_counter()
+    out = await services.scan_security(SecurityScanRequest(code="x = 1"))
+    assert time.perf_counter() - t0 < 0.35
+    assert out["security_report"].startswith("llm") and "scan" in out["security_report"]
+
+
+def test_scan_dangerous_calls_exact_and_dotted_names():
+    src = (
+        "import os, subprocess, yaml\n"
+        "cursor.execute('SELECT 1')\n"      # exec の部分一致では検出しない
+        "os.system('ls')\n"
+        "subprocess.run(['ls'])\n"
+        "yaml.load(s)\n"
+        "f(eval('1'))\n"
+    )
+    hits = [(f["line"], f["rule"]) for f in scanner._scan_tree(ast.parse(src))[0]]
+    assert hits == [(3, "os.system"), (4, "subprocess"), (5, "yaml.load"), (6, "eval")]
+
+
+@pytest.mark.asyncio
+async def test_analysis_cache_is_content_keyed_and_single_flight(monkeypatch):
+    import asyncio
+    calls = []
+
+    def fake_analyze(source):
+        calls.append(source)
+        return (), "Bandit: 問題なし"
+
+    monkeypatch.setattr(scanner, "_POOL_WORKERS", 0)
+    monkeypatch.setattr(scanner, "_analyze_source", fake_analyze)
+    monkeypatch.setattr(scanner, "_analysis_cache", scanner.OrderedDict())
+
+    src = "x = 1\n"
+    await asyncio.gather(*(scanner._analyze_source_async(src) for _ in range(4)))
+    await scanner._analyze_source_async(src)
+    assert calls == [src]
+    assert src not in scanner._analysis_cache  # キーはダイジェスト (本文を保持しない)
+
+    # 設定が変われば別キーで再解析
+    monkeypatch.setitem(scanner.config, "complexity_threshold", 99)
+    await scanner._analyze_source_async(src)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_thread_fallback_keeps_event_loop_free(monkeypatch):
+    import asyncio
+    import contextvars
+    import time
+
+    var = contextvars.ContextVar("trace", default=None)
+    seen = []
+
+    def slow_analyze(source):
+        seen.append(var.get())
+        time.sleep(0.2)
+        return (), "Bandit: 問題なし"
+
+    monkeypatch.setattr(scanner, "_POOL_WORKERS", 0)
+    monkeypatch.setattr(scanner, "_analyze_source", slow_analyze)
+    monkeypatch.setattr(scanner, "_analysis_cache", scanner.OrderedDict())
+
+    var.set("span-1")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        for _ in range(5):
+            await asyncio.sleep(0.02)
+            ticks += 1
+
+    await asyncio.gather(scanner._analyze_source_async("y = 2\n"), ticker())
+    assert ticks == 5 and seen == ["span-1"]
+
+
+def test_bandit_cli_fallback_removes_temp_file(monkeypatch, tmp_path):
+    import tempfile
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    out = scanner._run_bandit_cli("exec('x')\n")
+    assert "B102" in out or out == "Bandit: command not found"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_regex_rules_ignore_docstrings():
+    src = (
+        'def f(password="real"):\n'
+        '    """\n'
+        '    Example: password = "hunter2"\n'
+        '    """\n'
+        '    secret = "s3cr3t"\n'
+        'def g(): """api_key = \'k\'"""\n'
+    )
+    _, doc_lines = scanner._scan_tree(ast.parse(src))
+    lines = [f["line"] for f in scanner._scan_regex(src, doc_lines)]
+    # docstring 本文 (2-4 行目) は除外、同一行 docstring の 6 行目は残す
+    assert lines == [1, 5, 6]
@@ -0,0 +1,30 @@
+# tests/test_stakeholder.py
+"""
+agents.stakeholder.services (RootModel の .root 参照) の単体テスト
+"""
+import warnings
+
+import pytest
+
+import agents.stakeholder.services as svc
+from agents.stakeholder.models import CollectFeedbackRequest
+
+
+@pytest.mark.asyncio
+async def test_summarize_feedback_embeds_root_list(monkeypatch):
+    seen = {}
+
+    async def fake_get_or_call(key_text, model, coro_factory, *, namespace="", params=None, prefix=""):
+        seen["prompt"] = key_text
+        return "summary"
+
+    monkeypatch.setattr(svc.llm_cache, "get_or_call", fake_get_or_call)
+    req = CollectFeedbackRequest(
+        feedback_context=["ログインを速く", "二要素認証"], mode="detail", model_name="m",
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # __root__ 由来の非推奨警告が出ないこと
+        res = await svc.summarize_feedback(req)
+
+    assert res == {"feedback_summary": "summary"}
+    assert '"ログインを速く"' in seen["prompt"] and '"二要素認証"' in seen["prompt"]
@@ -8,6 +8,13 @@ import asyncio
 from backend.orchestrator.langgraph_workflow import builder, compiled_graph
 from unittest.mock import patch
 
+
+@pytest.fixture(autouse=True)
+def _fresh_agent_cache(monkeypatch):
+    # テスト間でエージェント応答キャッシュを共有しない
+    from backend.orchestrator import langgraph_workflow as wf
+    monkeypatch.setattr(wf, "_agent_cache", wf.LLMResponseCache(ttl=60, max_entries=16, enabled=False))
+
 def test_builder_states_and_edges_exist():
     states = set(builder._states.keys())
     for expected in ["init","stakeholder","pm","itc","dba_design","ui_build","code_gen","qa","sec_scan","patch"]:
@@ -18,9 +25,145 @@ def test_builder_states_and_edges_exist():
 
 @pytest.mark.asyncio
 async def test_execute_loop_limit(monkeypatch):
-    async def fake_call(agent_name, endpoint, payload, key, state):
-        return {key:"", "messages": state["messages"] + [{"agent":agent_name}]}
+    async def fake_call(agent_name, endpoint, payload, key, state, extra_keys=None):
+        # call_agent と同じく差分のみを返す (messages は reducer が連結する)
+        return {key: "", "messages": [{"agent": agent_name}]}
     monkeypatch.setattr("backend.orchestrator.langgraph_workflow.call_agent", fake_call)
-    init = {"messages":[{"requirement":"r","project_name":"p","model":"m","max_cost":0.1,"workflow_id":1,"mode":"detail"}]}
-    result = await compiled_graph.ainvoke({**init, "loop_count":0, "max_loops":1})
-    assert result.get("loop_count",0) <= 1
+    init = {"messages":[{"requirement":"r","project_name":"p","model":"m","max_cost":0.1,
+                         "workflow_id":1,"mode":"detail","max_loops":1}]}
+    result = await compiled_graph.ainvoke(init)
+    # QA / Security が「問題なし」を返さないので max_loops=1 回だけ修正ループして終了
+    assert result["loop_count"] == 1 and result["loop_next"] is False
+    agents = [m.get("agent") for m in result["messages"][1:]]
+    assert agents.count("patch") == 1
+    assert agents.count("code") == 2 and agents.count("qa") == 2 and agents.count("security") == 2
+    assert len(agents) == 5 + 3 + 1 + 3
+
+
+@pytest.mark.asyncio
+async def test_front_agents_fan_out_and_merge(monkeypatch):
+    import time
+    from backend.orchestrator import langgraph_workflow as wf
+
+    async def fake_post(base_url, path, payload, *, timeout=None, max_retries=None):
+        await asyncio.sleep(0.1)
+        return {"usage": {"total_tokens": 1}, "feedback_summary": "f", "schedule": "s",
+                "advice": "a", "dba_script": "d", "ui": "u", "code": "c",
+                "qa_report": "問題なし", "security_report": "No issues"}
+
+    monkeypatch.setattr(wf, "post_json", fake_post)
+    monkeypatch.setattr(wf, "record_cost", lambda *a, **k: 0.5)
+    t0 = time.perf_counter()
+    result = await wf.compiled_graph.ainvoke(
+        {"messages": [{"requirement": "r", "project_name": "p", "workflow_id": 1}]})
+    # front 5 本 (並行) → code → qa / security (並行) の 3 段 ≒ 0.3s
+    assert time.perf_counter() - t0 < 0.45
+    agents = [m.get("agent") for m in result["messages"][1:]]
+    assert sorted(agents[:5]) == ["dba", "it", "pm", "stakeholder", "ui"]
+    assert agents[5] == "code" and sorted(agents[6:]) == ["qa", "security"]
+    assert result["total_cost"] == 4.0
+    assert (result["schedule"], result["ui"], result["code"]) == ("s", "u", "c")
+
+
+def test_evaluate_ok_detection_is_case_insensitive():
+    from backend.orchestrator.langgraph_workflow import _evaluate
+
+    base = {"loop_count": 0, "max_loops": 2}
+    assert _evaluate({**base, "qa_report": "結果: 問題なし", "security_report": "NO ISSUES found"}) == {"loop_next": False}
+    assert _evaluate({**base, "qa_report": "問題なし", "security_report": "1 issue"}) == {"loop_next": True}
+    assert _evaluate({**base, "loop_count": 2, "qa_report": "", "security_report": ""}) == {"loop_next": False}
+
+
+@pytest.mark.asyncio
+async def test_call_agent_returns_only_the_delta(monkeypatch):
+    from backend.orchestrator import langgraph_workflow as wf
+
+    async def fake_post(base_url, path, payload, *, timeout=None, max_retries=None):
+        return {"usage": {"total_tokens": 3}, "patched_code": "new", "unchanged": True}
+
+    monkeypatch.setattr(wf, "post_json", fake_post)
+    monkeypatch.setattr(wf, "record_cost", lambda *a, **k: 0.25)
+    state = {"model_name": "m", "project_name": "p", "total_cost": 1.0,
+             "messages": [{"requirement": "r"}], "code": "x" * 10_000}
+    delta = await wf.call_agent("patch", "/patch_code", {}, "patched_code", state,
+                                extra_keys={"unchanged": "patch_unchanged"})
+    # 大きな state (code など) はコピーせず、reducer が合算する差分だけを返す
+    assert set(delta) == {"patched_code", "patch_unchanged", "messages", "total_cost"}
+    assert delta["total_cost"] == 0.25 and len(delta["messages"]) == 1
+    assert state["messages"] == [{"requirement": "r"}]
+
+
+
+@pytest.mark.asyncio
+async def test_call_agent_caches_only_temperature_zero_calls_of_allowed_agents(monkeypatch):
+    from backend.orchestrator import langgraph_workflow as wf
+    calls, costs = [], []
+    monkeypatch.setattr(wf, "_agent_cache", wf.LLMResponseCache(ttl=60, max_entries=16))
+
+    async def fake_post(base_url, path, payload, *, timeout=None, max_retries=None):
+        calls.append(path)
+        return {"usage": {"total_tokens": 5}, "schedule": "s", "code": "c"}
+
+    monkeypatch.setattr(wf, "post_json", fake_post)
+    monkeypatch.setattr(wf, "record_cost", lambda *a, **k: costs.append(a) or 0.5)
+    state = {"model_name": "m", "project_name": "p", "total_cost": 0.0}
+
+    first = await wf.call_agent("pm", "/schedule", {"requirement": "r", "temperature": 0}, "schedule", state)
+    # キー順が違っても同一 payload ならヒットし、コストは記録しない
+    again = await wf.call_agent("pm", "/schedule", {"temperature": 0, "requirement": "r"}, "schedule", state)
+    assert calls == ["/schedule"] and len(costs) == 1
+    assert again["schedule"] == "s" and again["total_cost"] == 0.0
+    assert (first["messages"][0]["cached"], again["messages"][0]["cached"]) == (False, True)
+
+    # temperature 未指定 (サンプリング) / 対象外エージェントは毎回呼ぶ
+    for _ in range(2):
+        await wf.call_agent("pm", "/schedule", {"requirement": "r"}, "schedule", state)
+        await wf.call_agent("code", "/generate_code", {"prompt": "r", "temperature": 0}, "code", state)
+    assert calls == ["/schedule"] + ["/schedule", "/generate_code"] * 2
+
+
+def test_agent_cache_is_off_by_default():
+    from backend.config.settings import Settings
+    assert Settings.model_fields["agent_cache_enabled"].default is False
+
+
+@pytest.mark.asyncio
+async def test_call_agent_awaits_async_step_hook(monkeypatch):
+    from backend.orchestrator import langgraph_workflow as wf
+    seen = []
+
+    async def fake_post(base_url, path, payload, *, timeout=None, max_retries=None):
+        return {"usage": {"total_tokens": 1}, "qa_report": "ok"}
+
+    async def on_step(agent, step, info):
+        seen.append((agent, step, info["total_cost"]))
+
+    monkeypatch.setattr(wf, "post_json", fake_post)
+    monkeypatch.setattr(wf, "record_cost", lambda *a, **k: 0.5)
+    monkeypatch.setattr(wf, "_ON_STEP", on_step)
+    state = {"model_name": "m", "project_name": "p", "total_cost": 1.0}
+    await wf.call_agent("qa", "/run_qa", {}, "qa_report", state)
+    assert seen == [("qa", "run_qa", 1.5)]
+
+
+@pytest.mark.asyncio
+async def test_step_hook_running_cost_is_monotonic_across_fan_out(monkeypatch):
+    from backend.orchestrator import langgraph_workflow as wf
+    totals = []
+
+    async def fake_post(base_url, path, payload, *, timeout=None, max_retries=None):
+        await asyncio.sleep(0.01)
+        return {"usage": {"total_tokens": 1}, "qa_report": "問題なし", "security_report": "No issues"}
+
+    async def on_step(agent, step, info):
+        totals.append(info["total_cost"])
+
+    monkeypatch.setattr(wf, "post_json", fake_post)
+    monkeypatch.setattr(wf, "record_cost", lambda *a, **k: 0.5)
+    monkeypatch.setattr(wf, "_ON_STEP", on_step)
+    monkeypatch.setattr(wf, "_RUN_COST", {7: 0.0})
+    result = await wf.compiled_graph.ainvoke(
+        {"messages": [{"requirement": "r", "project_name": "p", "workflow_id": 7}]})
+    # 並行ブランチが同じスナップショットを読んでも通知値は 1 呼び出しずつ増える
+    assert totals == [0.5 * i for i in range(1, 9)]
+    assert result["total_cost"] == totals[-1]